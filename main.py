@@ -4,8 +4,11 @@ Soporta ejecución interactiva y por línea de comandos.
 """
 
 import argparse
+import os
+import signal
 import sys
 from setup import ClasificadorModelosNube
+from setup.presupuesto import PresupuestoAgotado
 
 
 def clasificar_texto(texto: str):
@@ -18,6 +21,7 @@ def clasificar_texto(texto: str):
     try:
         clasificador = ClasificadorModelosNube(usar_nlp=True)
         resultado = clasificador.clasificar(texto)
+        clasificador.registrar_historial([resultado])
         
         if resultado.modelo == "Error":
             print(f"❌ Error en la clasificación")
@@ -74,6 +78,413 @@ def modo_interactivo():
             break
 
 
+def _interrumpir_por_senal(numero_senal, marco):
+    """Convierte SIGTERM en KeyboardInterrupt para cerrar el trabajo de forma ordenada."""
+    raise KeyboardInterrupt
+
+
+def _formatear_costo(costo) -> str:
+    """Formatea un costo en USD, o "costo desconocido" si algún modelo no tiene precio."""
+    return f"${costo:.4f}" if costo is not None else "costo desconocido"
+
+
+def modo_lote(ruta_entrada: str, ruta_salida: str = None, inicio: int = 0, fin: int = None,
+              reanudar: bool = False, ruta_anterior: str = None):
+    """
+    Clasifica un archivo de texto o JSONL completo (un registro por línea).
+    
+    Args:
+        ruta_entrada: Archivo de entrada
+        ruta_salida: Archivo JSONL de resultados (por defecto junto a la entrada)
+        inicio: Primer registro a clasificar
+        fin: Registro final exclusivo
+        reanudar: Si se debe continuar un trabajo interrumpido
+        ruta_anterior: Resultados de un trabajo previo para clasificar sólo lo que cambió
+    """
+    from setup.procesador_lotes import ProcesadorLotes
+    
+    ruta_salida = ruta_salida or f"{ruta_entrada}.resultados.jsonl"
+    
+    print(f"📂 Clasificando archivo: {ruta_entrada}")
+    print("-" * 50)
+    
+    signal.signal(signal.SIGTERM, _interrumpir_por_senal)
+    
+    try:
+        resumen = ProcesadorLotes().procesar(
+            ruta_entrada, ruta_salida, inicio=inicio, fin=fin, reanudar=reanudar,
+            ruta_anterior=ruta_anterior
+        )
+    except KeyboardInterrupt:
+        print("\n⏸️  Trabajo interrumpido. Usa --reanudar para continuar donde se detuvo")
+        return False
+    except PresupuestoAgotado as e:
+        print(f"\n💸 {e}. Amplía el presupuesto y usa --reanudar para continuar")
+        return False
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        return False
+    
+    print(f"✅ Registros clasificados: {resumen['total_registros']}")
+    if reanudar:
+        print(f"⏩ Recuperados del diario: {resumen['reanudados']}")
+    if ruta_anterior:
+        print(f"♻️  Reutilizados de {ruta_anterior}: {resumen['reutilizados']} textos")
+    print(f"🔁 Clasificaciones realizadas: {resumen['clasificaciones']} "
+          f"(deduplicación: {resumen['ratio_deduplicacion']:.1%})")
+    print(f"❌ Errores: {resumen['errores']}")
+    print(f"⏱️  Duración: {resumen['duracion_segundos']:.2f} s "
+          f"({resumen['registros_por_segundo']:.1f} registros/s)")
+    uso = resumen['uso']
+    linea_uso = (f"🪙 Tokens: {uso['tokens_entrada']} de entrada, {uso['tokens_salida']} de salida, "
+                 f"{_formatear_costo(uso['costo'])}")
+    if resumen['costo_por_1000'] is not None:
+        linea_uso += f" (${resumen['costo_por_1000']:.4f} por 1000 registros)"
+    print(linea_uso)
+    print(f"💾 Resultados: {ruta_salida}")
+    
+    if len(resumen['backends']) > 1:
+        print("🌐 Backends:")
+        for backend in resumen['backends']:
+            print(f"  {backend['nombre']}: {backend['exitos']} ok, {backend['errores']} errores, "
+                  f"{backend['exitos_por_segundo']:.1f} peticiones/s")
+    
+    if resumen['reglas']:
+        reglas = resumen['reglas']
+        print(f"📏 Reglas: {reglas['resueltas']} de {reglas['consultas']} textos resueltos "
+              f"({reglas['tasa_resolucion']:.1%}), {reglas['conflictos']} con modelos en conflicto")
+        for regla in reglas['reglas'][:5]:
+            print(f"  \"{regla['frase']}\" → {regla['modelo']}: {regla['coincidencias']} "
+                  f"coincidencias ({regla['tasa']:.1%}), {regla['aciertos']} resueltos")
+    
+    if resumen['sombra']:
+        sombra = resumen['sombra']
+        latencia = sombra['latencia']
+        print(f"👥 Sombra ({sombra['candidato']}): {sombra['comparadas']} comparadas, "
+              f"{sombra['descartadas']} descartadas, {sombra['errores_candidato']} errores")
+        if sombra['coincidencia'] is not None:
+            print(f"  Coincidencia: {sombra['coincidencia']:.1%}, p50 {latencia['principal']['p50']:.2f} s "
+                  f"→ {latencia['candidato']['p50']:.2f} s, tokens medios "
+                  f"{sombra['tokens_medios']['principal']:.0f} → {sombra['tokens_medios']['candidato']:.0f}")
+        for par, cantidad in list(sombra['desacuerdos'].items())[:5]:
+            print(f"  {par}: {cantidad}")
+        print(f"  Tiempo añadido al camino principal: p99 "
+              f"{sombra['sobrecosto_principal']['p99'] * 1e6:.0f} µs")
+    
+    if resumen['enrutamiento']:
+        print("🔀 Rutas de modelos:")
+        for ruta, datos in resumen['enrutamiento']['rutas'].items():
+            print(f"  {ruta} ({datos['modelo']}): {datos['llamadas']} llamadas, "
+                  f"{datos['latencia_media']:.2f} s de media, {_formatear_costo(datos['costo_total'])}")
+        coincidencia = resumen['enrutamiento']['coincidencia_escalado']
+        if coincidencia is not None:
+            print(f"  Coincidencia al escalar: {coincidencia:.1%}")
+    
+    return True
+
+
+def modo_spool(directorio: str, intervalo: float = 2.0):
+    """
+    Vigila un directorio y clasifica de forma continua los archivos JSONL que aparecen en él.
+    
+    La primera señal SIGTERM o Ctrl+C termina el archivo en curso y sale; la
+    segunda lo interrumpe y lo devuelve a la cola para reanudarlo después.
+    
+    Args:
+        directorio: Directorio de spool
+        intervalo: Segundos entre dos revisiones del directorio vacío
+    """
+    from setup.spool import TrabajadorSpool
+    
+    if not os.path.isdir(directorio):
+        print(f"❌ Error: {directorio} no es un directorio")
+        return False
+    
+    def informar(informe):
+        if "error" in informe:
+            print(f"❌ {informe['archivo']}: {informe['error']}")
+        else:
+            resumen = informe["resumen"]
+            print(f"✅ {informe['archivo']}: {resumen['total_registros']} registros, "
+                  f"{resumen['errores']} errores, {resumen['registros_por_segundo']:.1f} registros/s, "
+                  f"{_formatear_costo(resumen['uso']['costo'])}")
+        print(f"   ⏱️  Espera: {informe['espera']:.1f} s, latencia: {informe['latencia']:.1f} s, "
+              f"pendientes: {informe['pendientes']}")
+    
+    trabajador = TrabajadorSpool(directorio, intervalo=intervalo, al_terminar=informar)
+    
+    def detener(numero_senal, marco):
+        print("\n⏸️  Deteniendo al terminar el archivo en curso (repite para interrumpirlo)")
+        trabajador.detener()
+        signal.signal(signal.SIGTERM, _interrumpir_por_senal)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+    
+    signal.signal(signal.SIGTERM, detener)
+    signal.signal(signal.SIGINT, detener)
+    
+    print(f"📥 Vigilando el directorio: {directorio} ({trabajador.estadisticas()['pendientes']} pendientes)")
+    print("-" * 50)
+    
+    try:
+        trabajador.ejecutar()
+    except KeyboardInterrupt:
+        print("\n⏸️  Archivo en curso devuelto a la cola; se reanudará desde su diario")
+    except PresupuestoAgotado as e:
+        print(f"\n💸 {e}. Archivo en curso devuelto a la cola; se reanudará desde su diario")
+    
+    estadisticas = trabajador.estadisticas()
+    print(f"📊 Archivos procesados: {estadisticas['archivos_procesados']}, "
+          f"fallidos: {estadisticas['archivos_fallidos']}, registros: {estadisticas['registros']}")
+    print(f"⏱️  Latencia media: {estadisticas['latencia_media']:.1f} s "
+          f"(máxima {estadisticas['latencia_maxima']:.1f} s), pendientes: {estadisticas['pendientes']}")
+    
+    return True
+
+
+def modo_coordinar(ruta_entrada: str, ruta_salida: str = None, puerto: int = 8765,
+                   tamano_fragmento: int = 1000, host: str = '127.0.0.1'):
+    """
+    Reparte un corpus en fragmentos entre trabajadores remotos y combina sus resultados.
+    
+    Args:
+        ruta_entrada: Archivo de texto o JSONL (un registro por línea)
+        ruta_salida: Archivo JSONL de resultados (por defecto <entrada>.resultados.jsonl)
+        puerto: Puerto en el que escuchar a los trabajadores
+        tamano_fragmento: Registros por fragmento
+        host: Interfaz en la que escuchar (la local por defecto)
+    """
+    from setup.configuracion import Configuracion
+    from setup.distribuido import Coordinador
+    
+    token = Configuracion().token_distribuido or None
+    if host not in ('127.0.0.1', 'localhost', '::1') and token is None:
+        print("⚠️  Escuchando fuera de la máquina local sin DISTRIBUTED_TOKEN: "
+              "cualquiera que alcance el puerto puede pedir fragmentos")
+    
+    if not os.path.exists(ruta_entrada):
+        print(f"❌ Error: no existe el archivo {ruta_entrada}")
+        return False
+    
+    ruta_salida = ruta_salida or f"{ruta_entrada}.resultados.jsonl"
+    coordinador = Coordinador(ruta_entrada, ruta_salida, direccion=(host, puerto),
+                              tamano_fragmento=tamano_fragmento, token=token)
+    coordinador.iniciar()
+    
+    avance = coordinador.estadisticas()
+    print(f"🛰️  Coordinando {ruta_entrada} en {host}:{coordinador.puerto}")
+    print(f"🧩 Fragmentos: {avance['completados'] + avance['en_curso'] + avance['pendientes']} "
+          f"({avance['completados']} ya completados)")
+    print("-" * 50)
+    
+    try:
+        resumen = coordinador.ejecutar()
+    except KeyboardInterrupt:
+        print("\n⏸️  Coordinación interrumpida; los fragmentos completados se conservan para reanudar")
+        return False
+    
+    print(f"📊 Registros: {resumen['total_registros']} en {resumen['fragmentos']} fragmentos")
+    print(f"⏱️  Duración: {resumen['duracion_segundos']:.1f} s "
+          f"({resumen['registros_por_segundo']:.1f} registros/s)")
+    print(f"🔁 Reasignaciones: {resumen['reasignaciones']}, robos: {resumen['robos']}, "
+          f"duplicados descartados: {resumen['duplicados_descartados']}")
+    print(f"❌ Errores: {resumen['errores']}, 🪙 costo: {_formatear_costo(resumen['costo'])}")
+    for nombre, datos in resumen['trabajadores'].items():
+        print(f"  {nombre}: {datos['fragmentos']} fragmentos, {datos['registros']} registros")
+    print(f"💾 Resultados: {ruta_salida}")
+    
+    return True
+
+
+def modo_trabajar(direccion: str):
+    """
+    Trabaja para un coordinador remoto hasta que no queden fragmentos.
+    
+    Args:
+        direccion: Dirección del coordinador (``host:puerto``)
+    """
+    from setup.configuracion import Configuracion
+    from setup.distribuido import TrabajadorRemoto, separar_direccion
+    
+    trabajador = TrabajadorRemoto(separar_direccion(direccion),
+                                  token=Configuracion().token_distribuido or None)
+    print(f"🛠️  Trabajando para {direccion} como {trabajador.nombre}")
+    
+    try:
+        procesados = trabajador.ejecutar()
+    except PresupuestoAgotado as e:
+        print(f"\n💸 {e}. El coordinador reasignará el fragmento en curso")
+        return False
+    
+    print(f"✅ Fragmentos procesados: {procesados}"
+          f" (cancelados por estar ya completados: {trabajador.fragmentos_cancelados})")
+    return True
+
+
+def modo_comparar(conjunto: str, configuraciones: list = None, ruta_salida: str = None,
+                  concurrencia: int = 1):
+    """
+    Compara configuraciones del clasificador sobre un conjunto etiquetado.
+    
+    Args:
+        conjunto: Archivo JSONL con ``texto`` y ``modelo_esperado``, o ``casos``
+            para usar los casos de prueba incluidos
+        configuraciones: Configuraciones ``nombre[:motor[:VARIABLE=valor,...]]``
+        ruta_salida: Archivo JSON donde guardar el informe completo (opcional)
+        concurrencia: Textos clasificados a la vez en cada configuración
+    """
+    import json
+    from setup.comparacion import cargar_conjunto, comparar_configuraciones, interpretar_configuracion
+    
+    try:
+        if conjunto == 'casos':
+            from setup.casos_prueba import CasosPrueba
+            casos = CasosPrueba.obtener_todos_los_casos()
+        else:
+            casos = cargar_conjunto(conjunto)
+        configuraciones = [interpretar_configuracion(texto)
+                           for texto in (configuraciones or ['actual'])]
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        return False
+    
+    print(f"⚖️  Comparando {len(configuraciones)} configuraciones sobre {len(casos)} casos")
+    print("-" * 50)
+    
+    resumen = comparar_configuraciones(configuraciones, casos, concurrencia=concurrencia)
+    
+    print(f"{'':2}{'Configuración':<20}{'Exactitud':>10}{'p50 (s)':>9}{'p99 (s)':>9}"
+          f"{'textos/s':>10}{'tokens/1k':>11}{'$/1k':>9}")
+    for informe in resumen['configuraciones']:
+        marca = "★ " if informe['pareto'] else "  "
+        costo = "?" if informe['costo_por_1000'] is None else f"{informe['costo_por_1000']:.4f}"
+        print(f"{marca}{informe['nombre']:<20}{informe['exactitud']:>10.1%}"
+              f"{informe['latencia_p50']:>9.2f}{informe['latencia_p99']:>9.2f}"
+              f"{informe['textos_por_segundo']:>10.1f}{informe['tokens_por_1000']:>11.0f}{costo:>9}")
+    print("★ = óptima de Pareto (exactitud, latencia p50, costo y tokens)")
+    if any(informe['costo_por_1000'] is None for informe in resumen['configuraciones']):
+        print("? = costo desconocido (modelo sin precio en MODEL_PRICES); no cuenta para Pareto")
+    
+    for informe in resumen['configuraciones']:
+        print(f"\n🔢 Matriz de confusión de {informe['nombre']} (filas: esperado, columnas: obtenido)")
+        columnas = [etiqueta for etiqueta in next(iter(informe['matriz_confusion'].values()))
+                    if any(fila[etiqueta] for fila in informe['matriz_confusion'].values())]
+        print(f"  {'':<16}" + "".join(f"{columna[:14]:>15}" for columna in columnas))
+        for esperado, fila in informe['matriz_confusion'].items():
+            print(f"  {esperado:<16}" + "".join(f"{fila[columna]:>15}" for columna in columnas))
+    
+    if ruta_salida:
+        with open(ruta_salida, 'w', encoding='utf-8') as f:
+            json.dump(resumen, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Informe: {ruta_salida}")
+    
+    return True
+
+
+def modo_consultar_historial(agrupar: str = 'modelo', desde: str = None, hasta: str = None):
+    """
+    Muestra los totales del historial de clasificaciones en un intervalo de tiempo.
+    
+    Args:
+        agrupar: Campo por el que agrupar (modelo, metodo, modelo_llm, huella, dia u hora)
+        desde: Fecha ISO o antigüedad (``7d``, ``12h``) inicial (opcional)
+        hasta: Fecha ISO o antigüedad final, exclusiva (opcional)
+    """
+    from datetime import datetime
+    from setup.configuracion import Configuracion
+    from setup.historial import HistorialClasificaciones, interpretar_momento
+    
+    ruta = Configuracion().ruta_historial
+    if not ruta or not os.path.exists(ruta):
+        print("❌ Define HISTORY_PATH (o --historial) con un historial existente")
+        return False
+    
+    try:
+        inicio = interpretar_momento(desde) if desde else None
+        final = interpretar_momento(hasta) if hasta else None
+        with HistorialClasificaciones(ruta) as historial:
+            grupos = historial.resumen(inicio, final, agrupar=agrupar)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return False
+    
+    if not grupos:
+        print("📭 No hay clasificaciones en el intervalo")
+        return True
+    
+    total = sum(grupo['clasificaciones'] for grupo in grupos)
+    primera = min(grupo['primera'] for grupo in grupos)
+    ultima = max(grupo['ultima'] for grupo in grupos)
+    print(f"🗂️  Historial: {ruta}")
+    print(f"🕒 {total} clasificaciones entre {datetime.fromtimestamp(primera):%Y-%m-%d %H:%M} "
+          f"y {datetime.fromtimestamp(ultima):%Y-%m-%d %H:%M}")
+    print("-" * 50)
+    print(f"{agrupar:<24}{'Total':>9}{'%':>8}{'Confianza':>11}"
+          f"{'Latencia (s)':>14}{'Tokens':>10}{'Costo ($)':>11}")
+    for grupo in grupos:
+        latencia = grupo['latencia_media']
+        print(f"{str(grupo['grupo'])[:23]:<24}{grupo['clasificaciones']:>9}"
+              f"{grupo['clasificaciones'] / total:>8.1%}{grupo['confianza_media'] or 0.0:>11.2f}"
+              f"{'-' if latencia is None else f'{latencia:.2f}':>14}"
+              f"{grupo['tokens']:>10}{grupo['costo']:>11.4f}")
+    
+    return True
+
+
+def modo_buscar_historial(texto: str, limite: int = 10):
+    """
+    Muestra las clasificaciones anteriores de un texto.
+    
+    Args:
+        texto: Texto a buscar (se compara por su forma preprocesada)
+        limite: Clasificaciones máximas a mostrar
+    """
+    from datetime import datetime
+    from setup.configuracion import Configuracion
+    from setup.historial import HistorialClasificaciones
+    
+    ruta = Configuracion().ruta_historial
+    if not ruta or not os.path.exists(ruta):
+        print("❌ Define HISTORY_PATH (o --historial) con un historial existente")
+        return False
+    
+    with HistorialClasificaciones(ruta) as historial:
+        filas = historial.buscar(texto, limite=limite)
+    
+    if not filas:
+        print("📭 El texto no aparece en el historial")
+        return True
+    
+    print(f"🔎 Últimas {len(filas)} clasificaciones de: {filas[0]['texto'][:80]}")
+    print("-" * 50)
+    for fila in filas:
+        latencia = f"{fila['latencia']:.2f}s" if fila['latencia'] is not None else "-"
+        print(f"  {datetime.fromtimestamp(fila['momento']):%Y-%m-%d %H:%M:%S}  "
+              f"{fila['modelo']:<14}{fila['confianza']:.2f}  {fila['metodo']}  "
+              f"{fila['modelo_llm'] or '-'}  {latencia}  huella {fila['huella'] or '-'}")
+    
+    return True
+
+
+def modo_reentrenar():
+    """Reentrena el modelo local con las etiquetas del LLM registradas hasta ahora."""
+    from setup.destilacion import reentrenar
+    from setup.configuracion import Configuracion
+    
+    config = Configuracion()
+    if not config.ruta_almacen_entrenamiento or not config.ruta_modelo_local:
+        print("❌ Define DISTILLATION_STORE y LOCAL_MODEL_PATH para reentrenar el modelo local")
+        return False
+    
+    resumen = reentrenar(config.ruta_almacen_entrenamiento, config.ruta_modelo_local)
+    
+    print(f"🧠 Ejemplos nuevos: {resumen['ejemplos_nuevos']}")
+    print(f"📚 Ejemplos totales: {resumen['ejemplos_totales']}")
+    print(f"🔤 Vocabulario: {resumen['vocabulario']} términos")
+    print(f"💾 Modelo local: {config.ruta_modelo_local}")
+    
+    return True
+
+
 def modo_demo():
     """Ejecuta la demostración del clasificador."""
     from setup.demo import ejecutar_demo
@@ -90,6 +501,18 @@ Ejemplos de uso:
   python main.py                                    # Modo interactivo
   python main.py -t "AWS EC2 servidores virtuales"  # Clasificar texto
   python main.py --demo                             # Ejecutar demostración
+  python main.py --archivo corpus.jsonl             # Clasificar un archivo por lotes
+  python main.py --archivo corpus.jsonl --reanudar  # Continuar un trabajo interrumpido
+  python main.py --archivo corpus.jsonl --anterior corpus.jsonl.resultados.jsonl
+                                                    # Clasificar sólo lo que cambió
+  python main.py --reentrenar                       # Reentrenar el modelo local
+  python main.py --spool /var/spool/clasificador    # Clasificar los archivos que lleguen
+  python main.py --coordinar corpus.jsonl           # Repartir un corpus entre máquinas
+  python main.py --trabajar coordinador:8765        # Trabajar para un coordinador
+  python main.py --comparar casos --configuracion actual --configuracion reglas:reglas
+                                                    # Comparar configuraciones
+  python main.py --consultar-historial --desde 7d   # Totales de la última semana por modelo
+  python main.py --buscar-historial "AWS Lambda"    # Clasificaciones anteriores de un texto
         """
     )
     
@@ -108,6 +531,158 @@ Ejemplos de uso:
         help='Ejecutar demostración completa'
     )
     
+    grupo_modos.add_argument(
+        '--archivo',
+        type=str,
+        help='Archivo de texto o JSONL a clasificar por lotes (un registro por línea)'
+    )
+    
+    grupo_modos.add_argument(
+        '--reentrenar',
+        action='store_true',
+        help='Reentrenar el modelo local con las etiquetas registradas del LLM'
+    )
+    
+    grupo_modos.add_argument(
+        '--spool',
+        type=str,
+        help='Directorio a vigilar: clasifica de forma continua los archivos JSONL que aparecen'
+    )
+    
+    grupo_modos.add_argument(
+        '--coordinar',
+        type=str,
+        help='Archivo a repartir en fragmentos entre trabajadores remotos'
+    )
+    
+    grupo_modos.add_argument(
+        '--trabajar',
+        type=str,
+        metavar='HOST:PUERTO',
+        help='Clasificar fragmentos para el coordinador indicado'
+    )
+    
+    grupo_modos.add_argument(
+        '--comparar',
+        type=str,
+        metavar='CONJUNTO',
+        help='Comparar configuraciones sobre un JSONL etiquetado (o "casos" para los casos de prueba)'
+    )
+    
+    grupo_modos.add_argument(
+        '--consultar-historial',
+        action='store_true',
+        help='Mostrar los totales del historial de clasificaciones (ver --desde, --hasta y --agrupar)'
+    )
+    
+    grupo_modos.add_argument(
+        '--buscar-historial',
+        type=str,
+        metavar='TEXTO',
+        help='Mostrar las clasificaciones anteriores de un texto'
+    )
+    
+    parser.add_argument(
+        '--historial',
+        type=str,
+        metavar='RUTA',
+        help='Base SQLite del historial de clasificaciones (sustituye a HISTORY_PATH)'
+    )
+    
+    parser.add_argument(
+        '--desde',
+        type=str,
+        help='Inicio del intervalo consultado: fecha ISO o antigüedad como 7d o 12h'
+    )
+    
+    parser.add_argument(
+        '--hasta',
+        type=str,
+        help='Fin (exclusivo) del intervalo consultado: fecha ISO o antigüedad'
+    )
+    
+    parser.add_argument(
+        '--agrupar',
+        choices=['modelo', 'metodo', 'modelo_llm', 'huella', 'dia', 'hora'],
+        default='modelo',
+        help='Campo por el que se agrupan los totales del historial'
+    )
+    
+    parser.add_argument(
+        '--configuracion',
+        action='append',
+        metavar='NOMBRE[:MOTOR[:VARIABLE=valor,...]]',
+        help='Configuración a comparar (se puede repetir); motor: clasificador, llm, reglas o local'
+    )
+    
+    parser.add_argument(
+        '--concurrencia',
+        type=int,
+        default=1,
+        help='Textos clasificados a la vez en cada configuración comparada'
+    )
+    
+    parser.add_argument(
+        '--host',
+        type=str,
+        default='127.0.0.1',
+        help='Interfaz en la que el coordinador escucha (0.0.0.0 para todas; '
+             'conviene fijar DISTRIBUTED_TOKEN)'
+    )
+    
+    parser.add_argument(
+        '--puerto',
+        type=int,
+        default=8765,
+        help='Puerto en el que el coordinador escucha a los trabajadores'
+    )
+    
+    parser.add_argument(
+        '--tamano-fragmento',
+        type=int,
+        default=1000,
+        help='Registros por fragmento del modo distribuido'
+    )
+    
+    parser.add_argument(
+        '--intervalo',
+        type=float,
+        default=2.0,
+        help='Segundos entre dos revisiones del directorio de spool vacío'
+    )
+    
+    parser.add_argument(
+        '--salida',
+        type=str,
+        help='Archivo JSONL de resultados del modo por lotes (o JSON del informe de --comparar)'
+    )
+    
+    parser.add_argument(
+        '--inicio',
+        type=int,
+        default=0,
+        help='Primer registro a clasificar en el modo por lotes'
+    )
+    
+    parser.add_argument(
+        '--fin',
+        type=int,
+        help='Registro final (exclusivo) a clasificar en el modo por lotes'
+    )
+    
+    parser.add_argument(
+        '--reanudar',
+        action='store_true',
+        help='Continuar un trabajo por lotes interrumpido usando su diario de progreso'
+    )
+    
+    parser.add_argument(
+        '--anterior',
+        type=str,
+        help='Resultados de un trabajo previo: sólo se clasifican los registros nuevos, '
+             'modificados o con otra instrucción, modelo o temperatura'
+    )
+    
     parser.add_argument(
         '--version',
         action='version',
@@ -127,10 +702,40 @@ def main():
         modo_interactivo()
         return
     
+    if args.historial:
+        os.environ['HISTORY_PATH'] = args.historial
+    
     # Procesar argumentos
     if args.demo:
         modo_demo()
     
+    elif args.reentrenar:
+        modo_reentrenar()
+    
+    elif args.spool:
+        modo_spool(args.spool, intervalo=args.intervalo)
+    
+    elif args.consultar_historial:
+        modo_consultar_historial(args.agrupar, desde=args.desde, hasta=args.hasta)
+    
+    elif args.buscar_historial:
+        modo_buscar_historial(args.buscar_historial)
+    
+    elif args.comparar:
+        modo_comparar(args.comparar, args.configuracion, ruta_salida=args.salida,
+                      concurrencia=args.concurrencia)
+    
+    elif args.coordinar:
+        modo_coordinar(args.coordinar, args.salida, puerto=args.puerto,
+                       tamano_fragmento=args.tamano_fragmento, host=args.host)
+    
+    elif args.trabajar:
+        modo_trabajar(args.trabajar)
+    
+    elif args.archivo:
+        modo_lote(args.archivo, args.salida, inicio=args.inicio, fin=args.fin,
+                  reanudar=args.reanudar, ruta_anterior=args.anterior)
+    
     elif args.texto:
         print("🤖 CLASIFICADOR DE MODELOS DE NUBE CON NLP")
         print("=" * 60)
@@ -53,6 +53,7 @@ setup(
             "pytest-cov>=4.1.0,<5.0.0",
             "pytest-html>=3.2.0,<4.0.0",
             "pytest-benchmark>=4.0.0,<5.0.0",
+            "pytest-xdist>=3.3.0,<4.0.0",
             "flake8>=6.0.0,<7.0.0",
             "black>=23.0.0,<24.0.0",
             "mypy>=1.5.0,<2.0.0",
@@ -65,6 +66,7 @@ setup(
             "pytest>=7.4.0,<8.0.0",
             "pytest-cov>=4.1.0,<5.0.0",
             "pytest-html>=3.2.0,<4.0.0",
+            "pytest-xdist>=3.3.0,<4.0.0",
         ],
     },
     entry_points={
@@ -3,11 +3,12 @@ Paquete principal del clasificador de modelos de nube.
 """
 
 from .clasificador import ClasificadorModelosNube
-from .modelos import ResultadoClasificacion
+from .modelos import ResultadoClasificacion, LoteResultados
 from .configuracion import Configuracion
 
 __all__ = [
     'ClasificadorModelosNube',
     'ResultadoClasificacion',
+    'LoteResultados',
     'Configuracion'
 ]
@@ -0,0 +1,195 @@
+"""
+Balanceo de carga entre varios backends compatibles con la API de OpenAI/OpenRouter.
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+
+# Códigos HTTP que indican saturación o fallo temporal del backend
+CODIGOS_RECUPERABLES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class Backend:
+    """
+    Par clave/endpoint al que se pueden enviar peticiones de clasificación.
+
+    Attributes:
+        url: URL del endpoint de chat completions
+        clave: Clave API (vacía para endpoints propios sin autenticación)
+        peso: Peso relativo en el reparto de peticiones
+        nombre: Nombre para los reportes (por defecto, la URL)
+    """
+    url: str
+    clave: str = ''
+    peso: float = 1.0
+    nombre: str = ''
+
+    # Estado en ejecución
+    latencia_media: Optional[float] = field(default=None, repr=False)
+    en_vuelo: int = field(default=0, repr=False)
+    expulsado_hasta: float = field(default=0.0, repr=False)
+    fallos_consecutivos: int = field(default=0, repr=False)
+    peticiones: int = field(default=0, repr=False)
+    exitos: int = field(default=0, repr=False)
+    errores: int = field(default=0, repr=False)
+    expulsiones: int = field(default=0, repr=False)
+
+    def __post_init__(self):
+        if not self.nombre:
+            self.nombre = self.url
+
+
+class PoolBackends:
+    """
+    Reparte las peticiones entre varios backends.
+
+    La selección es aleatoria ponderada por ``peso / (latencia * (1 + en_vuelo))``,
+    de modo que los backends más rápidos y menos cargados reciben más tráfico.
+    Un backend que responde 429/5xx o falla la conexión se expulsa temporalmente;
+    el tiempo de expulsión se duplica con cada fallo consecutivo.
+    """
+
+    def __init__(self, backends: List[Backend], tiempo_expulsion: float = 30.0,
+                 tiempo_expulsion_maximo: float = 600.0, suavizado_latencia: float = 0.2):
+        """
+        Inicializa el pool.
+
+        Args:
+            backends: Backends disponibles
+            tiempo_expulsion: Segundos que se expulsa un backend tras su primer fallo
+            tiempo_expulsion_maximo: Límite del tiempo de expulsión
+            suavizado_latencia: Factor de la media móvil exponencial de latencia
+        """
+        if not backends:
+            raise ValueError("El pool necesita al menos un backend")
+
+        self.backends = backends
+        self.tiempo_expulsion = tiempo_expulsion
+        self.tiempo_expulsion_maximo = tiempo_expulsion_maximo
+        self.suavizado_latencia = suavizado_latencia
+        self._bloqueo = threading.Lock()
+        self._aleatorio = random.Random()
+        self._inicio = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.backends)
+
+    def seleccionar(self, excluir: Sequence[Backend] = ()) -> Backend:
+        """
+        Elige el backend para la siguiente petición.
+
+        Si todos están expulsados, se elige el que vuelve antes. Los backends
+        de ``excluir`` (los ya intentados para la misma petición) sólo se
+        eligen si no queda ningún otro.
+
+        Args:
+            excluir: Backends que no se deben repetir
+
+        Returns:
+            Backend: Backend elegido (ya contado como petición en vuelo)
+        """
+        ahora = time.monotonic()
+
+        with self._bloqueo:
+            candidatos = [
+                b for b in self.backends if not any(b is excluido for excluido in excluir)
+            ] or self.backends
+            disponibles = [b for b in candidatos if b.expulsado_hasta <= ahora]
+
+            if not disponibles:
+                elegido = min(candidatos, key=lambda b: b.expulsado_hasta)
+            else:
+                # Los backends sin latencia medida usan la media de los demás
+                medidas = [b.latencia_media for b in disponibles if b.latencia_media is not None]
+                referencia = sum(medidas) / len(medidas) if medidas else 1.0
+                pesos = [
+                    b.peso / ((b.latencia_media or referencia) * (1 + b.en_vuelo))
+                    for b in disponibles
+                ]
+                elegido = self._aleatorio.choices(disponibles, weights=pesos)[0]
+
+            elegido.en_vuelo += 1
+            elegido.peticiones += 1
+            return elegido
+
+    def registrar_exito(self, backend: Backend, latencia: float):
+        """
+        Registra una respuesta correcta.
+
+        Args:
+            backend: Backend que respondió
+            latencia: Segundos que tardó la respuesta
+        """
+        with self._bloqueo:
+            backend.en_vuelo -= 1
+            backend.exitos += 1
+            backend.fallos_consecutivos = 0
+            if backend.latencia_media is None:
+                backend.latencia_media = latencia
+            else:
+                backend.latencia_media += self.suavizado_latencia * (latencia - backend.latencia_media)
+
+    def registrar_fallo(self, backend: Backend, codigo_estado: Optional[int] = None):
+        """
+        Registra una respuesta fallida y expulsa el backend si el fallo es temporal.
+
+        Args:
+            backend: Backend que falló
+            codigo_estado: Código HTTP (``None`` si falló la conexión)
+        """
+        with self._bloqueo:
+            backend.en_vuelo -= 1
+            backend.errores += 1
+
+            if codigo_estado is None or codigo_estado in CODIGOS_RECUPERABLES:
+                backend.fallos_consecutivos += 1
+                backend.expulsiones += 1
+                duracion = min(
+                    self.tiempo_expulsion * 2 ** (backend.fallos_consecutivos - 1),
+                    self.tiempo_expulsion_maximo
+                )
+                backend.expulsado_hasta = time.monotonic() + duracion
+
+    def liberar(self, backend: Backend):
+        """
+        Libera una petición en vuelo que falló por un motivo ajeno al backend.
+
+        Cuenta como error pero no expulsa el backend.
+
+        Args:
+            backend: Backend al que se envió la petición
+        """
+        with self._bloqueo:
+            backend.en_vuelo -= 1
+            backend.errores += 1
+
+    def estadisticas(self) -> List[Dict[str, Any]]:
+        """
+        Retorna el rendimiento y los errores de cada backend.
+
+        Returns:
+            List[Dict[str, Any]]: Estadísticas por backend
+        """
+        transcurrido = max(time.monotonic() - self._inicio, 1e-9)
+        ahora = time.monotonic()
+
+        with self._bloqueo:
+            return [
+                {
+                    "nombre": b.nombre,
+                    "peso": b.peso,
+                    "peticiones": b.peticiones,
+                    "exitos": b.exitos,
+                    "errores": b.errores,
+                    "expulsiones": b.expulsiones,
+                    "expulsado": b.expulsado_hasta > ahora,
+                    "latencia_media": b.latencia_media,
+                    "exitos_por_segundo": b.exitos / transcurrido
+                }
+                for b in self.backends
+            ]
@@ -1,5 +1,8 @@
 """
 Módulo que contiene los casos de prueba para el clasificador de modelos de nube.
+
+Se incluyen en el paquete para que ``python main.py --comparar casos`` funcione
+sin el directorio de pruebas.
 """
 
 from typing import List, Dict, Any
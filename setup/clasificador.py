@@ -2,76 +2,220 @@
 Clasificador principal de modelos de nube usando NLP con DeepSeek.
 """
 
+import hashlib
+import json
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import replace
 import requests
-from typing import Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from .backends import Backend, PoolBackends, CODIGOS_RECUPERABLES
 from .configuracion import Configuracion
-from .modelos import ResultadoClasificacion
+from .destilacion import AlmacenEntrenamiento, ModeloLocal, reentrenar
+from .enrutador import EnrutadorModelos
+from .historial import HistorialClasificaciones
+from .planificador import (
+    PlanificadorPeticiones, PeticionExpirada, PRIORIDAD_INTERACTIVA, PRIORIDAD_LOTE, PRIORIDAD_SOMBRA
+)
+from .presupuesto import ContadorUso, ControlPresupuesto, PresupuestoAgotado, registrar_uso_proceso
+from .reglas import MotorReglas, RUTA_REGLAS_POR_DEFECTO
+from .modelos import ETIQUETAS_MODELO, ResultadoClasificacion, LoteResultados
+from .sombra import EvaluadorSombra
 from .utilidades import (
     preprocesar_texto,
     validar_entrada,
     extraer_modelo_de_respuesta,
-    calcular_confianza_de_respuesta
+    calcular_confianza_de_respuesta,
+    estimar_costo,
+    estimar_tokens,
+    sumar_costos,
+    etiqueta_inequivoca,
+    extraer_fragmentos_relevantes,
+    ventanas_relevantes,
+    distribucion_de_logprobs
 )
 
 
+# Plantillas de instrucción para el LLM; ``{texto}`` se sustituye por el texto a clasificar
+PLANTILLAS_INSTRUCCION = {
+    'completa': """Analiza el siguiente texto y determina a qué modelo de servicio en la nube corresponde:
+
+Texto: "{texto}"
+
+Los modelos posibles son:
+- IaaS (Infrastructure as a Service): Servicios de infraestructura como servidores, almacenamiento, redes
+- PaaS (Platform as a Service): Plataformas de desarrollo y despliegue
+- SaaS (Software as a Service): Aplicaciones de software accesibles desde navegador
+- FaaS (Function as a Service): Servicios de funciones sin servidor
+
+Responde únicamente con el modelo correspondiente (IaaS, PaaS, SaaS o FaaS).""",
+    'compacta': 'Clasifica el texto como IaaS, PaaS, SaaS o FaaS. Responde sólo la etiqueta.\n\n'
+                'Texto: "{texto}"'
+}
+
+
+def construir_instruccion(texto: str, plantilla: str = 'completa') -> str:
+    """
+    Construye la instrucción para el LLM.
+    
+    Args:
+        texto: Texto a clasificar
+        plantilla: Nombre de la plantilla en ``PLANTILLAS_INSTRUCCION``
+        
+    Returns:
+        str: Instrucción con el texto insertado
+    """
+    if plantilla not in PLANTILLAS_INSTRUCCION:
+        raise ValueError(f"Plantilla de instrucción desconocida: {plantilla}")
+    return PLANTILLAS_INSTRUCCION[plantilla].replace("{texto}", texto)
+
+
 class ClasificadorModelosNube:
     """Clasificador de modelos de nube usando NLP con DeepSeek."""
     
-    def __init__(self, usar_nlp: bool = True, clave_api: Optional[str] = None):
+    def __init__(self, usar_nlp: bool = True, clave_api: Optional[str] = None,
+                 planificador: Optional[PlanificadorPeticiones] = None,
+                 config: Optional[Configuracion] = None):
         """
         Inicializa el clasificador.
         
         Args:
             usar_nlp: Si usar NLP para clasificación
             clave_api: Clave API personalizada (opcional)
+            planificador: Planificador compartido para las llamadas a la API (opcional)
+            config: Configuración a usar en lugar de la de las variables de entorno (opcional)
         """
         self.usar_nlp = usar_nlp
-        self.config = Configuracion()
+        self.config = config if config is not None else Configuracion()
         
         # Usar clave API personalizada si se proporciona
         if clave_api:
             self.config._clave_api = clave_api
+        
+        # Pool de backends entre los que se reparten las peticiones
+        self.pool = PoolBackends(
+            [Backend(**backend) for backend in self.config.backends],
+            tiempo_expulsion=self.config.tiempo_expulsion_backend
+        )
+        self.sesion = requests.Session()
+        
+        # Enrutamiento entre variantes de DeepSeek (sólo si hay modelo rápido)
+        self.enrutador = None
+        if self.config.modelo_rapido:
+            self.enrutador = EnrutadorModelos(
+                self.config.modelo_rapido,
+                self.config.modelo_fuerte,
+                longitud_maxima_rapida=self.config.longitud_maxima_ruta_rapida,
+                confianza_escalado=self.config.confianza_escalado
+            )
+        
+        # Planificador con prioridades delante de las llamadas a la API
+        self.planificador = planificador
+        if self.planificador is None and self.config.trabajadores_planificador > 0:
+            self.planificador = PlanificadorPeticiones(
+                trabajadores=self.config.trabajadores_planificador,
+                trabajadores_reservados=self.config.trabajadores_reservados_planificador
+            )
+        
+        # Uso de tokens y costo de este clasificador, y presupuesto opcional
+        self.uso = ContadorUso()
+        self.presupuesto = None
+        if self.config.presupuesto_tokens > 0 or self.config.presupuesto_costo > 0:
+            self.presupuesto = ControlPresupuesto(
+                self.uso,
+                limite_tokens=self.config.presupuesto_tokens,
+                limite_costo=self.config.presupuesto_costo,
+                umbral=self.config.umbral_presupuesto,
+                accion=self.config.accion_presupuesto,
+                modelo_degradado=self.config.modelo_presupuesto,
+                pausa=self.config.pausa_presupuesto,
+                precios=self.config.precios_modelos
+            )
+        
+        # Preclasificador por productos y frases clave
+        self.reglas = None
+        if self.config.usar_reglas:
+            self.reglas = MotorReglas.desde_archivo(
+                self.config.ruta_reglas or RUTA_REGLAS_POR_DEFECTO,
+                confianza=self.config.confianza_reglas
+            )
+        
+        # Destilación: registro de etiquetas del LLM y modelo local que las aprende
+        self.almacen_entrenamiento = None
+        if self.config.ruta_almacen_entrenamiento:
+            self.almacen_entrenamiento = AlmacenEntrenamiento(self.config.ruta_almacen_entrenamiento)
+        self.modelo_local: Optional[ModeloLocal] = None
+        self._firma_modelo_local = None
+        self._ultima_revision_modelo_local = 0.0
+        self.recargar_modelo_local()
+        
+        # Modo sombra: réplica de una fracción de las llamadas en una configuración candidata
+        self.sombra: Optional[EvaluadorSombra] = None
+        if self.config.fraccion_sombra > 0:
+            candidato, descripcion = self.crear_motor(
+                self.config.motor_sombra,
+                modelo_llm=self.config.modelo_sombra,
+                plantilla=self.config.plantilla_sombra,
+                sombra=True
+            )
+            self.sombra = EvaluadorSombra(
+                candidato,
+                fraccion=self.config.fraccion_sombra,
+                capacidad=self.config.capacidad_sombra,
+                descripcion=descripcion
+            )
+        
+        # Historial consultable de las clasificaciones
+        self.historial: Optional[HistorialClasificaciones] = None
+        if self.config.ruta_historial:
+            self.historial = HistorialClasificaciones(self.config.ruta_historial)
     
-    def clasificar_con_nlp(self, texto: str) -> ResultadoClasificacion:
+    def clasificar_con_nlp(self, texto: str, modelo_llm: Optional[str] = None,
+                           prioridad: str = PRIORIDAD_INTERACTIVA,
+                           plazo: Optional[float] = None,
+                           transmitir: Optional[bool] = None,
+                           plantilla: Optional[str] = None,
+                           sombra: bool = False,
+                           temperatura: Optional[float] = None) -> ResultadoClasificacion:
         """
         Clasifica el texto usando NLP con DeepSeek.
         
         Args:
             texto: Texto a clasificar
+            modelo_llm: Modelo a usar en lugar de DEEPSEEK_MODEL (opcional)
+            prioridad: Clase de prioridad de la llamada en el planificador
+            plazo: Segundos máximos de espera en el planificador (opcional)
+            transmitir: Si pedir la respuesta transmitida y cortarla en cuanto
+                se conoce la etiqueta (por defecto, STREAMING)
+            plantilla: Plantilla de instrucción (por defecto, PROMPT_TEMPLATE)
+            sombra: Si es una llamada del modo sombra, que no pasa por el
+                presupuesto ni cuenta en el uso de este clasificador
+            temperatura: Temperatura en lugar de TEMPERATURE (opcional)
             
         Returns:
             ResultadoClasificacion: Resultado de la clasificación
+            
+        Raises:
+            PresupuestoAgotado: Si el presupuesto configurado no permite la llamada
+            PeticionExpirada: Si la llamada no pudo enviarse dentro del plazo
         """
         texto_procesado = preprocesar_texto(texto)
         
+        # El presupuesto puede cambiar el modelo o rechazar la llamada
+        modelo = modelo_llm or self.config.modelo
+        if self.presupuesto is not None and not sombra:
+            modelo = self.presupuesto.autorizar(modelo)
+        
         try:
             # Configurar la petición a la API
-            clave_api = self.config.clave_api
-            url_api = self.config.url_api
-            modelo = self.config.modelo
             max_tokens = self.config.max_tokens
-            temperature = self.config.temperature
-            
-            if not clave_api:
-                raise ValueError("No se encontró la clave API de OpenRouter")
+            temperature = self.config.temperature if temperatura is None else temperatura
+            if transmitir is None:
+                transmitir = self.config.usar_streaming
             
-            # Preparar la petición
-            encabezados = {
-                'Authorization': f'Bearer {clave_api}',
-                'Content-Type': 'application/json'
-            }
-            
-            instruccion = f"""Analiza el siguiente texto y determina a qué modelo de servicio en la nube corresponde:
-
-Texto: "{texto}"
-
-Los modelos posibles son:
-- IaaS (Infrastructure as a Service): Servicios de infraestructura como servidores, almacenamiento, redes
-- PaaS (Platform as a Service): Plataformas de desarrollo y despliegue
-- SaaS (Software as a Service): Aplicaciones de software accesibles desde navegador
-- FaaS (Function as a Service): Servicios de funciones sin servidor
-
-Responde únicamente con el modelo correspondiente (IaaS, PaaS, SaaS o FaaS)."""
+            instruccion = construir_instruccion(texto, plantilla or self.config.plantilla_instruccion)
 
             datos_peticion = {
                 "model": modelo,
@@ -81,15 +225,18 @@ Responde únicamente con el modelo correspondiente (IaaS, PaaS, SaaS o FaaS)."""
                 "max_tokens": max_tokens,
                 "temperature": temperature
             }
+            if transmitir:
+                datos_peticion["stream"] = True
+            if self.config.usar_logprobs:
+                datos_peticion["logprobs"] = True
+                datos_peticion["top_logprobs"] = self.config.top_logprobs
             
             # Realizar la petición
-            respuesta = requests.post(url_api, json=datos_peticion, headers=encabezados)
-            
-            if respuesta.status_code != 200:
-                raise Exception(f"Error en la API: {respuesta.status_code}")
+            inicio = time.perf_counter()
+            datos_respuesta = self._enviar_peticion(datos_peticion, prioridad=prioridad, plazo=plazo)
+            latencia = time.perf_counter() - inicio
             
             # Procesar la respuesta
-            datos_respuesta = respuesta.json()
             contenido_respuesta = datos_respuesta['choices'][0]['message']['content']
             
             # Extraer el modelo y calcular confianza
@@ -97,12 +244,42 @@ Responde únicamente con el modelo correspondiente (IaaS, PaaS, SaaS o FaaS)."""
             confianza = calcular_confianza_de_respuesta(contenido_respuesta)
             
             # Crear puntajes (simplificado para respuestas de DeepSeek)
-            puntajes = {
-                'IaaS': 1.0 if modelo_extraido == 'IaaS' else 0.0,
-                'PaaS': 1.0 if modelo_extraido == 'PaaS' else 0.0,
-                'SaaS': 1.0 if modelo_extraido == 'SaaS' else 0.0,
-                'FaaS': 1.0 if modelo_extraido == 'FaaS' else 0.0
+            puntajes = self._crear_puntajes(modelo_extraido)
+            
+            # Con logprobs, los puntajes y la confianza salen de la probabilidad
+            # del token de la etiqueta; sin ellos se mantienen los heurísticos
+            distribucion = None
+            if self.config.usar_logprobs:
+                distribucion = distribucion_de_logprobs(
+                    (datos_respuesta['choices'][0].get('logprobs') or {}).get('content')
+                )
+            if distribucion is not None and modelo_extraido in distribucion:
+                puntajes = distribucion
+                confianza = distribucion[modelo_extraido]
+            else:
+                distribucion = None
+            
+            # Uso de tokens informado por la API (si lo incluye)
+            uso = datos_respuesta.get('usage') or {}
+            tokens_entrada = uso.get('prompt_tokens', 0)
+            tokens_salida = uso.get('completion_tokens', 0)
+            metricas = {
+                "modelo_llm": modelo,
+                "latencia": latencia,
+                "tokens_entrada": tokens_entrada,
+                "tokens_salida": tokens_salida,
+                "costo": estimar_costo(
+                    tokens_entrada, tokens_salida, self.config.precios_modelos.get(modelo)
+                )
             }
+            if uso.get('estimado'):
+                metricas["uso_estimado"] = True
+            if distribucion is not None:
+                metricas["puntajes_logprobs"] = True
+            metricas.update(datos_respuesta.get('transmision', {}))
+            if not sombra:
+                self.uso.registrar(metricas)
+            registrar_uso_proceso(metricas)
             
             return ResultadoClasificacion(
                 modelo=modelo_extraido,
@@ -110,30 +287,304 @@ Responde únicamente con el modelo correspondiente (IaaS, PaaS, SaaS o FaaS)."""
                 puntajes=puntajes,
                 texto_original=texto,
                 texto_procesado=texto_procesado,
-                metodo="deepseek_nlp"
+                metodo="deepseek_nlp",
+                metricas=metricas
             )
             
+        except PeticionExpirada:
+            # Quien fijó el plazo debe distinguirlo de un fallo de la API
+            raise
         except Exception as e:
             # En caso de error, retornar resultado de error
-            return ResultadoClasificacion(
-                modelo="Error",
-                confianza=0.0,
-                puntajes={'IaaS': 0.0, 'PaaS': 0.0, 'SaaS': 0.0, 'FaaS': 0.0},
-                texto_original=texto,
-                texto_procesado=texto_procesado,
-                metodo="error"
-            )
+            return self._crear_resultado_error(texto, texto_procesado)
+    
+    def _enviar_peticion(self, datos_peticion: Dict[str, Any],
+                         prioridad: str = PRIORIDAD_INTERACTIVA,
+                         plazo: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Envía la petición, pasando por el planificador si está configurado.
+        
+        Args:
+            datos_peticion: Cuerpo JSON de la petición de chat completions
+            prioridad: Clase de prioridad de la llamada
+            plazo: Segundos máximos de espera antes de descartarla (opcional)
+            
+        Returns:
+            Dict[str, Any]: Cuerpo JSON de la respuesta
+        """
+        if self.planificador is None:
+            return self._enviar_a_backends(datos_peticion)
+        
+        return self.planificador.ejecutar(
+            self._enviar_a_backends, datos_peticion, prioridad=prioridad, plazo=plazo
+        )
     
-    def clasificar(self, texto: str) -> ResultadoClasificacion:
+    def _enviar_a_backends(self, datos_peticion: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Envía la petición a uno de los backends del pool.
+        
+        Si el backend responde 429/5xx, falla la conexión o envía una respuesta
+        ilegible, se expulsa temporalmente y se reintenta con otro, hasta una
+        vez por backend.
+        
+        Args:
+            datos_peticion: Cuerpo JSON de la petición de chat completions
+            
+        Returns:
+            Dict[str, Any]: Cuerpo JSON de la respuesta
+        """
+        ultimo_error: Exception = Exception("Ningún backend respondió")
+        intentados: List[Backend] = []
+        
+        for _ in range(len(self.pool)):
+            backend = self.pool.seleccionar(excluir=intentados)
+            intentados.append(backend)
+            registrado = False
+            try:
+                if not backend.clave and 'openrouter.ai' in backend.url:
+                    self.pool.registrar_fallo(backend, 401)
+                    registrado = True
+                    raise ValueError("No se encontró la clave API de OpenRouter")
+                
+                encabezados = {'Content-Type': 'application/json'}
+                if backend.clave:
+                    encabezados['Authorization'] = f'Bearer {backend.clave}'
+                
+                transmitir = bool(datos_peticion.get("stream"))
+                inicio = time.perf_counter()
+                try:
+                    respuesta = self.sesion.post(backend.url, json=datos_peticion,
+                                                 headers=encabezados, stream=transmitir)
+                    if respuesta.status_code == 200:
+                        datos_respuesta = (
+                            self._leer_transmision(respuesta, inicio, datos_peticion)
+                            if transmitir else respuesta.json()
+                        )
+                except (requests.RequestException, ValueError) as e:
+                    # ValueError: cuerpo o evento SSE que no es JSON válido
+                    self.pool.registrar_fallo(backend)
+                    registrado = True
+                    ultimo_error = e
+                    continue
+                
+                if respuesta.status_code == 200:
+                    self.pool.registrar_exito(backend, time.perf_counter() - inicio)
+                    registrado = True
+                    return datos_respuesta
+                
+                respuesta.close()
+                self.pool.registrar_fallo(backend, respuesta.status_code)
+                registrado = True
+                ultimo_error = Exception(f"Error en la API: {respuesta.status_code}")
+                if respuesta.status_code not in CODIGOS_RECUPERABLES:
+                    break
+            finally:
+                # Cualquier otra excepción también libera la petición en vuelo
+                if not registrado:
+                    self.pool.liberar(backend)
+        
+        raise ultimo_error
+    
+    def _leer_transmision(self, respuesta: requests.Response, inicio: float,
+                          datos_peticion: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Lee una respuesta transmitida (SSE) y la corta en cuanto la etiqueta es inequívoca.
+        
+        Args:
+            respuesta: Respuesta HTTP abierta en modo stream
+            inicio: Instante (perf_counter) en que se envió la petición
+            datos_peticion: Cuerpo de la petición, para estimar el uso si se corta
+                antes de que llegue el bloque ``usage``
+            
+        Returns:
+            Dict[str, Any]: Respuesta con el mismo formato que la no transmitida,
+            más los tiempos de la transmisión en ``transmision``
+            
+        Raises:
+            ValueError: Si un evento no es un objeto JSON válido
+        """
+        contenido = ''
+        fragmentos = 0
+        uso = None
+        tiempo_primer_token = None
+        tiempo_etiqueta = None
+        logprobs = []
+        
+        try:
+            for linea in respuesta.iter_lines(decode_unicode=True):
+                # Las líneas que empiezan con ':' son comentarios de keep-alive
+                if not linea or not linea.startswith('data:'):
+                    continue
+                
+                dato = linea[len('data:'):].strip()
+                if dato == '[DONE]':
+                    break
+                
+                evento = json.loads(dato)
+                if not isinstance(evento, dict):
+                    raise ValueError(f"Evento SSE inválido: {dato[:80]}")
+                uso = evento.get('usage') or uso
+                opciones = evento.get('choices') or []
+                if opciones:
+                    logprobs.extend((opciones[0].get('logprobs') or {}).get('content') or [])
+                fragmento = (opciones[0].get('delta') or {}).get('content') if opciones else None
+                if not fragmento:
+                    continue
+                
+                fragmentos += 1
+                if tiempo_primer_token is None:
+                    tiempo_primer_token = time.perf_counter() - inicio
+                contenido += fragmento
+                
+                if etiqueta_inequivoca(contenido):
+                    tiempo_etiqueta = time.perf_counter() - inicio
+                    break
+        finally:
+            # Cerrar la conexión deja de generar (y cobrar) tokens de salida
+            respuesta.close()
+        
+        mensaje = {"message": {"role": "assistant", "content": contenido}}
+        if logprobs:
+            mensaje["logprobs"] = {"content": logprobs}
+        
+        if not uso:
+            # Cortada antes del bloque de uso: el prompt se estima por su longitud y
+            # cada fragmento cuenta como un token de salida
+            uso = {
+                "prompt_tokens": sum(
+                    estimar_tokens(m.get('content') or '') for m in datos_peticion.get('messages', [])
+                ),
+                "completion_tokens": fragmentos,
+                "estimado": True
+            }
+        
+        return {
+            "choices": [mensaje],
+            "usage": uso,
+            "transmision": {
+                "tiempo_primer_token": tiempo_primer_token,
+                "tiempo_etiqueta": tiempo_etiqueta,
+                "terminacion_anticipada": tiempo_etiqueta is not None
+            }
+        }
+    
+    def huella_configuracion(self) -> str:
+        """
+        Retorna la huella de la instrucción, los modelos y la temperatura con que se clasifica.
+        
+        Un resultado anterior con otra huella se considera obsoleto y se
+        vuelve a clasificar en el modo incremental.
+        
+        Returns:
+            str: Huella hexadecimal de 16 caracteres
+        """
+        modelos = [self.config.modelo]
+        if self.enrutador:
+            modelos = [self.enrutador.modelo_rapido, self.enrutador.modelo_fuerte]
+        
+        datos = json.dumps({
+            "instruccion": PLANTILLAS_INSTRUCCION[self.config.plantilla_instruccion],
+            "modelos": modelos,
+            "temperatura": self.config.temperature
+        }, sort_keys=True)
+        return hashlib.sha256(datos.encode('utf-8')).hexdigest()[:16]
+    
+    def registrar_historial(self, resultados: Iterable[ResultadoClasificacion]) -> int:
+        """
+        Añade resultados al historial con la huella de la configuración actual.
+        
+        Args:
+            resultados: Resultados a guardar
+            
+        Returns:
+            int: Filas añadidas (0 si el historial está desactivado)
+        """
+        if self.historial is None:
+            return 0
+        return self.historial.registrar(resultados, huella=self.huella_configuracion())
+    
+    def estadisticas_uso(self) -> Dict[str, Any]:
+        """
+        Retorna los tokens y el costo acumulados por este clasificador.
+        
+        Returns:
+            Dict[str, Any]: Llamadas, tokens, costo y, si hay, estado del presupuesto
+        """
+        uso = self.uso.instantanea()
+        uso["presupuesto"] = self.presupuesto.estado() if self.presupuesto is not None else None
+        return uso
+    
+    def estadisticas_backends(self) -> List[Dict[str, Any]]:
+        """
+        Retorna el rendimiento y los errores de cada backend.
+        
+        Returns:
+            List[Dict[str, Any]]: Estadísticas por backend
+        """
+        return self.pool.estadisticas()
+    
+    def _crear_puntajes(self, modelo_extraido: str) -> dict:
+        """
+        Crea los puntajes one-hot para el modelo extraído.
+        
+        Args:
+            modelo_extraido: Modelo devuelto por DeepSeek
+            
+        Returns:
+            dict: Puntaje de cada modelo de nube
+        """
+        return {
+            'IaaS': 1.0 if modelo_extraido == 'IaaS' else 0.0,
+            'PaaS': 1.0 if modelo_extraido == 'PaaS' else 0.0,
+            'SaaS': 1.0 if modelo_extraido == 'SaaS' else 0.0,
+            'FaaS': 1.0 if modelo_extraido == 'FaaS' else 0.0
+        }
+    
+    def _crear_resultado_error(self, texto: str, texto_procesado: str) -> ResultadoClasificacion:
+        """
+        Crea el resultado que se devuelve cuando la clasificación falla.
+        
+        Args:
+            texto: Texto original
+            texto_procesado: Texto preprocesado
+            
+        Returns:
+            ResultadoClasificacion: Resultado con modelo "Error"
+        """
+        return ResultadoClasificacion(
+            modelo="Error",
+            confianza=0.0,
+            puntajes={'IaaS': 0.0, 'PaaS': 0.0, 'SaaS': 0.0, 'FaaS': 0.0},
+            texto_original=texto,
+            texto_procesado=texto_procesado,
+            metodo="error"
+        )
+    
+    def clasificar(self, texto: str, prioridad: str = PRIORIDAD_INTERACTIVA,
+                   plazo: Optional[float] = None,
+                   usar_modelo_local: bool = True) -> ResultadoClasificacion:
         """
         Clasifica el texto usando el método configurado.
         
         Args:
             texto: Texto a clasificar
+            prioridad: Clase de prioridad de las llamadas a la API
+            plazo: Segundos máximos de espera en el planificador (opcional)
+            usar_modelo_local: Si probar antes las reglas y el modelo local destilado
+                (False cuando ya se probaron, por ejemplo en otro proceso)
             
         Returns:
             ResultadoClasificacion: Resultado de la clasificación
+            
+        Raises:
+            PeticionExpirada: Si con ``plazo`` la llamada a la API no pudo enviarse a tiempo
         """
+        # Los textos demasiado largos se tratan como documentos si está habilitado
+        if (self.config.modo_documento_largo and isinstance(texto, str)
+                and len(texto.strip()) > self.config.longitud_maxima_texto):
+            return self.clasificar_documento_largo(texto, prioridad=prioridad, plazo=plazo,
+                                                   usar_modelo_local=usar_modelo_local)
+        
         # Validar entrada
         es_valido, mensaje_error = validar_entrada(
             texto, 
@@ -146,7 +597,592 @@ Responde únicamente con el modelo correspondiente (IaaS, PaaS, SaaS o FaaS)."""
         
         # Usar NLP si está habilitado
         if self.usar_nlp:
-            return self.clasificar_con_nlp(texto)
+            inicio = time.perf_counter()
+            resultado = None
+            if usar_modelo_local:
+                resultado = self.clasificar_con_reglas(texto) or self.clasificar_localmente(texto)
+            
+            if resultado is None:
+                if self.enrutador:
+                    resultado = self.clasificar_con_enrutamiento(texto, prioridad=prioridad, plazo=plazo)
+                else:
+                    resultado = self.clasificar_con_nlp(texto, prioridad=prioridad, plazo=plazo)
+                
+                # Los resultados dudosos se confirman por votación entre varias muestras
+                if (self.config.muestras_votacion > 1 and resultado.modelo != "Error"
+                        and resultado.confianza < self.config.confianza_votacion):
+                    resultado = self.clasificar_por_votacion(texto, primer_voto=resultado,
+                                                             prioridad=prioridad, plazo=plazo)
+                
+                if self.almacen_entrenamiento is not None:
+                    self.almacen_entrenamiento.registrar(resultado)
+            
+            if self.sombra is not None and not self._presupuesto_en_umbral():
+                self.sombra.observar(texto, resultado, time.perf_counter() - inicio)
+            return resultado
         else:
             # Fallback a método básico (no implementado en esta versión)
             raise NotImplementedError("El modo sin NLP no está implementado")
+    
+    def es_entrada_valida(self, texto: str) -> bool:
+        """
+        Indica si ``clasificar`` aceptaría el texto (incluidos los documentos largos si están habilitados).
+        
+        Args:
+            texto: Texto a comprobar
+            
+        Returns:
+            bool: True si el texto es válido
+        """
+        longitud_maxima = (self.config.longitud_maxima_documento if self.config.modo_documento_largo
+                           else self.config.longitud_maxima_texto)
+        return validar_entrada(texto, self.config.longitud_minima_texto, longitud_maxima)[0]
+    
+    def clasificar_con_reglas(self, texto: str) -> Optional[ResultadoClasificacion]:
+        """
+        Intenta clasificar el texto con el motor de reglas de productos y frases.
+        
+        Args:
+            texto: Texto a clasificar
+            
+        Returns:
+            Optional[ResultadoClasificacion]: Resultado si las frases encontradas
+            indican un único modelo, o None para seguir con los demás métodos
+        """
+        if self.reglas is None:
+            return None
+        
+        texto_procesado = preprocesar_texto(texto)
+        prediccion = self.reglas.predecir(texto_procesado)
+        if prediccion is None:
+            return None
+        
+        modelo, confianza, puntajes, frases = prediccion
+        return ResultadoClasificacion(
+            modelo=modelo,
+            confianza=confianza,
+            puntajes=puntajes,
+            texto_original=texto,
+            texto_procesado=texto_procesado,
+            metodo="reglas",
+            metricas={"reglas": frases}
+        )
+    
+    def crear_motor(self, motor: str, modelo_llm: Optional[str] = None,
+                    plantilla: Optional[str] = None, sombra: bool = False):
+        """
+        Crea una función que clasifica con un solo motor, sin la cascada de ``clasificar``.
+        
+        Sirve para el candidato del modo sombra y para comparar motores. Los
+        textos que las reglas o el modelo local no resuelven se responden
+        como "No determinado".
+        
+        Args:
+            motor: ``llm``, ``reglas`` o ``local``
+            modelo_llm: Modelo del motor ``llm`` (por defecto, DEEPSEEK_MODEL)
+            plantilla: Plantilla de instrucción del motor ``llm`` (por defecto, PROMPT_TEMPLATE)
+            sombra: Si las llamadas al LLM son del modo sombra (ver ``clasificar_con_nlp``)
+            
+        Returns:
+            Tuple[Callable[[str], ResultadoClasificacion], str]: Función y descripción del motor
+        """
+        if motor in ('reglas', 'local'):
+            if motor == 'reglas':
+                # Motor propio, para no mezclar sus estadísticas con las del principal
+                reglas = MotorReglas.desde_archivo(
+                    self.config.ruta_reglas or RUTA_REGLAS_POR_DEFECTO,
+                    confianza=self.config.confianza_reglas
+                )
+                predecir, metodo = reglas.predecir, "reglas"
+            else:
+                def predecir(texto_procesado):
+                    modelo_local = self.modelo_local
+                    return modelo_local.predecir(texto_procesado) if modelo_local is not None else None
+                metodo = "modelo_local"
+            
+            def candidato(texto):
+                texto_procesado = preprocesar_texto(texto)
+                prediccion = predecir(texto_procesado)
+                modelo, confianza, puntajes = (prediccion[:3] if prediccion is not None
+                                               else ("No determinado", 0.0, self._crear_puntajes("")))
+                return ResultadoClasificacion(
+                    modelo=modelo,
+                    confianza=confianza,
+                    puntajes=puntajes,
+                    texto_original=texto,
+                    texto_procesado=texto_procesado,
+                    metodo=metodo
+                )
+            
+            return candidato, metodo
+        
+        if motor != 'llm':
+            raise ValueError(f"Motor desconocido: {motor}")
+        
+        modelo_llm = modelo_llm or self.config.modelo
+        plantilla = plantilla or self.config.plantilla_instruccion
+        if plantilla not in PLANTILLAS_INSTRUCCION:
+            raise ValueError(f"Plantilla de instrucción desconocida: {plantilla}")
+        
+        # El modo sombra sólo usa trabajadores ociosos; la comparación, los de lote
+        prioridad = PRIORIDAD_SOMBRA if sombra else PRIORIDAD_LOTE
+        
+        def candidato(texto):
+            return self.clasificar_con_nlp(texto, modelo_llm=modelo_llm, prioridad=prioridad,
+                                           plantilla=plantilla, sombra=sombra)
+        
+        return candidato, f"{modelo_llm} ({plantilla})"
+    
+    def _presupuesto_en_umbral(self) -> bool:
+        """Indica si el presupuesto llegó a su umbral (el modo sombra deja de gastar)."""
+        return self.presupuesto is not None and self.presupuesto.fraccion_usada() >= self.presupuesto.umbral
+    
+    def estadisticas_sombra(self, esperar: float = 0.0) -> Optional[Dict[str, Any]]:
+        """
+        Retorna el informe del modo sombra y lo guarda en SHADOW_REPORT si está definido.
+        
+        Args:
+            esperar: Segundos máximos para que el candidato termine las muestras pendientes
+            
+        Returns:
+            Optional[Dict[str, Any]]: Informe de la comparación (None si está desactivado)
+        """
+        if self.sombra is None:
+            return None
+        
+        self.sombra.esperar(esperar)
+        if self.config.ruta_informe_sombra:
+            return self.sombra.guardar_informe(self.config.ruta_informe_sombra)
+        return self.sombra.informe()
+    
+    def estadisticas_reglas(self) -> Optional[Dict[str, Any]]:
+        """
+        Retorna las consultas resueltas por el motor de reglas y la tasa de cada regla.
+        
+        Returns:
+            Optional[Dict[str, Any]]: Estadísticas del motor (None si está desactivado)
+        """
+        return self.reglas.estadisticas() if self.reglas is not None else None
+    
+    def clasificar_localmente(self, texto: str) -> Optional[ResultadoClasificacion]:
+        """
+        Intenta clasificar el texto con el modelo local destilado.
+        
+        Args:
+            texto: Texto a clasificar
+            
+        Returns:
+            Optional[ResultadoClasificacion]: Resultado si el modelo local tiene
+            suficiente confianza, o None para recurrir al LLM
+        """
+        self._revisar_modelo_local()
+        modelo_local = self.modelo_local
+        
+        if modelo_local is None or modelo_local.total_ejemplos < self.config.ejemplos_minimos_modelo_local:
+            return None
+        
+        texto_procesado = preprocesar_texto(texto)
+        return self.aceptar_prediccion_local(texto, texto_procesado, modelo_local.predecir(texto_procesado))
+    
+    def aceptar_prediccion_local(self, texto: str, texto_procesado: str,
+                                 prediccion) -> Optional[ResultadoClasificacion]:
+        """
+        Convierte una predicción del modelo local en resultado si es aceptable.
+        
+        Sirve para las predicciones hechas fuera de ``clasificar_localmente``
+        (por ejemplo, en varios procesos): se rechazan las entradas inválidas,
+        los modelos con pocos ejemplos y las predicciones con poca confianza.
+        
+        Args:
+            texto: Texto original
+            texto_procesado: Texto preprocesado
+            prediccion: (modelo, confianza, puntajes) de ``ModeloLocal.predecir``, o None
+            
+        Returns:
+            Optional[ResultadoClasificacion]: Resultado, o None para recurrir al LLM
+        """
+        modelo_local = self.modelo_local
+        if prediccion is None or prediccion[1] < self.config.confianza_modelo_local:
+            return None
+        if modelo_local is None or modelo_local.total_ejemplos < self.config.ejemplos_minimos_modelo_local:
+            return None
+        
+        if not self.es_entrada_valida(texto):
+            return None
+        
+        modelo, confianza, puntajes = prediccion
+        return ResultadoClasificacion(
+            modelo=modelo,
+            confianza=confianza,
+            puntajes=puntajes,
+            texto_original=texto,
+            texto_procesado=texto_procesado,
+            metodo="modelo_local"
+        )
+    
+    def recargar_modelo_local(self) -> bool:
+        """
+        Carga (o vuelve a cargar) el modelo local desde LOCAL_MODEL_PATH.
+        
+        El modelo en uso se reemplaza de una vez, sin interrumpir las
+        clasificaciones en curso.
+        
+        Returns:
+            bool: True si se cargó un modelo
+        """
+        ruta = self.config.ruta_modelo_local
+        if not ruta or not os.path.exists(ruta):
+            return False
+        
+        estado = os.stat(ruta)
+        self.modelo_local = ModeloLocal.cargar(ruta)
+        self._firma_modelo_local = (estado.st_mtime_ns, estado.st_size)
+        return True
+    
+    def reentrenar_modelo_local(self) -> Dict[str, Any]:
+        """
+        Reentrena el modelo local con las etiquetas nuevas del almacén y lo pone en uso.
+        
+        Returns:
+            Dict[str, Any]: Ejemplos nuevos y totales del modelo
+        """
+        if not self.config.ruta_almacen_entrenamiento or not self.config.ruta_modelo_local:
+            raise ValueError("Se necesitan DISTILLATION_STORE y LOCAL_MODEL_PATH para reentrenar")
+        
+        resumen = reentrenar(self.config.ruta_almacen_entrenamiento, self.config.ruta_modelo_local)
+        self.recargar_modelo_local()
+        return resumen
+    
+    def _revisar_modelo_local(self, intervalo: float = 5.0):
+        """Recarga el modelo local si otro proceso lo reentrenó (como mucho cada ``intervalo`` s)."""
+        ruta = self.config.ruta_modelo_local
+        ahora = time.monotonic()
+        if not ruta or ahora - self._ultima_revision_modelo_local < intervalo:
+            return
+        self._ultima_revision_modelo_local = ahora
+        
+        try:
+            estado = os.stat(ruta)
+        except OSError:
+            return
+        if (estado.st_mtime_ns, estado.st_size) != self._firma_modelo_local:
+            self.recargar_modelo_local()
+    
+    def clasificar_documento_largo(self, texto: str, fragmentos: Optional[int] = None,
+                                   prioridad: str = PRIORIDAD_INTERACTIVA,
+                                   plazo: Optional[float] = None,
+                                   usar_modelo_local: bool = True) -> ResultadoClasificacion:
+        """
+        Clasifica un documento más largo que MAX_TEXT_LENGTH.
+        
+        Las oraciones se puntúan localmente según su vocabulario de nube y sólo
+        las más relevantes se envían a la API, dentro de LONG_DOCUMENT_TOKEN_BUDGET.
+        Con ``fragmentos`` mayor que 1, se clasifican a la vez las ventanas más
+        relevantes del documento y el resultado es el voto ponderado por confianza.
+        
+        Args:
+            texto: Documento a clasificar
+            fragmentos: Ventanas a clasificar y votar (por defecto LONG_DOCUMENT_CHUNKS)
+            prioridad: Clase de prioridad de las llamadas a la API
+            plazo: Segundos máximos de espera en el planificador (opcional)
+            usar_modelo_local: Si probar antes las reglas y el modelo local destilado
+            
+        Returns:
+            ResultadoClasificacion: Resultado para el documento completo
+        """
+        es_valido, mensaje_error = validar_entrada(
+            texto,
+            self.config.longitud_minima_texto,
+            self.config.longitud_maxima_documento
+        )
+        
+        if not es_valido:
+            raise ValueError(mensaje_error)
+        
+        if usar_modelo_local:
+            resultado = self.clasificar_con_reglas(texto) or self.clasificar_localmente(texto)
+            if resultado is not None:
+                return resultado
+        
+        fragmentos = fragmentos or self.config.fragmentos_documento
+        texto_procesado = preprocesar_texto(texto)
+        presupuesto = self.config.presupuesto_tokens_documento
+        longitud_maxima = self.config.longitud_maxima_texto
+        
+        if fragmentos <= 1:
+            extracto = extraer_fragmentos_relevantes(texto, presupuesto, longitud_maxima)
+            resultado = self.clasificar_con_nlp(extracto, prioridad=prioridad, plazo=plazo)
+            if resultado.modelo == "Error":
+                return self._crear_resultado_error(texto, texto_procesado)
+            
+            metricas = dict(resultado.metricas or {})
+            metricas["longitud_extracto"] = len(extracto)
+            return replace(
+                resultado,
+                texto_original=texto,
+                texto_procesado=texto_procesado,
+                metodo="deepseek_nlp_extracto",
+                metricas=metricas
+            )
+        
+        ventanas = ventanas_relevantes(texto, presupuesto, longitud_maxima, fragmentos)
+        with ThreadPoolExecutor(max_workers=len(ventanas)) as ejecutor:
+            resultados = list(ejecutor.map(
+                lambda ventana: self.clasificar_con_nlp(ventana, prioridad=prioridad, plazo=plazo),
+                ventanas
+            ))
+        
+        # Voto ponderado por la confianza de cada ventana
+        votos = {'IaaS': 0.0, 'PaaS': 0.0, 'SaaS': 0.0, 'FaaS': 0.0}
+        for parcial in resultados:
+            if parcial.modelo in votos:
+                votos[parcial.modelo] += parcial.confianza
+        
+        total_votos = sum(votos.values())
+        if total_votos == 0:
+            # Ninguna ventana dio un modelo: "No determinado" si alguna respondió
+            respondido = next((p for p in resultados if p.modelo != "Error"), None)
+            if respondido is None:
+                return self._crear_resultado_error(texto, texto_procesado)
+            return replace(respondido, texto_original=texto, texto_procesado=texto_procesado,
+                           metodo="deepseek_nlp_votacion")
+        
+        puntajes = {modelo: voto / total_votos for modelo, voto in votos.items()}
+        modelo = max(puntajes, key=puntajes.get)
+        metricas_parciales = [parcial.metricas or {} for parcial in resultados]
+        
+        return ResultadoClasificacion(
+            modelo=modelo,
+            confianza=puntajes[modelo],
+            puntajes=puntajes,
+            texto_original=texto,
+            texto_procesado=texto_procesado,
+            metodo="deepseek_nlp_votacion",
+            metricas={
+                "modelo_llm": metricas_parciales[0].get("modelo_llm"),
+                "latencia": max(m.get("latencia", 0.0) for m in metricas_parciales),
+                "tokens_entrada": sum(m.get("tokens_entrada", 0) for m in metricas_parciales),
+                "tokens_salida": sum(m.get("tokens_salida", 0) for m in metricas_parciales),
+                "costo": sumar_costos(metricas_parciales),
+                "fragmentos": len(ventanas),
+                "votos": [parcial.modelo for parcial in resultados]
+            }
+        )
+    
+    def clasificar_por_votacion(self, texto: str, muestras: Optional[int] = None,
+                                quorum: Optional[int] = None,
+                                primer_voto: Optional[ResultadoClasificacion] = None,
+                                prioridad: str = PRIORIDAD_INTERACTIVA,
+                                plazo: Optional[float] = None) -> ResultadoClasificacion:
+        """
+        Clasifica el texto por mayoría entre varias muestras del LLM pedidas por tandas.
+        
+        Las muestras se piden en paralelo con VOTING_TEMPERATURE, pero sólo
+        las que faltan a la etiqueta más votada para el quórum: si coinciden,
+        la votación termina con la latencia de una llamada y las demás
+        muestras nunca se envían (ni se pagan). Sólo si los votos discrepan se
+        pide otra tanda, hasta agotar ``muestras``. Como una tanda sólo puede
+        cerrar el quórum con su último voto, al terminar no queda ninguna
+        llamada en curso.
+        
+        Sólo las etiquetas de nube cuentan para el quórum y los puntajes, que
+        suman 1 entre ellas. Los votos "No determinado" se anotan y rebajan la
+        confianza, pero el resultado sólo es "No determinado" si ninguna
+        muestra dio una etiqueta. Las muestras que fallan no votan; si se agota
+        el presupuesto se deja de esperar al resto.
+        
+        Args:
+            texto: Texto a clasificar
+            muestras: Votos totales, incluido ``primer_voto`` (por defecto VOTING_SAMPLES)
+            quorum: Votos iguales que cierran la votación (por defecto VOTING_QUORUM)
+            primer_voto: Resultado ya obtenido que cuenta como primer voto (opcional)
+            prioridad: Clase de prioridad de las llamadas a la API
+            plazo: Segundos máximos de espera en el planificador (opcional)
+            
+        Returns:
+            ResultadoClasificacion: Etiqueta más votada, con la distribución de
+            los votos en ``puntajes`` y su proporción como ``confianza``
+            
+        Raises:
+            PresupuestoAgotado: Si ninguna muestra pudo votar por falta de presupuesto
+            PeticionExpirada: Si ninguna muestra pudo votar por vencer el plazo
+        """
+        muestras = muestras or self.config.muestras_votacion
+        quorum = quorum or self.config.quorum_votacion
+        texto_procesado = preprocesar_texto(texto)
+        inicio = time.perf_counter()
+        
+        votos = [primer_voto] if primer_voto is not None and primer_voto.modelo != "Error" else []
+        conteo = Counter(voto.modelo for voto in votos if voto.modelo in ETIQUETAS_MODELO)
+        faltantes = muestras - len(votos)
+        parada_anticipada = False
+        error_muestra: Optional[Exception] = None
+        sin_presupuesto = False
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(faltantes, quorum))) as ejecutor:
+            while faltantes > 0 and not sin_presupuesto:
+                lider = max(conteo.values(), default=0)
+                if lider >= quorum:
+                    parada_anticipada = True
+                    break
+                
+                # Sólo las muestras que faltan para el quórum si todas coincidieran
+                tanda = min(faltantes, quorum - lider)
+                faltantes -= tanda
+                futuros = [
+                    ejecutor.submit(self.clasificar_con_nlp, texto, prioridad=prioridad, plazo=plazo,
+                                    temperatura=self.config.temperatura_votacion)
+                    for _ in range(tanda)
+                ]
+                for futuro in as_completed(futuros):
+                    try:
+                        voto = futuro.result()
+                    except Exception as e:
+                        # Un voto fallido no interrumpe la votación; sin presupuesto,
+                        # las tandas siguientes también fallarían
+                        error_muestra = error_muestra or e
+                        sin_presupuesto = sin_presupuesto or isinstance(e, PresupuestoAgotado)
+                        continue
+                    if voto.modelo == "Error":
+                        continue
+                    votos.append(voto)
+                    if voto.modelo in ETIQUETAS_MODELO:
+                        conteo[voto.modelo] += 1
+        
+        if not votos:
+            if error_muestra is not None:
+                raise error_muestra
+            return self._crear_resultado_error(texto, texto_procesado)
+        
+        etiquetados = sum(conteo.values())
+        if etiquetados:
+            modelo = conteo.most_common(1)[0][0]
+            votos_modelo = conteo[modelo]
+        else:
+            modelo, votos_modelo = "No determinado", len(votos)
+        puntajes = {
+            etiqueta: conteo[etiqueta] / etiquetados if etiquetados else 0.0
+            for etiqueta in ETIQUETAS_MODELO
+        }
+        metricas_votos = [voto.metricas or {} for voto in votos]
+        latencia_previa = (primer_voto.metricas or {}).get("latencia", 0.0) if primer_voto else 0.0
+        
+        return ResultadoClasificacion(
+            modelo=modelo,
+            confianza=votos_modelo / len(votos),
+            puntajes=puntajes,
+            texto_original=texto,
+            texto_procesado=texto_procesado,
+            metodo="deepseek_nlp_autoconsistencia",
+            metricas={
+                "modelo_llm": metricas_votos[0].get("modelo_llm"),
+                "latencia": latencia_previa + time.perf_counter() - inicio,
+                "tokens_entrada": sum(m.get("tokens_entrada", 0) for m in metricas_votos),
+                "tokens_salida": sum(m.get("tokens_salida", 0) for m in metricas_votos),
+                "costo": sumar_costos(metricas_votos),
+                "votos": [voto.modelo for voto in votos],
+                "quorum": quorum,
+                "parada_anticipada": parada_anticipada
+            }
+        )
+    
+    def clasificar_con_enrutamiento(self, texto: str, prioridad: str = PRIORIDAD_INTERACTIVA,
+                                    plazo: Optional[float] = None) -> ResultadoClasificacion:
+        """
+        Clasifica el texto eligiendo la variante de DeepSeek según el enrutador.
+        
+        Args:
+            texto: Texto a clasificar
+            prioridad: Clase de prioridad de las llamadas a la API
+            plazo: Segundos máximos de espera en el planificador (opcional)
+            
+        Returns:
+            ResultadoClasificacion: Resultado del modelo rápido o, si se escaló, del fuerte
+        """
+        ruta, modelo_llm = self.enrutador.elegir(preprocesar_texto(texto))
+        resultado = self.clasificar_con_nlp(texto, modelo_llm=modelo_llm,
+                                            prioridad=prioridad, plazo=plazo)
+        self.enrutador.registrar(ruta, resultado)
+        
+        if ruta == EnrutadorModelos.RUTA_RAPIDA and self.enrutador.debe_escalar(resultado):
+            resultado_fuerte = self.clasificar_con_nlp(texto, modelo_llm=self.enrutador.modelo_fuerte,
+                                                       prioridad=prioridad, plazo=plazo)
+            self.enrutador.registrar(EnrutadorModelos.RUTA_ESCALADA, resultado_fuerte)
+            
+            if resultado_fuerte.modelo != "Error":
+                self.enrutador.registrar_escalado(resultado, resultado_fuerte)
+                return resultado_fuerte
+        
+        return resultado
+    
+    def estadisticas_enrutamiento(self) -> Optional[Dict[str, Any]]:
+        """
+        Retorna las estadísticas por ruta del enrutador (None si no hay enrutamiento).
+        
+        Returns:
+            Optional[Dict[str, Any]]: Llamadas, latencia, costo y coincidencia al escalar
+        """
+        return self.enrutador.estadisticas() if self.enrutador else None
+    
+    def clasificar_varios(self, textos: Iterable[str], prioridad: str = PRIORIDAD_LOTE,
+                          concurrencia: Optional[int] = None,
+                          usar_modelo_local: bool = True) -> Iterator[ResultadoClasificacion]:
+        """
+        Clasifica varios textos y entrega cada resultado en cuanto está listo.
+        
+        Los textos inválidos no interrumpen la secuencia: se entregan como "Error".
+        Con ``concurrencia`` mayor que 1 se clasifican varios textos a la vez,
+        pero los resultados se entregan siempre en el orden de entrada.
+        
+        Args:
+            textos: Textos a clasificar
+            prioridad: Clase de prioridad de las llamadas a la API
+            concurrencia: Textos en curso a la vez (por defecto BATCH_CONCURRENCY)
+            usar_modelo_local: Si probar antes las reglas y el modelo local destilado
+            
+        Yields:
+            ResultadoClasificacion: Resultado de cada texto, en el mismo orden
+        """
+        concurrencia = concurrencia or self.config.concurrencia_lotes
+        
+        if concurrencia <= 1:
+            for texto in textos:
+                yield self._clasificar_tolerante(texto, prioridad, usar_modelo_local)
+            return
+        
+        with ThreadPoolExecutor(max_workers=concurrencia) as ejecutor:
+            en_curso = deque()
+            for texto in textos:
+                en_curso.append(ejecutor.submit(self._clasificar_tolerante, texto, prioridad,
+                                                 usar_modelo_local))
+                if len(en_curso) >= 2 * concurrencia:
+                    yield en_curso.popleft().result()
+            
+            while en_curso:
+                yield en_curso.popleft().result()
+    
+    def _clasificar_tolerante(self, texto: str, prioridad: str,
+                              usar_modelo_local: bool = True) -> ResultadoClasificacion:
+        """Clasifica un texto devolviendo un resultado "Error" si la entrada no es válida."""
+        try:
+            return self.clasificar(texto, prioridad=prioridad, usar_modelo_local=usar_modelo_local)
+        except ValueError:
+            texto_procesado = preprocesar_texto(texto) if isinstance(texto, str) else ''
+            return self._crear_resultado_error(texto, texto_procesado)
+    
+    def clasificar_lote(self, textos: Iterable[str]) -> LoteResultados:
+        """
+        Clasifica varios textos y acumula los resultados en un lote columnar.
+        
+        Args:
+            textos: Textos a clasificar
+            
+        Returns:
+            LoteResultados: Resultados en formato columnar
+        """
+        lote = LoteResultados()
+        
+        for resultado in self.clasificar_varios(textos):
+            lote.agregar(resultado)
+        
+        return lote
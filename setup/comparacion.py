@@ -0,0 +1,254 @@
+"""
+Comparación de configuraciones del clasificador sobre conjuntos etiquetados: exactitud, latencia y costo.
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .clasificador import ClasificadorModelosNube
+from .configuracion import Configuracion
+from .modelos import ETIQUETAS_RESULTADO, ResultadoClasificacion
+from .presupuesto import costo_por_mil
+from .utilidades import percentil
+
+
+MOTORES_COMPARACION = ('clasificador', 'llm', 'reglas', 'local')
+
+# Una comparación no debe añadir ejemplos al almacén de destilación ni filas al historial
+VARIABLES_DESACTIVADAS = (('DISTILLATION_STORE', ''), ('HISTORY_PATH', ''))
+
+
+class ConfiguracionComparacion(NamedTuple):
+    """Configuración a comparar: un motor y las variables con que se crea su clasificador."""
+
+    nombre: str
+    motor: str = 'clasificador'
+    variables: Tuple[Tuple[str, str], ...] = ()
+
+
+def interpretar_configuracion(texto: str) -> ConfiguracionComparacion:
+    """
+    Convierte ``nombre[:motor[:VARIABLE=valor,...]]`` en una configuración.
+
+    El motor ``clasificador`` usa la cascada completa de ``clasificar``
+    (reglas, modelo local, enrutamiento y LLM según las variables); ``llm``,
+    ``reglas`` y ``local`` usan un solo motor (ver
+    ``ClasificadorModelosNube.crear_motor``). Las variables sustituyen a las
+    de entorno sólo en la ``Configuracion`` del clasificador evaluado, por ejemplo
+    ``compacta:llm:PROMPT_TEMPLATE=compacta`` o
+    ``cascada:clasificador:RULES_ENABLED=1,LOCAL_MODEL_CONFIDENCE=0.8``.
+
+    Args:
+        texto: Descripción de la configuración
+
+    Returns:
+        ConfiguracionComparacion: Configuración interpretada
+    """
+    partes = texto.split(':', 2)
+    nombre = partes[0].strip()
+    motor = partes[1].strip() if len(partes) > 1 and partes[1].strip() else 'clasificador'
+    if not nombre:
+        raise ValueError(f"Configuración sin nombre: {texto}")
+    if motor not in MOTORES_COMPARACION:
+        raise ValueError(f"Motor desconocido en '{texto}': usa {', '.join(MOTORES_COMPARACION)}")
+
+    variables = []
+    if len(partes) > 2:
+        for asignacion in partes[2].split(','):
+            if not asignacion.strip():
+                continue
+            variable, separador, valor = asignacion.partition('=')
+            if not separador:
+                raise ValueError(f"Se esperaba VARIABLE=valor en '{texto}'")
+            variables.append((variable.strip(), valor.strip()))
+
+    return ConfiguracionComparacion(nombre, motor, tuple(variables))
+
+
+def cargar_conjunto(ruta: str) -> List[Dict[str, Any]]:
+    """
+    Lee un conjunto etiquetado en JSONL (campos ``texto`` y ``modelo_esperado``).
+
+    Args:
+        ruta: Archivo JSONL
+
+    Returns:
+        List[Dict[str, Any]]: Casos con texto y modelo esperado
+    """
+    casos = []
+    with open(ruta, 'r', encoding='utf-8') as f:
+        for numero, linea in enumerate(f, 1):
+            if not linea.strip():
+                continue
+            caso = json.loads(linea)
+            if "texto" not in caso or "modelo_esperado" not in caso:
+                raise ValueError(f"{ruta}:{numero}: faltan 'texto' o 'modelo_esperado'")
+            casos.append(caso)
+    return casos
+
+
+def evaluar_configuracion(configuracion: ConfiguracionComparacion, casos: List[Dict[str, Any]],
+                          concurrencia: int = 1,
+                          fabrica: Optional[Callable[[Configuracion], ClasificadorModelosNube]] = None
+                          ) -> Dict[str, Any]:
+    """
+    Clasifica un conjunto etiquetado con una configuración y mide su calidad, latencia y costo.
+
+    Las variables de la configuración se pasan al clasificador en su propia
+    ``Configuracion``, sin tocar ``os.environ``, y en ella se desactivan el
+    almacén de destilación y el historial, aunque estén configurados.
+
+    Args:
+        configuracion: Configuración a evaluar
+        casos: Casos con ``texto`` y ``modelo_esperado``
+        concurrencia: Casos clasificados a la vez
+        fabrica: Función que crea el clasificador a partir de su configuración
+            (por defecto, uno nuevo con NLP)
+
+    Returns:
+        Dict[str, Any]: Exactitud, matriz de confusión (esperado → obtenido),
+        rendimiento, latencias p50/p99, tokens y costo por cada 1000 textos
+        (None si alguna llamada usó un modelo sin precio)
+    """
+    config = Configuracion(dict(configuracion.variables + VARIABLES_DESACTIVADAS))
+    if fabrica is not None:
+        clasificador = fabrica(config)
+    else:
+        clasificador = ClasificadorModelosNube(usar_nlp=True, config=config)
+    clasificador.almacen_entrenamiento = None
+    if clasificador.historial is not None:
+        clasificador.historial.cerrar()
+        clasificador.historial = None
+    if configuracion.motor == 'clasificador':
+        clasificar, descripcion = clasificador.clasificar, "cascada completa"
+    else:
+        clasificar, descripcion = clasificador.crear_motor(configuracion.motor)
+
+    def medir(caso: Dict[str, Any]) -> Tuple[Optional[ResultadoClasificacion], float]:
+        inicio = time.perf_counter()
+        try:
+            resultado = clasificar(caso["texto"])
+        except Exception:
+            resultado = None
+        return resultado, time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max(concurrencia, 1)) as ejecutor:
+            mediciones = list(ejecutor.map(medir, casos))
+    finally:
+        if clasificador.planificador is not None:
+            clasificador.planificador.cerrar()
+        if clasificador.sombra is not None:
+            clasificador.sombra.cerrar(tiempo_maximo=0.0)
+    duracion = time.perf_counter() - inicio
+
+    etiquetas = list(ETIQUETAS_RESULTADO)
+    matriz = {esperado: {obtenido: 0 for obtenido in etiquetas} for esperado in etiquetas}
+    aciertos = 0
+    tokens = 0
+    costo = 0.0
+    llamadas_sin_precio = 0
+    metodos: Dict[str, int] = {}
+
+    for caso, (resultado, _) in zip(casos, mediciones):
+        obtenido = resultado.modelo if resultado is not None else "Error"
+        esperado = caso["modelo_esperado"]
+        matriz.setdefault(esperado, {e: 0 for e in etiquetas})
+        matriz[esperado][obtenido] = matriz[esperado].get(obtenido, 0) + 1
+        aciertos += obtenido == esperado
+        if resultado is not None:
+            metodos[resultado.metodo] = metodos.get(resultado.metodo, 0) + 1
+            metricas = resultado.metricas or {}
+            tokens += metricas.get("tokens_entrada", 0) + metricas.get("tokens_salida", 0)
+            if "costo" in metricas:
+                if metricas["costo"] is None:
+                    llamadas_sin_precio += 1
+                else:
+                    costo += metricas["costo"]
+
+    latencias = [latencia for _, latencia in mediciones]
+    total = len(casos)
+    # Un modelo sin precio deja el costo desconocido en lugar de contarlo como gratuito
+    costo_total = None if llamadas_sin_precio else costo
+    return {
+        "nombre": configuracion.nombre,
+        "motor": configuracion.motor,
+        "descripcion": descripcion,
+        "variables": dict(configuracion.variables),
+        "casos": total,
+        "aciertos": aciertos,
+        "exactitud": aciertos / total if total else 0.0,
+        "errores": sum(fila["Error"] for fila in matriz.values()),
+        "matriz_confusion": {
+            esperado: fila for esperado, fila in matriz.items() if any(fila.values())
+        },
+        "metodos": metodos,
+        "duracion_segundos": duracion,
+        "textos_por_segundo": total / duracion if duracion > 0 else 0.0,
+        "latencia_p50": percentil(latencias, 0.5),
+        "latencia_p99": percentil(latencias, 0.99),
+        "tokens_por_1000": tokens * 1000 / total if total else 0.0,
+        "costo": costo_total,
+        "llamadas_sin_precio": llamadas_sin_precio,
+        "costo_por_1000": None if costo_total is None else costo_por_mil(costo_total, total) or 0.0
+    }
+
+
+def marcar_pareto(informes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Marca las configuraciones que no están dominadas por ninguna otra.
+
+    Una configuración domina a otra si no es peor en exactitud, latencia p50,
+    costo ni tokens por cada 1000 textos, y es mejor en al menos uno. El
+    costo sólo se compara cuando se conoce en las dos configuraciones.
+
+    Args:
+        informes: Informes de ``evaluar_configuracion``
+
+    Returns:
+        List[Dict[str, Any]]: Los mismos informes con el campo ``pareto``
+    """
+    def objetivos(informe, con_costo):
+        # Todos los objetivos se minimizan
+        valores = (-informe["exactitud"], informe["latencia_p50"], informe["tokens_por_1000"])
+        return valores + (informe["costo_por_1000"],) if con_costo else valores
+
+    def domina(otro, informe):
+        con_costo = otro["costo_por_1000"] is not None and informe["costo_por_1000"] is not None
+        suyos, propios = objetivos(otro, con_costo), objetivos(informe, con_costo)
+        return all(a <= b for a, b in zip(suyos, propios)) and suyos != propios
+
+    for informe in informes:
+        informe["pareto"] = not any(domina(otro, informe) for otro in informes if otro is not informe)
+    return informes
+
+
+def comparar_configuraciones(configuraciones: List[ConfiguracionComparacion],
+                             casos: List[Dict[str, Any]], concurrencia: int = 1,
+                             fabrica: Optional[Callable[[Configuracion], ClasificadorModelosNube]] = None
+                             ) -> Dict[str, Any]:
+    """
+    Evalúa varias configuraciones sobre el mismo conjunto y marca las óptimas de Pareto.
+
+    Args:
+        configuraciones: Configuraciones a comparar
+        casos: Casos con ``texto`` y ``modelo_esperado``
+        concurrencia: Casos clasificados a la vez en cada configuración
+        fabrica: Función que crea el clasificador a partir de su configuración
+            (por defecto, uno nuevo con NLP)
+
+    Returns:
+        Dict[str, Any]: Tamaño del conjunto e informe de cada configuración
+    """
+    informes = [
+        evaluar_configuracion(configuracion, casos, concurrencia=concurrencia, fabrica=fabrica)
+        for configuracion in configuraciones
+    ]
+    return {
+        "casos": len(casos),
+        "concurrencia": concurrencia,
+        "configuraciones": marcar_pareto(informes)
+    }
@@ -5,14 +5,21 @@ Carga las variables de entorno desde el archivo de configuración.
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class Configuracion:
     """Clase para manejar la configuración del clasificador."""
     
-    def __init__(self):
-        """Inicializa la configuración cargando las variables de entorno."""
+    def __init__(self, variables: Optional[Dict[str, str]] = None):
+        """
+        Inicializa la configuración cargando las variables de entorno.
+        
+        Args:
+            variables: Valores que sustituyen a las variables de entorno sólo en
+                esta configuración, sin modificar ``os.environ`` (opcional)
+        """
+        self._variables = dict(variables or {})
         self._cargar_variables_entorno()
     
     def _cargar_variables_entorno(self):
@@ -31,37 +38,296 @@ class Configuracion:
         except Exception as e:
             print(f"⚠️  Advertencia: No se pudo cargar config.env: {e}")
     
+    def _variable(self, nombre: str, defecto: str = '') -> str:
+        """Retorna el valor sustituido en esta configuración o, si no hay, el de la variable de entorno."""
+        if nombre in self._variables:
+            return self._variables[nombre]
+        return os.getenv(nombre, defecto)
+    
     @property
     def clave_api(self) -> str:
-        """Retorna la clave API de OpenRouter."""
-        return os.getenv('OPENROUTER_API_KEY', '')
+        """Retorna la clave API de OpenRouter (la personalizada si se asignó una)."""
+        return getattr(self, '_clave_api', None) or self._variable('OPENROUTER_API_KEY', '')
     
     @property
     def url_api(self) -> str:
         """Retorna la URL de la API de OpenRouter."""
-        return os.getenv('OPENROUTER_API_URL', 'https://openrouter.ai/api/v1/chat/completions')
+        return self._variable('OPENROUTER_API_URL', 'https://openrouter.ai/api/v1/chat/completions')
     
     @property
     def modelo(self) -> str:
         """Retorna el modelo de DeepSeek a usar."""
-        return os.getenv('DEEPSEEK_MODEL', 'deepseek/deepseek-chat')
+        return self._variable('DEEPSEEK_MODEL', 'deepseek/deepseek-chat')
     
     @property
     def max_tokens(self) -> int:
         """Retorna el número máximo de tokens."""
-        return int(os.getenv('MAX_TOKENS', '50'))
+        return int(self._variable('MAX_TOKENS', '50'))
     
     @property
     def temperature(self) -> float:
         """Retorna la temperatura para la generación."""
-        return float(os.getenv('TEMPERATURE', '0.1'))
+        return float(self._variable('TEMPERATURE', '0.1'))
+    
+    @property
+    def usar_streaming(self) -> bool:
+        """Retorna si se piden respuestas transmitidas (SSE) con corte anticipado."""
+        return self._variable('STREAMING', 'false').lower() in ('1', 'true', 'si', 'sí', 'yes')
+    
+    @property
+    def usar_logprobs(self) -> bool:
+        """Retorna si se piden los logprobs del token de la etiqueta para calcular los puntajes."""
+        return self._variable('LOGPROBS', 'false').lower() in ('1', 'true', 'si', 'sí', 'yes')
+    
+    @property
+    def top_logprobs(self) -> int:
+        """Retorna cuántas alternativas por token se piden con los logprobs."""
+        return int(self._variable('LOGPROBS_TOP', '5'))
+    
+    @property
+    def plantilla_instruccion(self) -> str:
+        """Retorna la plantilla de instrucción para el LLM ('completa' o 'compacta')."""
+        return self._variable('PROMPT_TEMPLATE', 'completa')
     
     @property
     def longitud_minima_texto(self) -> int:
         """Retorna la longitud mínima de texto válido."""
-        return int(os.getenv('MIN_TEXT_LENGTH', '3'))
+        return int(self._variable('MIN_TEXT_LENGTH', '3'))
     
     @property
     def longitud_maxima_texto(self) -> int:
         """Retorna la longitud máxima de texto válido."""
-        return int(os.getenv('MAX_TEXT_LENGTH', '1000'))
+        return int(self._variable('MAX_TEXT_LENGTH', '1000'))
+    
+    @property
+    def backends(self) -> List[Dict[str, Any]]:
+        """
+        Retorna los pares clave/endpoint entre los que se reparten las peticiones.
+        
+        Se configuran en ``OPENROUTER_BACKENDS`` como entradas separadas por comas
+        con el formato ``url|clave|peso`` (la clave y el peso son opcionales). Sin
+        esa variable se usa un único backend con ``OPENROUTER_API_URL`` y
+        ``OPENROUTER_API_KEY``.
+        """
+        valor = self._variable('OPENROUTER_BACKENDS', '').strip()
+        if not valor:
+            return [{"url": self.url_api, "clave": self.clave_api, "peso": 1.0}]
+        
+        backends = []
+        for entrada in valor.split(','):
+            partes = [parte.strip() for parte in entrada.split('|')]
+            if not partes[0]:
+                continue
+            backends.append({
+                "url": partes[0],
+                "clave": partes[1] if len(partes) > 1 else '',
+                "peso": float(partes[2]) if len(partes) > 2 and partes[2] else 1.0
+            })
+        return backends
+    
+    @property
+    def tiempo_expulsion_backend(self) -> float:
+        """Retorna los segundos que se expulsa un backend tras responder 429/5xx."""
+        return float(self._variable('BACKEND_EJECTION_SECONDS', '30'))
+    
+    @property
+    def modelo_rapido(self) -> str:
+        """Retorna el modelo barato y rápido para textos cortos (vacío si no hay enrutamiento)."""
+        return self._variable('DEEPSEEK_MODEL_FAST', '')
+    
+    @property
+    def modelo_fuerte(self) -> str:
+        """Retorna el modelo más capaz para textos largos o ambiguos (por defecto, DEEPSEEK_MODEL)."""
+        return self._variable('DEEPSEEK_MODEL_STRONG', '') or self.modelo
+    
+    @property
+    def longitud_maxima_ruta_rapida(self) -> int:
+        """Retorna la longitud máxima (texto preprocesado) que se envía al modelo rápido."""
+        return int(self._variable('ROUTING_MAX_FAST_LENGTH', '120'))
+    
+    @property
+    def confianza_escalado(self) -> float:
+        """Retorna la confianza por debajo de la cual se escala al modelo fuerte."""
+        return float(self._variable('ROUTING_ESCALATION_CONFIDENCE', '0.7'))
+    
+    @property
+    def precios_modelos(self) -> Dict[str, Tuple[float, float]]:
+        """
+        Retorna el precio en USD por millón de tokens (entrada, salida) de cada modelo.
+        
+        Se configura en ``MODEL_PRICES`` como ``modelo=entrada:salida`` separados por comas.
+        """
+        precios = {}
+        for entrada in self._variable('MODEL_PRICES', '').split(','):
+            if '=' not in entrada:
+                continue
+            nombre, valores = entrada.rsplit('=', 1)
+            precio_entrada, _, precio_salida = valores.partition(':')
+            precios[nombre.strip()] = (float(precio_entrada), float(precio_salida or precio_entrada))
+        return precios
+    
+    @property
+    def trabajadores_planificador(self) -> int:
+        """Retorna los trabajadores del planificador de peticiones (0 lo desactiva)."""
+        return int(self._variable('SCHEDULER_WORKERS', '0'))
+    
+    @property
+    def trabajadores_reservados_planificador(self) -> int:
+        """Retorna los trabajadores del planificador reservados para tráfico interactivo."""
+        return int(self._variable('SCHEDULER_RESERVED_WORKERS', '1'))
+    
+    @property
+    def concurrencia_lotes(self) -> int:
+        """Retorna cuántos textos se clasifican a la vez en el modo por lotes."""
+        return int(self._variable('BATCH_CONCURRENCY', '1'))
+    
+    @property
+    def procesos_lotes(self) -> int:
+        """Retorna cuántos procesos ejecutan el modelo local en el modo por lotes (0 o 1 lo desactiva)."""
+        return int(self._variable('BATCH_PROCESSES', '0'))
+    
+    @property
+    def ruta_almacen_entrenamiento(self) -> str:
+        """Retorna el archivo donde se registran las etiquetas del LLM (vacío lo desactiva)."""
+        return self._variable('DISTILLATION_STORE', '')
+    
+    @property
+    def ruta_modelo_local(self) -> str:
+        """Retorna el archivo del modelo local destilado (vacío lo desactiva)."""
+        return self._variable('LOCAL_MODEL_PATH', '')
+    
+    @property
+    def confianza_modelo_local(self) -> float:
+        """Retorna la confianza mínima para aceptar la respuesta del modelo local."""
+        return float(self._variable('LOCAL_MODEL_CONFIDENCE', '0.9'))
+    
+    @property
+    def ejemplos_minimos_modelo_local(self) -> int:
+        """Retorna los ejemplos mínimos que necesita el modelo local para responder."""
+        return int(self._variable('LOCAL_MODEL_MIN_EXAMPLES', '50'))
+    
+    @property
+    def modo_documento_largo(self) -> bool:
+        """Retorna si los textos más largos que MAX_TEXT_LENGTH se clasifican como documentos largos."""
+        return self._variable('LONG_DOCUMENT_MODE', 'false').lower() in ('1', 'true', 'si', 'sí', 'yes')
+    
+    @property
+    def longitud_maxima_documento(self) -> int:
+        """Retorna la longitud máxima de un documento largo."""
+        return int(self._variable('LONG_DOCUMENT_MAX_LENGTH', '200000'))
+    
+    @property
+    def presupuesto_tokens_documento(self) -> int:
+        """Retorna los tokens del extracto que se envía por cada documento largo (o por fragmento)."""
+        return int(self._variable('LONG_DOCUMENT_TOKEN_BUDGET', '200'))
+    
+    @property
+    def fragmentos_documento(self) -> int:
+        """Retorna cuántos fragmentos de un documento largo se clasifican y votan (1 envía un solo extracto)."""
+        return int(self._variable('LONG_DOCUMENT_CHUNKS', '1'))
+    
+    @property
+    def presupuesto_tokens(self) -> int:
+        """Retorna el límite de tokens de las llamadas al LLM (0 sin límite)."""
+        return int(self._variable('BUDGET_TOKENS', '0'))
+    
+    @property
+    def presupuesto_costo(self) -> float:
+        """Retorna el límite de costo estimado en USD (0 sin límite)."""
+        return float(self._variable('BUDGET_COST', '0'))
+    
+    @property
+    def umbral_presupuesto(self) -> float:
+        """Retorna la fracción del presupuesto a partir de la que se actúa."""
+        return float(self._variable('BUDGET_THRESHOLD', '0.9'))
+    
+    @property
+    def accion_presupuesto(self) -> str:
+        """Retorna la acción al llegar al umbral: detener, ralentizar o degradar."""
+        return self._variable('BUDGET_ACTION', 'detener')
+    
+    @property
+    def modelo_presupuesto(self) -> str:
+        """Retorna el modelo al que se degrada al llegar al umbral (por defecto, el rápido)."""
+        return self._variable('BUDGET_FALLBACK_MODEL', '') or self.modelo_rapido
+    
+    @property
+    def pausa_presupuesto(self) -> float:
+        """Retorna los segundos de espera por llamada al ralentizar."""
+        return float(self._variable('BUDGET_THROTTLE_SECONDS', '1.0'))
+    
+    @property
+    def usar_reglas(self) -> bool:
+        """Retorna si el motor de reglas de productos preclasifica antes del LLM."""
+        return self._variable('RULES_ENABLED', 'false').lower() in ('1', 'true', 'si', 'sí', 'yes')
+    
+    @property
+    def ruta_reglas(self) -> str:
+        """Retorna el diccionario de reglas (vacío usa el incluido con el paquete)."""
+        return self._variable('RULES_PATH', '')
+    
+    @property
+    def confianza_reglas(self) -> float:
+        """Retorna la confianza de las respuestas del motor de reglas."""
+        return float(self._variable('RULES_CONFIDENCE', '0.95'))
+    
+    @property
+    def fraccion_sombra(self) -> float:
+        """Retorna la fracción de llamadas que se replican en el candidato del modo sombra (0 lo desactiva)."""
+        return float(self._variable('SHADOW_FRACTION', '0'))
+    
+    @property
+    def motor_sombra(self) -> str:
+        """Retorna el motor candidato del modo sombra ('llm', 'local' o 'reglas')."""
+        return self._variable('SHADOW_ENGINE', 'llm')
+    
+    @property
+    def modelo_sombra(self) -> str:
+        """Retorna el modelo candidato del modo sombra (por defecto, DEEPSEEK_MODEL)."""
+        return self._variable('SHADOW_MODEL', '') or self.modelo
+    
+    @property
+    def plantilla_sombra(self) -> str:
+        """Retorna la plantilla de instrucción candidata del modo sombra."""
+        return self._variable('SHADOW_PROMPT', '') or self.plantilla_instruccion
+    
+    @property
+    def capacidad_sombra(self) -> int:
+        """Retorna cuántas llamadas del modo sombra pueden esperar en cola antes de descartarse."""
+        return int(self._variable('SHADOW_QUEUE', '100'))
+    
+    @property
+    def ruta_informe_sombra(self) -> str:
+        """Retorna el archivo JSON donde guardar el informe del modo sombra (opcional)."""
+        return self._variable('SHADOW_REPORT', '')
+    
+    @property
+    def muestras_votacion(self) -> int:
+        """Retorna las muestras del voto por autoconsistencia (0 o 1 lo desactiva)."""
+        return int(self._variable('VOTING_SAMPLES', '0'))
+    
+    @property
+    def quorum_votacion(self) -> int:
+        """Retorna los votos iguales que cierran la votación (0 para la mayoría de las muestras)."""
+        quorum = int(self._variable('VOTING_QUORUM', '0'))
+        return quorum if quorum > 0 else self.muestras_votacion // 2 + 1
+    
+    @property
+    def confianza_votacion(self) -> float:
+        """Retorna la confianza por debajo de la que un resultado del LLM se somete a votación."""
+        return float(self._variable('VOTING_CONFIDENCE', '0.9'))
+    
+    @property
+    def temperatura_votacion(self) -> float:
+        """Retorna la temperatura de las muestras de la votación."""
+        return float(self._variable('VOTING_TEMPERATURE', '0.7'))
+    
+    @property
+    def ruta_historial(self) -> str:
+        """Retorna la base SQLite donde se guarda el historial de clasificaciones (vacío lo desactiva)."""
+        return self._variable('HISTORY_PATH', '')
+    
+    @property
+    def token_distribuido(self) -> str:
+        """Retorna el secreto compartido entre el coordinador y los trabajadores (vacío sin token)."""
+        return self._variable('DISTRIBUTED_TOKEN', '')
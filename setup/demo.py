@@ -31,6 +31,7 @@ class DemostradorClasificador:
             
             try:
                 resultado = self.clasificador.clasificar(texto)
+                self.clasificador.registrar_historial([resultado])
                 
                 if resultado.modelo == "Error":
                     print(f"❌ Error en la clasificación")
@@ -61,6 +62,7 @@ class DemostradorClasificador:
         
         try:
             resultado = self.clasificador.clasificar(texto)
+            self.clasificador.registrar_historial([resultado])
             
             if resultado.modelo == "Error":
                 print(f"❌ Error en la clasificación")
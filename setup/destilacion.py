@@ -0,0 +1,262 @@
+"""
+Destilación de las respuestas de DeepSeek en un modelo local rápido.
+"""
+
+import json
+import math
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .modelos import ETIQUETAS_MODELO, ResultadoClasificacion
+
+
+class AlmacenEntrenamiento:
+    """
+    Registro de sólo anexado con las etiquetas obtenidas del LLM.
+
+    Cada línea es un objeto JSON con el texto preprocesado, la etiqueta y la
+    confianza de una clasificación hecha con DeepSeek.
+    """
+
+    def __init__(self, ruta: str):
+        """
+        Inicializa el almacén.
+
+        Args:
+            ruta: Archivo JSONL del almacén
+        """
+        self.ruta = ruta
+        self._bloqueo = threading.Lock()
+
+    def registrar(self, resultado: ResultadoClasificacion):
+        """
+        Anexa un resultado del LLM como ejemplo de entrenamiento.
+
+        Sólo se registran las respuestas directas del LLM (``metodo="deepseek_nlp"``)
+        con una de las cuatro etiquetas de nube. Los resultados de votación, de
+        extractos de documentos largos, de reglas o del propio modelo local no son
+        etiquetas de un único texto completo y no se usan para entrenar.
+
+        Args:
+            resultado: Resultado de la clasificación con DeepSeek
+        """
+        if resultado.metodo != "deepseek_nlp" or resultado.modelo not in ETIQUETAS_MODELO:
+            return
+
+        linea = json.dumps({
+            "texto": resultado.texto_procesado,
+            "modelo": resultado.modelo,
+            "confianza": resultado.confianza
+        }, ensure_ascii=False)
+
+        with self._bloqueo, open(self.ruta, 'a', encoding='utf-8') as f:
+            f.write(linea + "\n")
+
+    def leer(self, desde: int = 0) -> Iterator[Tuple[Dict[str, Any], int]]:
+        """
+        Lee los ejemplos a partir de un desplazamiento en bytes.
+
+        Args:
+            desde: Desplazamiento desde el que leer (el final de la lectura anterior)
+
+        Yields:
+            Tuple[Dict[str, Any], int]: Ejemplo y desplazamiento justo después de él
+        """
+        if not os.path.exists(self.ruta):
+            return
+
+        with open(self.ruta, 'rb') as f:
+            f.seek(desde)
+            posicion = desde
+            for linea in f:
+                # Una línea incompleta se está escribiendo todavía
+                if not linea.endswith(b"\n"):
+                    break
+                posicion += len(linea)
+                try:
+                    yield json.loads(linea), posicion
+                except ValueError:
+                    continue
+
+
+class ModeloLocal:
+    """
+    Clasificador Naive Bayes multinomial sobre palabras y bigramas del texto preprocesado.
+
+    Se ajusta de forma incremental (sólo suma conteos), por lo que reentrenar
+    con los ejemplos nuevos del almacén equivale a entrenar con todos.
+    """
+
+    def __init__(self, confianza_minima_ejemplo: float = 0.5):
+        """
+        Inicializa un modelo vacío.
+
+        Args:
+            confianza_minima_ejemplo: Confianza mínima del LLM para usar un ejemplo
+        """
+        self.confianza_minima_ejemplo = confianza_minima_ejemplo
+        self.documentos: Dict[str, int] = {etiqueta: 0 for etiqueta in ETIQUETAS_MODELO}
+        self.total_terminos: Dict[str, int] = {etiqueta: 0 for etiqueta in ETIQUETAS_MODELO}
+        self.frecuencias: Dict[str, Dict[str, int]] = {etiqueta: {} for etiqueta in ETIQUETAS_MODELO}
+        self.vocabulario: set = set()
+        # Bytes del almacén ya incorporados al modelo
+        self.desplazamiento = 0
+
+    @property
+    def total_ejemplos(self) -> int:
+        """Retorna el número de ejemplos con los que se ajustó el modelo."""
+        return sum(self.documentos.values())
+
+    @staticmethod
+    def terminos(texto_procesado: str) -> List[str]:
+        """
+        Extrae los términos (palabras y bigramas) de un texto preprocesado.
+
+        Args:
+            texto_procesado: Texto preprocesado
+
+        Returns:
+            List[str]: Términos del texto
+        """
+        palabras = texto_procesado.split()
+        return palabras + [f"{a} {b}" for a, b in zip(palabras, palabras[1:])]
+
+    def ajustar(self, ejemplos: Iterator[Dict[str, Any]]) -> int:
+        """
+        Incorpora ejemplos al modelo.
+
+        Args:
+            ejemplos: Ejemplos con ``texto``, ``modelo`` y ``confianza``
+
+        Returns:
+            int: Número de ejemplos incorporados
+        """
+        incorporados = 0
+
+        for ejemplo in ejemplos:
+            etiqueta = ejemplo.get("modelo")
+            if etiqueta not in self.documentos:
+                continue
+            if ejemplo.get("confianza", 1.0) < self.confianza_minima_ejemplo:
+                continue
+
+            frecuencias = self.frecuencias[etiqueta]
+            terminos = self.terminos(ejemplo.get("texto", ""))
+            for termino in terminos:
+                frecuencias[termino] = frecuencias.get(termino, 0) + 1
+            self.vocabulario.update(terminos)
+            self.total_terminos[etiqueta] += len(terminos)
+            self.documentos[etiqueta] += 1
+            incorporados += 1
+
+        return incorporados
+
+    def predecir(self, texto_procesado: str) -> Optional[Tuple[str, float, Dict[str, float]]]:
+        """
+        Predice el modelo de nube de un texto.
+
+        Args:
+            texto_procesado: Texto preprocesado
+
+        Returns:
+            Optional[Tuple[str, float, Dict[str, float]]]: (modelo, confianza, puntajes),
+            o None si el texto no contiene ningún término conocido
+        """
+        terminos = [t for t in self.terminos(texto_procesado) if t in self.vocabulario]
+        total = self.total_ejemplos
+        if not terminos or not total:
+            return None
+
+        tamano_vocabulario = len(self.vocabulario)
+        log_probabilidades = {}
+        for etiqueta in ETIQUETAS_MODELO:
+            frecuencias = self.frecuencias[etiqueta]
+            denominador = self.total_terminos[etiqueta] + tamano_vocabulario
+            log_probabilidad = math.log((self.documentos[etiqueta] + 1) / (total + len(ETIQUETAS_MODELO)))
+            for termino in terminos:
+                log_probabilidad += math.log((frecuencias.get(termino, 0) + 1) / denominador)
+            log_probabilidades[etiqueta] = log_probabilidad
+
+        maximo = max(log_probabilidades.values())
+        exponenciales = {e: math.exp(v - maximo) for e, v in log_probabilidades.items()}
+        suma = sum(exponenciales.values())
+        puntajes = {e: valor / suma for e, valor in exponenciales.items()}
+
+        modelo = max(puntajes, key=puntajes.get)
+        return modelo, puntajes[modelo], puntajes
+
+    def guardar(self, ruta: str):
+        """
+        Guarda el modelo de forma atómica en un archivo JSON.
+
+        Args:
+            ruta: Ruta del archivo del modelo
+        """
+        datos = {
+            "version": 1,
+            "confianza_minima_ejemplo": self.confianza_minima_ejemplo,
+            "documentos": self.documentos,
+            "total_terminos": self.total_terminos,
+            "frecuencias": self.frecuencias,
+            "desplazamiento": self.desplazamiento
+        }
+
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, ensure_ascii=False)
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta: str) -> 'ModeloLocal':
+        """
+        Carga un modelo guardado con ``guardar``.
+
+        Args:
+            ruta: Ruta del archivo del modelo
+
+        Returns:
+            ModeloLocal: Modelo cargado
+        """
+        with open(ruta, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+
+        modelo = cls(confianza_minima_ejemplo=datos["confianza_minima_ejemplo"])
+        modelo.documentos = datos["documentos"]
+        modelo.total_terminos = datos["total_terminos"]
+        modelo.frecuencias = datos["frecuencias"]
+        modelo.desplazamiento = datos["desplazamiento"]
+        modelo.vocabulario = {t for frecuencias in modelo.frecuencias.values() for t in frecuencias}
+        return modelo
+
+
+def reentrenar(ruta_almacen: str, ruta_modelo: str) -> Dict[str, Any]:
+    """
+    Ajusta el modelo local con los ejemplos nuevos del almacén y lo guarda.
+
+    Si el modelo ya existe, sólo se leen los ejemplos añadidos desde el último
+    reentrenamiento.
+
+    Args:
+        ruta_almacen: Archivo JSONL del almacén de entrenamiento
+        ruta_modelo: Archivo JSON del modelo local
+
+    Returns:
+        Dict[str, Any]: Ejemplos nuevos y totales del modelo
+    """
+    modelo = ModeloLocal.cargar(ruta_modelo) if os.path.exists(ruta_modelo) else ModeloLocal()
+    almacen = AlmacenEntrenamiento(ruta_almacen)
+
+    def ejemplos_nuevos():
+        for ejemplo, posicion in almacen.leer(modelo.desplazamiento):
+            modelo.desplazamiento = posicion
+            yield ejemplo
+
+    nuevos = modelo.ajustar(ejemplos_nuevos())
+    modelo.guardar(ruta_modelo)
+
+    return {
+        "ejemplos_nuevos": nuevos,
+        "ejemplos_totales": modelo.total_ejemplos,
+        "vocabulario": len(modelo.vocabulario)
+    }
@@ -0,0 +1,145 @@
+"""
+Diario de progreso para reanudar trabajos de clasificación por lotes.
+"""
+
+import json
+import os
+from typing import Any, Dict
+
+
+class DiarioProgreso:
+    """
+    Diario de sólo anexado con los registros ya clasificados de un trabajo.
+
+    Cada línea es un objeto JSON con el ``id`` del registro y su resultado. Las
+    escrituras se sincronizan con disco (``fsync``) en grupos, así que tras una
+    caída se pierde como mucho el último grupo. Al reanudar se conservan las
+    líneas válidas hasta la primera incompleta o ilegible, y el resto se
+    descarta; si la propia cabecera está dañada, el trabajo empieza de nuevo.
+    """
+
+    def __init__(self, ruta: str, tamano_grupo: int = 100):
+        """
+        Inicializa el diario.
+
+        Args:
+            ruta: Ruta del archivo de diario
+            tamano_grupo: Registros escritos entre dos sincronizaciones con disco
+        """
+        self.ruta = ruta
+        self.tamano_grupo = tamano_grupo
+        self._archivo = None
+        self._pendientes = 0
+
+    def abrir(self, identidad: Dict[str, Any], reanudar: bool = False) -> Dict[int, str]:
+        """
+        Abre el diario para escritura.
+
+        Args:
+            identidad: Datos que identifican la entrada del trabajo
+            reanudar: Si se deben conservar los registros de una ejecución anterior
+
+        Returns:
+            Dict[int, str]: Línea de resultado de cada registro ya completado
+        """
+        completados: Dict[int, str] = {}
+
+        longitud_valida = 0
+        if reanudar and os.path.exists(self.ruta):
+            completados, longitud_valida = self._leer(identidad)
+
+        if longitud_valida:
+            self._archivo = open(self.ruta, 'r+b')
+            # Descartar una posible línea incompleta antes de seguir anexando
+            self._archivo.truncate(longitud_valida)
+            self._archivo.seek(longitud_valida)
+        else:
+            self._archivo = open(self.ruta, 'wb')
+            self._escribir(json.dumps({"diario": identidad}, ensure_ascii=False))
+            self.sincronizar()
+
+        return completados
+
+    def registrar(self, linea: str):
+        """
+        Anexa la línea de resultado de un registro completado.
+
+        Args:
+            linea: Objeto JSON serializado con el ``id`` y el resultado
+        """
+        self._escribir(linea)
+        self._pendientes += 1
+
+        if self._pendientes >= self.tamano_grupo:
+            self.sincronizar()
+
+    def sincronizar(self):
+        """Fuerza la escritura a disco de las líneas pendientes."""
+        if self._archivo is None:
+            return
+
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
+        self._pendientes = 0
+
+    def cerrar(self):
+        """Sincroniza y cierra el diario."""
+        if self._archivo is None:
+            return
+
+        self.sincronizar()
+        self._archivo.close()
+        self._archivo = None
+
+    def eliminar(self):
+        """Cierra y elimina el diario una vez terminado el trabajo."""
+        self.cerrar()
+        try:
+            os.remove(self.ruta)
+        except FileNotFoundError:
+            pass
+
+    def _escribir(self, linea: str):
+        self._archivo.write(linea.encode('utf-8') + b"\n")
+
+    def _leer(self, identidad: Dict[str, Any]):
+        """
+        Lee las líneas completas del diario.
+
+        Returns:
+            Tuple[Dict[int, str], int]: Registros completados y longitud válida en bytes
+        """
+        completados: Dict[int, str] = {}
+        longitud_valida = 0
+        con_cabecera = False
+
+        with open(self.ruta, 'rb') as f:
+            for linea in f:
+                if not linea.endswith(b"\n"):
+                    break
+                try:
+                    datos = json.loads(linea)
+                except ValueError:
+                    break
+
+                if not isinstance(datos, dict):
+                    break
+
+                if not con_cabecera:
+                    if "diario" not in datos:
+                        # Cabecera ilegible: el diario no sirve y se empieza de nuevo
+                        break
+                    con_cabecera = True
+                    if datos["diario"] != identidad:
+                        raise ValueError(
+                            f"El diario {self.ruta} pertenece a otro trabajo; "
+                            "elimínalo o ejecuta sin reanudar"
+                        )
+                elif isinstance(datos.get("id"), int):
+                    completados[datos["id"]] = linea.decode('utf-8').rstrip("\n")
+                else:
+                    break
+
+                longitud_valida += len(linea)
+
+        return completados, longitud_valida
@@ -0,0 +1,542 @@
+"""
+Ejecución por lotes repartida entre varias máquinas: un coordinador y varios trabajadores.
+"""
+
+import hmac
+import json
+import os
+import shutil
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+from .lector import LectorCorpus
+
+
+def enviar_mensaje(canal: BinaryIO, cabecera: Dict[str, Any], datos: bytes = b''):
+    """
+    Envía un mensaje del protocolo: una cabecera JSON en una línea y, si hay, los datos.
+
+    Args:
+        canal: Archivo binario asociado al socket
+        cabecera: Cabecera del mensaje
+        datos: Carga opcional (su longitud viaja en la cabecera)
+    """
+    cabecera = dict(cabecera, bytes=len(datos))
+    canal.write(json.dumps(cabecera, ensure_ascii=False).encode('utf-8') + b"\n")
+    if datos:
+        canal.write(datos)
+    canal.flush()
+
+
+def recibir_mensaje(canal: BinaryIO) -> Tuple[Dict[str, Any], bytes]:
+    """
+    Recibe un mensaje del protocolo.
+
+    Args:
+        canal: Archivo binario asociado al socket
+
+    Returns:
+        Tuple[Dict[str, Any], bytes]: Cabecera y datos
+
+    Raises:
+        ConnectionError: Si la conexión se cierra a mitad del mensaje
+        ValueError: Si la cabecera no es un objeto JSON o su longitud no es válida
+    """
+    linea = canal.readline()
+    if not linea:
+        raise ConnectionError("La conexión se cerró antes de recibir el mensaje")
+
+    cabecera = json.loads(linea)
+    if not isinstance(cabecera, dict):
+        raise ValueError("La cabecera del mensaje no es un objeto JSON")
+    longitud = cabecera.get("bytes", 0)
+    if not isinstance(longitud, int) or longitud < 0:
+        raise ValueError(f"Longitud de datos no válida: {longitud!r}")
+    datos = canal.read(longitud) if longitud else b''
+    if len(datos) != longitud:
+        raise ConnectionError("La conexión se cerró antes de recibir los datos")
+    return cabecera, datos
+
+
+class _Fragmento:
+    """Rango de registros del trabajo y su estado."""
+
+    __slots__ = ('id', 'inicio', 'fin', 'concesiones', 'completado')
+
+    def __init__(self, id_fragmento: int, inicio: int, fin: int):
+        self.id = id_fragmento
+        self.inicio = inicio
+        self.fin = fin
+        # Trabajador -> vencimiento de su concesión
+        self.concesiones: Dict[str, float] = {}
+        self.completado = False
+
+
+class Coordinador:
+    """
+    Reparte un archivo de entrada en fragmentos de registros entre trabajadores remotos.
+
+    Cada trabajador pide un fragmento, recibe sus líneas, lo clasifica y
+    devuelve los resultados. Mientras lo procesa renueva su concesión con
+    latidos; si deja de hacerlo (porque el trabajador murió), el fragmento
+    vuelve a la cola. Cuando la cola se vacía, los trabajadores que quedan
+    libres roban los fragmentos más antiguos aún en curso y los procesan en
+    paralelo: el primer resultado que llega es el que se usa. Los resultados
+    de cada fragmento se guardan en ``<salida>.fragmentos/`` en cuanto llegan
+    (un coordinador reiniciado no repite los ya recibidos) y al terminar se
+    combinan en orden en el archivo de salida.
+
+    Por defecto sólo escucha en la interfaz local. Para aceptar trabajadores
+    de otras máquinas se indica la dirección y conviene fijar un ``token``
+    compartido: los mensajes que no lo traen se rechazan.
+    """
+
+    def __init__(self, ruta_entrada: str, ruta_salida: str,
+                 direccion: Tuple[str, int] = ('127.0.0.1', 8765),
+                 tamano_fragmento: int = 1000, tiempo_concesion: float = 60.0,
+                 copias_maximas: int = 2, espera_cierre: float = 2.0,
+                 token: Optional[str] = None):
+        """
+        Inicializa el coordinador y el plan de fragmentos.
+
+        Args:
+            ruta_entrada: Archivo de texto o JSONL con un registro por línea
+            ruta_salida: Archivo JSONL de resultados combinados
+            direccion: Dirección y puerto en los que escuchar
+            tamano_fragmento: Registros por fragmento
+            tiempo_concesion: Segundos sin latidos tras los que un fragmento se reasigna
+            copias_maximas: Trabajadores que pueden procesar a la vez un mismo fragmento
+            espera_cierre: Segundos que se sigue respondiendo al terminar, para
+                que los trabajadores en espera reciban el aviso de fin
+            token: Secreto compartido que deben enviar los trabajadores (opcional)
+        """
+        self.ruta_entrada = ruta_entrada
+        self.ruta_salida = ruta_salida
+        self.direccion = direccion
+        self.tiempo_concesion = tiempo_concesion
+        self.copias_maximas = copias_maximas
+        self.espera_cierre = espera_cierre
+        self.token = token
+        self.directorio_fragmentos = f"{ruta_salida}.fragmentos"
+
+        self._lector = LectorCorpus(ruta_entrada)
+        total = len(self._lector)
+        partes = -(-total // tamano_fragmento) if total else 1
+        self._fragmentos = [
+            _Fragmento(numero, inicio, fin)
+            for numero, (inicio, fin) in enumerate(self._lector.particionar(partes))
+        ]
+
+        self._condicion = threading.Condition()
+        self._trabajadores: Dict[str, Dict[str, Any]] = {}
+        self._reasignaciones = 0
+        self._robos = 0
+        self._duplicados = 0
+        self._resumenes: Dict[int, Dict[str, Any]] = {}
+        self._servidor: Optional[socketserver.ThreadingTCPServer] = None
+
+        # La misma identidad que el diario del modo por lotes: una edición que
+        # conserva el tamaño también invalida los fragmentos recibidos
+        self._preparar_directorio({
+            **self._lector.identidad(),
+            "fragmentos": [(f.inicio, f.fin) for f in self._fragmentos]
+        })
+
+    @property
+    def puerto(self) -> int:
+        """Retorna el puerto en el que escucha (útil con el puerto 0)."""
+        return self._servidor.server_address[1] if self._servidor else self.direccion[1]
+
+    def iniciar(self):
+        """Empieza a atender a los trabajadores en segundo plano."""
+        coordinador = self
+
+        class Manejador(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    try:
+                        cabecera, datos = recibir_mensaje(self.rfile)
+                        respuesta, carga = coordinador._atender(cabecera, datos)
+                    except ValueError as e:
+                        # Un cliente con un mensaje mal formado recibe el error y se le cierra
+                        respuesta, carga = {"tipo": "error", "mensaje": f"Mensaje no válido: {e}"}, b''
+                    enviar_mensaje(self.wfile, respuesta, carga)
+                except OSError:
+                    return
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._servidor = socketserver.ThreadingTCPServer(self.direccion, Manejador)
+        self._servidor.daemon_threads = True
+        threading.Thread(target=self._servidor.serve_forever, name="coordinador", daemon=True).start()
+
+    def ejecutar(self) -> Dict[str, Any]:
+        """
+        Atiende a los trabajadores hasta completar todos los fragmentos y combina la salida.
+
+        Returns:
+            Dict[str, Any]: Resumen del trabajo
+        """
+        tiempo_inicio = time.perf_counter()
+        if self._servidor is None:
+            self.iniciar()
+
+        try:
+            with self._condicion:
+                while not all(f.completado for f in self._fragmentos):
+                    self._condicion.wait(timeout=1.0)
+                    self._expirar_concesiones()
+
+            self._combinar()
+            time.sleep(self.espera_cierre)
+        finally:
+            self.cerrar()
+
+        duracion = time.perf_counter() - tiempo_inicio
+        total = sum(f.fin - f.inicio for f in self._fragmentos)
+        resumen = {
+            "total_registros": total,
+            "fragmentos": len(self._fragmentos),
+            "reasignaciones": self._reasignaciones,
+            "robos": self._robos,
+            "duplicados_descartados": self._duplicados,
+            "errores": sum(r.get("errores", 0) for r in self._resumenes.values()),
+            "clasificaciones": sum(r.get("clasificaciones", 0) for r in self._resumenes.values()),
+            "costo": self._costo_total(),
+            "duracion_segundos": duracion,
+            "registros_por_segundo": total / duracion if duracion > 0 else 0.0,
+            "trabajadores": self.estadisticas()["trabajadores"]
+        }
+        shutil.rmtree(self.directorio_fragmentos, ignore_errors=True)
+        return resumen
+
+    def cerrar(self):
+        """Deja de atender a los trabajadores y cierra la entrada."""
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+        self._lector.cerrar()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Retorna el avance del trabajo y lo que hizo cada trabajador.
+
+        Returns:
+            Dict[str, Any]: Fragmentos completados, en curso y pendientes, y datos por trabajador
+        """
+        with self._condicion:
+            completados = sum(f.completado for f in self._fragmentos)
+            en_curso = sum(bool(f.concesiones) and not f.completado for f in self._fragmentos)
+            return {
+                "completados": completados,
+                "en_curso": en_curso,
+                "pendientes": len(self._fragmentos) - completados - en_curso,
+                "trabajadores": {nombre: dict(datos) for nombre, datos in self._trabajadores.items()}
+            }
+
+    def _costo_total(self) -> Optional[float]:
+        """Suma el costo de los fragmentos (None si alguno usó un modelo sin precio)."""
+        costos = [(r.get("uso") or {}).get("costo", 0.0) for r in self._resumenes.values()]
+        if any(costo is None for costo in costos):
+            return None
+        return sum(costos)
+
+    def _preparar_directorio(self, plan: Dict[str, Any]):
+        """Crea el directorio de fragmentos o recupera los resultados de una ejecución anterior."""
+        ruta_plan = os.path.join(self.directorio_fragmentos, "plan.json")
+        plan = json.loads(json.dumps(plan))
+
+        anterior = None
+        if os.path.exists(ruta_plan):
+            with open(ruta_plan, 'r', encoding='utf-8') as f:
+                anterior = json.load(f)
+
+        if anterior != plan:
+            shutil.rmtree(self.directorio_fragmentos, ignore_errors=True)
+            os.makedirs(self.directorio_fragmentos)
+            with open(ruta_plan, 'w', encoding='utf-8') as f:
+                json.dump(plan, f)
+            return
+
+        for fragmento in self._fragmentos:
+            fragmento.completado = os.path.exists(self._ruta_fragmento(fragmento.id))
+
+    def _ruta_fragmento(self, id_fragmento: int) -> str:
+        return os.path.join(self.directorio_fragmentos, f"{id_fragmento:06d}.jsonl")
+
+    def _atender(self, cabecera: Dict[str, Any], datos: bytes) -> Tuple[Dict[str, Any], bytes]:
+        """Responde un mensaje de un trabajador."""
+        if self.token is not None and not hmac.compare_digest(
+                str(cabecera.get("token", "")).encode('utf-8'), self.token.encode('utf-8')):
+            return {"tipo": "error", "mensaje": "Token no válido"}, b''
+
+        tipo = cabecera.get("tipo")
+        trabajador = str(cabecera.get("trabajador", ""))
+
+        with self._condicion:
+            datos_trabajador = self._trabajadores.setdefault(
+                trabajador, {"fragmentos": 0, "registros": 0, "ultimo_contacto": 0.0}
+            )
+            datos_trabajador["ultimo_contacto"] = time.time()
+
+            if tipo == "pedir":
+                return self._asignar(trabajador)
+
+            id_fragmento = cabecera.get("id")
+            if (type(id_fragmento) is not int
+                    or not 0 <= id_fragmento < len(self._fragmentos)):
+                raise ValueError(f"Fragmento desconocido: {id_fragmento!r}")
+            fragmento = self._fragmentos[id_fragmento]
+            if tipo == "latido":
+                if fragmento.completado:
+                    return {"tipo": "cancelar"}, b''
+                fragmento.concesiones[trabajador] = time.monotonic() + self.tiempo_concesion
+                return {"tipo": "ok"}, b''
+
+            if tipo != "completado":
+                return {"tipo": "error", "mensaje": f"Mensaje desconocido: {tipo}"}, b''
+
+            fragmento.concesiones.pop(trabajador, None)
+            if fragmento.completado:
+                self._duplicados += 1
+                return {"tipo": "ok"}, b''
+
+        # Los resultados se escriben sin el bloqueo, para que las peticiones y los
+        # latidos de los demás trabajadores no esperen al disco; cada copia usa su
+        # propio temporal por si dos terminan el mismo fragmento a la vez
+        ruta = self._ruta_fragmento(fragmento.id)
+        temporal = f"{ruta}.{uuid.uuid4().hex}.tmp"
+        with open(temporal, 'wb') as f:
+            f.write(datos)
+
+        with self._condicion:
+            if fragmento.completado:
+                # Otra copia terminó mientras se escribía esta
+                self._duplicados += 1
+                os.remove(temporal)
+                return {"tipo": "ok"}, b''
+
+            os.replace(temporal, ruta)
+            fragmento.completado = True
+            fragmento.concesiones.clear()
+            self._resumenes[fragmento.id] = cabecera.get("resumen") or {}
+            datos_trabajador["fragmentos"] += 1
+            datos_trabajador["registros"] += fragmento.fin - fragmento.inicio
+            self._condicion.notify_all()
+        return {"tipo": "ok"}, b''
+
+    def _asignar(self, trabajador: str) -> Tuple[Dict[str, Any], bytes]:
+        """Elige un fragmento para el trabajador (con el bloqueo tomado)."""
+        self._expirar_concesiones()
+        pendientes = [f for f in self._fragmentos if not f.completado and not f.concesiones]
+
+        if pendientes:
+            fragmento = pendientes[0]
+        else:
+            # Robar el fragmento en curso más antiguo que este trabajador no tenga ya
+            en_curso = [
+                f for f in self._fragmentos
+                if not f.completado and trabajador not in f.concesiones
+                and len(f.concesiones) < self.copias_maximas
+            ]
+            if not en_curso:
+                if all(f.completado for f in self._fragmentos):
+                    return {"tipo": "fin"}, b''
+                return {"tipo": "esperar", "segundos": 1.0}, b''
+            fragmento = min(en_curso, key=lambda f: min(f.concesiones.values()))
+            self._robos += 1
+
+        fragmento.concesiones[trabajador] = time.monotonic() + self.tiempo_concesion
+        lineas = b"".join(
+            bytes(self._lector.linea(i)) + b"\n" for i in range(fragmento.inicio, fragmento.fin)
+        )
+        return {"tipo": "fragmento", "id": fragmento.id,
+                "inicio": fragmento.inicio, "fin": fragmento.fin}, lineas
+
+    def _expirar_concesiones(self):
+        """Devuelve a la cola los fragmentos de trabajadores sin latidos (con el bloqueo tomado)."""
+        ahora = time.monotonic()
+        for fragmento in self._fragmentos:
+            vencidas = [t for t, vencimiento in fragmento.concesiones.items() if vencimiento < ahora]
+            for trabajador in vencidas:
+                del fragmento.concesiones[trabajador]
+                self._reasignaciones += 1
+
+    def _combinar(self):
+        """Escribe la salida con los resultados de todos los fragmentos, en orden."""
+        temporal = f"{self.ruta_salida}.tmp"
+
+        with open(temporal, 'w', encoding='utf-8') as salida:
+            for fragmento in self._fragmentos:
+                with open(self._ruta_fragmento(fragmento.id), 'r', encoding='utf-8') as f:
+                    for linea in f:
+                        registro = json.loads(linea)
+                        # Los trabajadores numeran los registros desde el inicio de su fragmento
+                        registro["id"] += fragmento.inicio
+                        salida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            salida.flush()
+            os.fsync(salida.fileno())
+
+        os.replace(temporal, self.ruta_salida)
+
+
+class TrabajadorRemoto:
+    """
+    Pide fragmentos a un coordinador, los clasifica con un procesador por lotes y devuelve los resultados.
+
+    Si el coordinador responde a un latido con ``cancelar`` (el fragmento ya
+    lo completó otro trabajador), se cancela el procesador y se pasa al
+    siguiente fragmento sin devolver nada.
+    """
+
+    def __init__(self, direccion: Tuple[str, int], procesador=None,
+                 nombre: Optional[str] = None, intervalo_latido: float = 10.0,
+                 reintentos_conexion: int = 5, token: Optional[str] = None):
+        """
+        Inicializa el trabajador.
+
+        Args:
+            direccion: Dirección y puerto del coordinador
+            procesador: Procesador por lotes (por defecto ``ProcesadorLotes()``)
+            nombre: Nombre del trabajador (por defecto, máquina y PID)
+            intervalo_latido: Segundos entre latidos mientras procesa un fragmento
+            reintentos_conexion: Intentos seguidos de conexión antes de rendirse
+            token: Secreto compartido con el coordinador (opcional)
+        """
+        if procesador is None:
+            from .procesador_lotes import ProcesadorLotes
+            procesador = ProcesadorLotes()
+
+        self.direccion = direccion
+        self.procesador = procesador
+        self.nombre = nombre or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.intervalo_latido = intervalo_latido
+        self.reintentos_conexion = reintentos_conexion
+        self.token = token
+        self.fragmentos_procesados = 0
+        self.fragmentos_cancelados = 0
+
+    def ejecutar(self) -> int:
+        """
+        Procesa fragmentos hasta que el coordinador indica que no quedan.
+
+        Returns:
+            int: Fragmentos procesados por este trabajador
+        """
+        with tempfile.TemporaryDirectory(prefix="clasificador-") as directorio:
+            while True:
+                try:
+                    cabecera, datos = self._enviar({"tipo": "pedir"})
+                    if cabecera["tipo"] == "fin":
+                        break
+                    if cabecera["tipo"] == "esperar":
+                        time.sleep(cabecera.get("segundos", 1.0))
+                        continue
+                    if cabecera["tipo"] != "fragmento":
+                        raise RuntimeError(cabecera.get("mensaje", "Respuesta inesperada del coordinador"))
+
+                    self._procesar_fragmento(directorio, cabecera, datos)
+                except ConnectionError:
+                    # El coordinador terminó (o dejó de estar disponible)
+                    break
+
+        return self.fragmentos_procesados
+
+    def _procesar_fragmento(self, directorio: str, cabecera: Dict[str, Any], datos: bytes):
+        """Clasifica un fragmento mientras envía latidos y devuelve su resultado."""
+        id_fragmento = cabecera["id"]
+        ruta_entrada = os.path.join(directorio, f"{id_fragmento:06d}.entrada")
+        ruta_salida = os.path.join(directorio, f"{id_fragmento:06d}.jsonl")
+        with open(ruta_entrada, 'wb') as f:
+            f.write(datos)
+
+        terminado = threading.Event()
+        cancelado = threading.Event()
+
+        def latir():
+            while not terminado.wait(self.intervalo_latido):
+                try:
+                    respuesta, _ = self._enviar({"tipo": "latido", "id": id_fragmento}, reintentos=1)
+                except ConnectionError:
+                    continue
+                if respuesta.get("tipo") == "cancelar":
+                    cancelado.set()
+                    self.procesador.cancelar()
+                    return
+
+        latidos = threading.Thread(target=latir, name="latidos", daemon=True)
+        latidos.start()
+        try:
+            resumen = self.procesador.procesar(ruta_entrada, ruta_salida)
+        except Exception:
+            # La cancelación interrumpe el procesador con su propia excepción
+            if not cancelado.is_set():
+                raise
+        finally:
+            terminado.set()
+            latidos.join()
+
+        if cancelado.is_set():
+            self.fragmentos_cancelados += 1
+            self._eliminar_temporales(ruta_entrada, ruta_salida)
+            return
+
+        with open(ruta_salida, 'rb') as f:
+            resultados = f.read()
+        resumen = {
+            clave: valor for clave, valor in resumen.items()
+            if clave not in ("backends", "enrutamiento", "reglas", "sombra")
+        }
+        self._enviar({"tipo": "completado", "id": id_fragmento, "resumen": resumen}, resultados)
+        self.fragmentos_procesados += 1
+        self._eliminar_temporales(ruta_entrada, ruta_salida)
+
+    @staticmethod
+    def _eliminar_temporales(ruta_entrada: str, ruta_salida: str):
+        """Borra la entrada, la salida y los archivos auxiliares de un fragmento."""
+        for ruta in (ruta_entrada, ruta_salida, f"{ruta_entrada}.idx",
+                     f"{ruta_salida}.diario", f"{ruta_salida}.tmp"):
+            if os.path.exists(ruta):
+                os.remove(ruta)
+
+    def _enviar(self, cabecera: Dict[str, Any], datos: bytes = b'',
+                reintentos: Optional[int] = None) -> Tuple[Dict[str, Any], bytes]:
+        """Envía un mensaje al coordinador y espera su respuesta, reintentando la conexión."""
+        reintentos = reintentos or self.reintentos_conexion
+        cabecera = dict(cabecera, trabajador=self.nombre)
+        if self.token is not None:
+            cabecera["token"] = self.token
+
+        for intento in range(reintentos):
+            try:
+                with socket.create_connection(self.direccion, timeout=60) as conexion, \
+                        conexion.makefile('rwb') as canal:
+                    enviar_mensaje(canal, cabecera, datos)
+                    return recibir_mensaje(canal)
+            except OSError:
+                if intento + 1 < reintentos:
+                    time.sleep(min(2 ** intento, 10))
+
+        raise ConnectionError(f"No se pudo contactar con el coordinador en {self.direccion}")
+
+
+def separar_direccion(texto: str, puerto_por_defecto: int = 8765) -> Tuple[str, int]:
+    """
+    Convierte ``host:puerto`` (o sólo ``host``) en una dirección de socket.
+
+    Args:
+        texto: Dirección en texto
+        puerto_por_defecto: Puerto si no se indica
+
+    Returns:
+        Tuple[str, int]: (host, puerto)
+    """
+    if ':' not in texto:
+        return texto, puerto_por_defecto
+    host, _, puerto = texto.rpartition(':')
+    return host, int(puerto)
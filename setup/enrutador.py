@@ -0,0 +1,140 @@
+"""
+Enrutamiento de textos entre variantes de DeepSeek según su costo y latencia.
+"""
+
+import threading
+from typing import Any, Dict, Tuple
+
+from .modelos import ResultadoClasificacion
+
+
+class EnrutadorModelos:
+    """
+    Decide qué modelo atiende cada texto y acumula estadísticas por ruta.
+
+    Los textos cortos van al modelo rápido; los largos, directamente al fuerte.
+    Si la respuesta del modelo rápido es "No determinado" o su confianza queda
+    por debajo del umbral, el texto se escala al modelo fuerte. Para ajustar las
+    reglas se registran la latencia y el costo de cada ruta, y cuántas veces el
+    modelo fuerte coincidió con el rápido al escalar.
+    """
+
+    RUTA_RAPIDA = 'rapida'
+    RUTA_FUERTE = 'fuerte'
+    RUTA_ESCALADA = 'escalada'
+
+    def __init__(self, modelo_rapido: str, modelo_fuerte: str,
+                 longitud_maxima_rapida: int = 120, confianza_escalado: float = 0.7):
+        """
+        Inicializa el enrutador.
+
+        Args:
+            modelo_rapido: Modelo barato y rápido
+            modelo_fuerte: Modelo más capaz
+            longitud_maxima_rapida: Longitud máxima del texto preprocesado para la ruta rápida
+            confianza_escalado: Confianza mínima para aceptar la respuesta del modelo rápido
+        """
+        self.modelo_rapido = modelo_rapido
+        self.modelo_fuerte = modelo_fuerte
+        self.longitud_maxima_rapida = longitud_maxima_rapida
+        self.confianza_escalado = confianza_escalado
+
+        self._bloqueo = threading.Lock()
+        self._rutas: Dict[str, Dict[str, float]] = {
+            ruta: {"llamadas": 0, "latencia_total": 0.0, "costo_total": 0.0,
+                   "llamadas_con_precio": 0, "tokens": 0}
+            for ruta in (self.RUTA_RAPIDA, self.RUTA_FUERTE, self.RUTA_ESCALADA)
+        }
+        self._escalados = 0
+        self._coincidencias = 0
+
+    def elegir(self, texto_procesado: str) -> Tuple[str, str]:
+        """
+        Elige la ruta inicial de un texto.
+
+        Args:
+            texto_procesado: Texto preprocesado
+
+        Returns:
+            Tuple[str, str]: (ruta, modelo)
+        """
+        if len(texto_procesado) <= self.longitud_maxima_rapida:
+            return self.RUTA_RAPIDA, self.modelo_rapido
+        return self.RUTA_FUERTE, self.modelo_fuerte
+
+    def debe_escalar(self, resultado: ResultadoClasificacion) -> bool:
+        """
+        Indica si la respuesta del modelo rápido debe confirmarse con el modelo fuerte.
+
+        Args:
+            resultado: Resultado obtenido con el modelo rápido
+
+        Returns:
+            bool: True si se debe escalar
+        """
+        if resultado.modelo == "Error":
+            return False
+        return resultado.modelo == "No determinado" or resultado.confianza < self.confianza_escalado
+
+    def registrar(self, ruta: str, resultado: ResultadoClasificacion):
+        """
+        Acumula la latencia, los tokens y el costo de una llamada.
+
+        Args:
+            ruta: Ruta por la que se atendió la llamada
+            resultado: Resultado de la llamada (con ``metricas``)
+        """
+        metricas = resultado.metricas or {}
+
+        with self._bloqueo:
+            estadisticas = self._rutas[ruta]
+            estadisticas["llamadas"] += 1
+            estadisticas["latencia_total"] += metricas.get("latencia", 0.0)
+            # Las llamadas sin precio conocido no cuentan como gratuitas
+            if metricas.get("costo") is not None:
+                estadisticas["costo_total"] += metricas["costo"]
+                estadisticas["llamadas_con_precio"] += 1
+            estadisticas["tokens"] += (
+                metricas.get("tokens_entrada", 0) + metricas.get("tokens_salida", 0)
+            )
+
+    def registrar_escalado(self, rapido: ResultadoClasificacion, fuerte: ResultadoClasificacion):
+        """
+        Registra si el modelo fuerte coincidió con el rápido tras escalar.
+
+        Args:
+            rapido: Resultado del modelo rápido
+            fuerte: Resultado del modelo fuerte
+        """
+        with self._bloqueo:
+            self._escalados += 1
+            self._coincidencias += rapido.modelo == fuerte.modelo
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Retorna las estadísticas acumuladas por ruta.
+
+        Returns:
+            Dict[str, Any]: Llamadas, latencia media, costo (None si ninguna llamada
+            tuvo precio conocido) y coincidencia al escalar
+        """
+        with self._bloqueo:
+            rutas = {}
+            for ruta, datos in self._rutas.items():
+                llamadas = datos["llamadas"]
+                rutas[ruta] = {
+                    "modelo": self.modelo_rapido if ruta == self.RUTA_RAPIDA else self.modelo_fuerte,
+                    "llamadas": llamadas,
+                    "latencia_media": datos["latencia_total"] / llamadas if llamadas else 0.0,
+                    "costo_total": datos["costo_total"] if datos["llamadas_con_precio"] else None,
+                    "llamadas_con_precio": datos["llamadas_con_precio"],
+                    "tokens": datos["tokens"]
+                }
+
+            return {
+                "rutas": rutas,
+                "escalados": self._escalados,
+                "coincidencia_escalado": (
+                    self._coincidencias / self._escalados if self._escalados else None
+                )
+            }
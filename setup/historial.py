@@ -0,0 +1,214 @@
+"""
+Historial local de clasificaciones en SQLite, indexado por texto y por fecha.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from .modelos import ResultadoClasificacion
+from .utilidades import hash_contenido, preprocesar_texto
+
+
+# Caracteres del texto original que se guardan (el hash identifica el texto completo)
+LONGITUD_MAXIMA_TEXTO = 2000
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS clasificaciones (
+    id INTEGER PRIMARY KEY,
+    momento REAL NOT NULL,
+    hash TEXT NOT NULL,
+    texto TEXT NOT NULL,
+    modelo TEXT NOT NULL,
+    confianza REAL,
+    metodo TEXT,
+    modelo_llm TEXT,
+    huella TEXT,
+    latencia REAL,
+    tokens_entrada INTEGER,
+    tokens_salida INTEGER,
+    costo REAL
+);
+CREATE INDEX IF NOT EXISTS idx_clasificaciones_hash ON clasificaciones (hash, momento);
+CREATE INDEX IF NOT EXISTS idx_clasificaciones_momento ON clasificaciones (momento, modelo);
+"""
+
+# Expresiones SQL de cada agrupación disponible en ``resumen``
+AGRUPACIONES = {
+    'modelo': "modelo",
+    'metodo': "metodo",
+    'modelo_llm': "COALESCE(modelo_llm, '-')",
+    'huella': "COALESCE(huella, '-')",
+    'dia': "date(momento, 'unixepoch', 'localtime')",
+    'hora': "strftime('%Y-%m-%d %H:00', momento, 'unixepoch', 'localtime')"
+}
+
+
+def interpretar_momento(texto: str) -> float:
+    """
+    Convierte una fecha ISO (``2024-05-01``, ``2024-05-01T12:00``) o una
+    antigüedad relativa (``7d``, ``12h``, ``30m``) en segundos desde la época.
+
+    Args:
+        texto: Fecha o antigüedad
+
+    Returns:
+        float: Marca de tiempo
+
+    Raises:
+        ValueError: Si el texto no tiene un formato reconocido
+    """
+    relativo = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([dhm])\s*', texto)
+    if relativo:
+        segundos = {'d': 86400, 'h': 3600, 'm': 60}[relativo.group(2)]
+        return time.time() - float(relativo.group(1)) * segundos
+    return datetime.fromisoformat(texto.strip()).timestamp()
+
+
+class HistorialClasificaciones:
+    """
+    Guarda cada clasificación con su fecha, modelo, huella, latencia y tokens.
+
+    Las búsquedas por texto usan el hash del texto preprocesado y las
+    consultas por intervalo de tiempo, el índice por fecha; los resúmenes se
+    calculan con agregaciones de SQLite, sin cargar las filas en memoria. La
+    base usa el modo WAL, así que se puede consultar mientras otro proceso
+    escribe en ella.
+    """
+
+    def __init__(self, ruta: str):
+        """
+        Abre (o crea) el historial.
+
+        Args:
+            ruta: Archivo de la base de datos SQLite
+        """
+        self.ruta = ruta
+        self._bloqueo = threading.Lock()
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self._conexion.row_factory = sqlite3.Row
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.executescript(ESQUEMA)
+
+    def registrar(self, resultados: Iterable[ResultadoClasificacion], huella: str = '',
+                  momento: Optional[float] = None) -> int:
+        """
+        Añade resultados al historial en una sola transacción.
+
+        Los resultados "Error" no se guardan.
+
+        Args:
+            resultados: Resultados a guardar
+            huella: Huella de la configuración con que se obtuvieron
+            momento: Marca de tiempo (por defecto, ahora)
+
+        Returns:
+            int: Filas añadidas
+        """
+        momento = time.time() if momento is None else momento
+        filas = []
+        for resultado in resultados:
+            if resultado.modelo == "Error":
+                continue
+            metricas = resultado.metricas or {}
+            filas.append((
+                momento,
+                hash_contenido(resultado.texto_procesado),
+                resultado.texto_original[:LONGITUD_MAXIMA_TEXTO],
+                resultado.modelo,
+                resultado.confianza,
+                resultado.metodo,
+                metricas.get("modelo_llm"),
+                huella,
+                metricas.get("latencia"),
+                metricas.get("tokens_entrada"),
+                metricas.get("tokens_salida"),
+                metricas.get("costo")
+            ))
+
+        if filas:
+            with self._bloqueo, self._conexion:
+                self._conexion.executemany(
+                    "INSERT INTO clasificaciones (momento, hash, texto, modelo, confianza, metodo, "
+                    "modelo_llm, huella, latencia, tokens_entrada, tokens_salida, costo) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    filas
+                )
+        return len(filas)
+
+    def buscar(self, texto: str, limite: int = 10) -> List[Dict[str, Any]]:
+        """
+        Retorna las clasificaciones anteriores de un texto, de la más reciente a la más antigua.
+
+        Args:
+            texto: Texto (se compara por su forma preprocesada)
+            limite: Clasificaciones máximas
+
+        Returns:
+            List[Dict[str, Any]]: Filas del historial
+        """
+        with self._bloqueo:
+            filas = self._conexion.execute(
+                "SELECT * FROM clasificaciones WHERE hash = ? ORDER BY momento DESC LIMIT ?",
+                (hash_contenido(preprocesar_texto(texto)), limite)
+            ).fetchall()
+        return [dict(fila) for fila in filas]
+
+    def resumen(self, desde: Optional[float] = None, hasta: Optional[float] = None,
+                agrupar: str = 'modelo') -> List[Dict[str, Any]]:
+        """
+        Agrega las clasificaciones de un intervalo de tiempo.
+
+        Args:
+            desde: Marca de tiempo inicial incluida (opcional)
+            hasta: Marca de tiempo final excluida (opcional)
+            agrupar: Campo por el que agrupar (ver ``AGRUPACIONES``)
+
+        Returns:
+            List[Dict[str, Any]]: Por grupo, clasificaciones, confianza media,
+            latencia media y máxima, tokens y costo, de mayor a menor cantidad
+        """
+        if agrupar not in AGRUPACIONES:
+            raise ValueError(f"Agrupación desconocida: {agrupar}; usa {', '.join(AGRUPACIONES)}")
+
+        condiciones, parametros = [], []
+        if desde is not None:
+            condiciones.append("momento >= ?")
+            parametros.append(desde)
+        if hasta is not None:
+            condiciones.append("momento < ?")
+            parametros.append(hasta)
+        donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+
+        consulta = f"""
+            SELECT {AGRUPACIONES[agrupar]} AS grupo,
+                   COUNT(*) AS clasificaciones,
+                   AVG(confianza) AS confianza_media,
+                   AVG(latencia) AS latencia_media,
+                   MAX(latencia) AS latencia_maxima,
+                   COALESCE(SUM(tokens_entrada), 0) + COALESCE(SUM(tokens_salida), 0) AS tokens,
+                   COALESCE(SUM(costo), 0.0) AS costo,
+                   MIN(momento) AS primera,
+                   MAX(momento) AS ultima
+            FROM clasificaciones {donde}
+            GROUP BY grupo
+            ORDER BY clasificaciones DESC
+        """
+        with self._bloqueo:
+            filas = self._conexion.execute(consulta, parametros).fetchall()
+        return [dict(fila) for fila in filas]
+
+    def cerrar(self):
+        """Cierra la base de datos."""
+        with self._bloqueo:
+            self._conexion.close()
+
+    def __enter__(self) -> 'HistorialClasificaciones':
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
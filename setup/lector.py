@@ -0,0 +1,247 @@
+"""
+Lector de corpus de entrada mapeado en memoria e indexado por líneas.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .utilidades import arreglo_a_bytes, leer_arreglo
+
+
+class LectorCorpus:
+    """
+    Lector de archivos de texto o JSONL (un registro por línea) de gran tamaño.
+
+    El archivo se mapea en memoria y se construye una sola vez un índice con el
+    desplazamiento de cada línea no vacía, que se guarda junto al archivo
+    (``<ruta>.idx``) y se reutiliza mientras el archivo no cambie. Con el índice
+    se puede acceder a cualquier registro por su número y dividir el corpus en
+    rangos disjuntos sin volver a leerlo. En la misma pasada se calcula el hash
+    del contenido completo, que se guarda en el índice e identifica la entrada
+    al reanudar un trabajo.
+    """
+
+    _MAGIA = b'CMNIDX02'
+
+    # Bytes que se acumulan antes de pasarlos al hash durante el recorrido
+    _TROZO_HASH = 1 << 20
+
+    def __init__(self, ruta: str, ruta_indice: Optional[str] = None, campo_texto: str = 'texto'):
+        """
+        Abre el archivo y carga (o construye) su índice de líneas.
+
+        Args:
+            ruta: Ruta del archivo de entrada
+            ruta_indice: Ruta del índice persistente (por defecto ``<ruta>.idx``)
+            campo_texto: Campo con el texto cuando los registros son objetos JSON
+        """
+        self.ruta = ruta
+        self.ruta_indice = ruta_indice or f"{ruta}.idx"
+        self.campo_texto = campo_texto
+
+        self._archivo = open(ruta, 'rb')
+        estado = os.fstat(self._archivo.fileno())
+        self._tamano = estado.st_size
+        self._modificacion = estado.st_mtime_ns
+
+        # mmap no admite archivos vacíos
+        if self._tamano:
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._mapa = b''
+
+        # Pares (inicio, fin) de cada línea, intercalados: [i0, f0, i1, f1, ...]
+        self.hash_archivo = ''
+        self._limites = self._cargar_indice()
+        if self._limites is None:
+            self._limites = self._construir_indice()
+            self._guardar_indice()
+
+    def __len__(self) -> int:
+        return len(self._limites) // 2
+
+    def __getitem__(self, indice: int) -> str:
+        return self.registro(indice)
+
+    def __enter__(self) -> 'LectorCorpus':
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+    def cerrar(self):
+        """Libera el mapa de memoria y el archivo."""
+        if isinstance(self._mapa, mmap.mmap):
+            self._mapa.close()
+        self._archivo.close()
+
+    def linea(self, indice: int) -> memoryview:
+        """
+        Retorna los bytes de una línea sin copiarlos.
+
+        La vista apunta al mapa de memoria y debe liberarse antes de ``cerrar``.
+
+        Args:
+            indice: Número de registro (admite índices negativos)
+
+        Returns:
+            memoryview: Bytes de la línea sin el salto de línea
+        """
+        total = len(self)
+        if indice < 0:
+            indice += total
+        if not 0 <= indice < total:
+            raise IndexError("Número de registro fuera del corpus")
+
+        inicio = self._limites[2 * indice]
+        fin = self._limites[2 * indice + 1]
+        return memoryview(self._mapa)[inicio:fin]
+
+    def registro(self, indice: int) -> str:
+        """
+        Retorna el texto de un registro.
+
+        Las líneas que son objetos JSON se interpretan como JSONL y se devuelve
+        su campo de texto; el resto se devuelve tal cual.
+
+        Args:
+            indice: Número de registro
+
+        Returns:
+            str: Texto del registro
+        """
+        with self.linea(indice) as vista:
+            texto = str(vista, 'utf-8')
+
+        if texto.startswith('{'):
+            try:
+                datos = json.loads(texto)
+            except json.JSONDecodeError:
+                return texto
+            if isinstance(datos, dict) and self.campo_texto in datos:
+                return str(datos[self.campo_texto])
+
+        return texto
+
+    def rango(self, inicio: int = 0, fin: Optional[int] = None) -> Iterator[str]:
+        """
+        Itera los registros en ``[inicio, fin)``.
+
+        Args:
+            inicio: Primer registro
+            fin: Registro final exclusivo (por defecto, el final del corpus)
+
+        Yields:
+            str: Texto de cada registro
+        """
+        fin = len(self) if fin is None else min(fin, len(self))
+        for indice in range(max(inicio, 0), fin):
+            yield self.registro(indice)
+
+    def identidad(self) -> Dict[str, Any]:
+        """
+        Retorna lo que identifica la versión de la entrada para reanudar un trabajo.
+
+        Incluye el hash del contenido completo, así que una edición que
+        conserva el tamaño (o la fecha) también se detecta.
+
+        Returns:
+            Dict[str, Any]: Ruta absoluta, tamaño y hash del contenido
+        """
+        return {
+            "entrada": os.path.abspath(self.ruta),
+            "tamano": self._tamano,
+            "contenido": self.hash_archivo
+        }
+
+    def particionar(self, partes: int) -> List[Tuple[int, int]]:
+        """
+        Divide el corpus en rangos disjuntos y contiguos de tamaño similar.
+
+        Args:
+            partes: Número de rangos deseado
+
+        Returns:
+            List[Tuple[int, int]]: Rangos ``(inicio, fin)`` no vacíos
+        """
+        total = len(self)
+        partes = max(1, min(partes, total)) if total else 1
+        tamano, resto = divmod(total, partes)
+
+        rangos = []
+        inicio = 0
+        for parte in range(partes):
+            fin = inicio + tamano + (1 if parte < resto else 0)
+            if fin > inicio:
+                rangos.append((inicio, fin))
+            inicio = fin
+        return rangos
+
+    def _construir_indice(self) -> array:
+        """Recorre el archivo una vez, registra los límites de cada línea no vacía y calcula su hash."""
+        limites = array('Q')
+        mapa = self._mapa
+        resumen = hashlib.blake2b(digest_size=16)
+        inicio = 0
+        resumido = 0
+
+        while inicio < self._tamano:
+            fin = mapa.find(b'\n', inicio)
+            siguiente = self._tamano if fin == -1 else fin + 1
+            if fin == -1:
+                fin = self._tamano
+            if fin > inicio and mapa[fin - 1:fin] == b'\r':
+                fin -= 1
+            if fin > inicio:
+                limites.append(inicio)
+                limites.append(fin)
+            inicio = siguiente
+            # Las páginas recién recorridas pasan al hash mientras siguen en caché
+            if inicio - resumido >= self._TROZO_HASH or inicio >= self._tamano:
+                with memoryview(mapa)[resumido:inicio] as trozo:
+                    resumen.update(trozo)
+                resumido = inicio
+
+        self.hash_archivo = resumen.hexdigest()
+        return limites
+
+    def _cargar_indice(self) -> Optional[array]:
+        """Carga el índice persistente si corresponde a la versión actual del archivo."""
+        try:
+            with open(self.ruta_indice, 'rb') as f:
+                datos = memoryview(f.read())
+        except OSError:
+            return None
+
+        cabecera = len(self._MAGIA) + 40
+        if bytes(datos[:len(self._MAGIA)]) != self._MAGIA or len(datos) < cabecera:
+            return None
+
+        tamano, modificacion, total = leer_arreglo('Q', datos, len(self._MAGIA), 3)
+        if tamano != self._tamano or modificacion != self._modificacion:
+            return None
+
+        if len(datos) - cabecera != 16 * total:
+            return None
+        self.hash_archivo = bytes(datos[cabecera - 16:cabecera]).hex()
+        return leer_arreglo('Q', datos, cabecera, 2 * total)
+
+    def _guardar_indice(self):
+        """Guarda el índice de forma atómica; si no se puede escribir, se usa sólo en memoria."""
+        temporal = f"{self.ruta_indice}.{os.getpid()}.tmp"
+        try:
+            with open(temporal, 'wb') as f:
+                f.write(self._MAGIA)
+                f.write(arreglo_a_bytes(array('Q', [self._tamano, self._modificacion, len(self)])))
+                f.write(bytes.fromhex(self.hash_archivo))
+                f.write(arreglo_a_bytes(self._limites))
+            os.replace(temporal, self.ruta_indice)
+        except OSError:
+            try:
+                os.remove(temporal)
+            except OSError:
+                pass
@@ -2,15 +2,36 @@
 Módulo que contiene los modelos de datos para el clasificador de modelos de nube.
 """
 
+import json
+import mmap
+import os
+import sys
+from array import array
 from dataclasses import dataclass
-from typing import Dict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+from .utilidades import preprocesar_texto, arreglo_a_bytes, leer_arreglo
 
-@dataclass
+
+# Modelos de nube reconocidos, en el orden de las columnas de la matriz de puntajes
+ETIQUETAS_MODELO = ('IaaS', 'PaaS', 'SaaS', 'FaaS')
+
+# Todas las etiquetas que puede tomar un resultado (codificadas por su posición)
+ETIQUETAS_RESULTADO = ETIQUETAS_MODELO + ('No determinado', 'Error')
+
+# ``slots`` sólo existe en dataclass desde Python 3.10
+_OPCIONES_RESULTADO = {'frozen': True, 'slots': True} if sys.version_info >= (3, 10) else {'frozen': True}
+
+
+@dataclass(**_OPCIONES_RESULTADO)
 class ResultadoClasificacion:
     """
     Modelo de datos para el resultado de la clasificación.
-    
+
+    Es inmutable y, desde Python 3.10, usa ``__slots__`` en lugar de un
+    ``__dict__`` por instancia. Para derivar un resultado de otro se usa
+    ``dataclasses.replace``.
+
     Attributes:
         modelo: Modelo predicho (IaaS, PaaS, SaaS, FaaS, Error)
         confianza: Nivel de confianza (0.0 a 1.0)
@@ -18,6 +39,7 @@ class ResultadoClasificacion:
         texto_original: Texto original sin procesar
         texto_procesado: Texto después del preprocesamiento
         metodo: Método usado para la clasificación
+        metricas: Datos de la llamada al LLM (modelo usado, latencia, tokens), si la hubo
     """
     modelo: str
     confianza: float
@@ -25,3 +47,299 @@ class ResultadoClasificacion:
     texto_original: str
     texto_procesado: str
     metodo: str
+    metricas: Optional[Dict[str, Any]] = None
+
+
+class LoteResultados:
+    """
+    Contenedor columnar para los resultados de una clasificación por lotes.
+
+    En lugar de guardar un ``ResultadoClasificacion`` por fila, almacena cada
+    campo en un arreglo compacto:
+
+    - ``modelos``: código ``int8`` de la etiqueta (índice en ``ETIQUETAS_RESULTADO``)
+    - ``metodos``: código ``int8`` del método (índice en la tabla de métodos del lote)
+    - ``confianzas``: vector ``float64`` (los mismos valores que el resultado individual)
+    - ``puntajes``: matriz ``float32`` de ``n x 4`` (columnas en ``ETIQUETAS_MODELO``)
+
+    Los textos originales se guardan por referencia (o por desplazamiento
+    dentro de un bloque UTF-8 cuando el lote se carga desde disco), las
+    métricas se codifican en JSON en un bloque de bytes al agregar cada fila
+    y el texto procesado se recalcula al acceder a una fila. El acceso por
+    índice devuelve un ``ResultadoClasificacion`` igual al de la
+    clasificación individual salvo por los puntajes, redondeados a
+    precisión simple.
+
+    Es una API de biblioteca para quien clasifica en memoria con
+    ``clasificar_lote`` (y exporta a NumPy); el modo por lotes escribe JSONL
+    fila a fila porque su diario de progreso reanuda por registro.
+    """
+
+    _MAGIA = b'CMNLOTE3'
+
+    def __init__(self):
+        """Inicializa un lote vacío."""
+        self._modelos = array('b')
+        self._metodos = array('b')
+        self._confianzas = array('d')
+        self._puntajes = array('f')
+        self._tabla_metodos: List[str] = []
+        self._codigos_metodo: Dict[str, int] = {}
+
+        # Filas cargadas desde disco: bloques UTF-8 (textos y métricas en JSON)
+        # del archivo mapeado en memoria y sus desplazamientos (n + 1)
+        self._mapa: Optional[mmap.mmap] = None
+        self._bloque_textos: Any = b''
+        self._desplazamientos = array('Q', [0])
+        self._bloque_metricas: Any = b''
+        self._desplazamientos_metricas = array('Q', [0])
+        # Filas agregadas en memoria: textos por referencia y métricas ya
+        # codificadas en un bloque JSON (vacío si la fila no tiene métricas)
+        self._textos: List[str] = []
+        self._metricas_agregadas = bytearray()
+        self._desplazamientos_agregados = array('Q', [0])
+
+    def __len__(self) -> int:
+        return len(self._modelos)
+
+    def _posicion(self, indice: int) -> int:
+        """Convierte un índice (admite negativos) en una posición válida del lote."""
+        total = len(self)
+        if indice < 0:
+            indice += total
+        if not 0 <= indice < total:
+            raise IndexError("Índice fuera del rango del lote")
+        return indice
+
+    def __getitem__(self, indice: int) -> ResultadoClasificacion:
+        """
+        Devuelve la fila indicada como ``ResultadoClasificacion``.
+
+        Args:
+            indice: Posición de la fila (admite índices negativos)
+
+        Returns:
+            ResultadoClasificacion: Vista de la fila
+        """
+        indice = self._posicion(indice)
+
+        base = indice * len(ETIQUETAS_MODELO)
+        puntajes = {
+            etiqueta: self._puntajes[base + columna]
+            for columna, etiqueta in enumerate(ETIQUETAS_MODELO)
+        }
+        texto = self.texto(indice)
+
+        return ResultadoClasificacion(
+            modelo=ETIQUETAS_RESULTADO[self._modelos[indice]],
+            confianza=self._confianzas[indice],
+            puntajes=puntajes,
+            texto_original=texto,
+            texto_procesado=preprocesar_texto(texto),
+            metodo=self._tabla_metodos[self._metodos[indice]],
+            metricas=self.metricas(indice)
+        )
+
+    def __iter__(self) -> Iterator[ResultadoClasificacion]:
+        for indice in range(len(self)):
+            yield self[indice]
+
+    def texto(self, indice: int) -> str:
+        """
+        Retorna el texto original de una fila sin construir el resultado completo.
+
+        Args:
+            indice: Posición de la fila (admite índices negativos)
+
+        Returns:
+            str: Texto original
+        """
+        indice = self._posicion(indice)
+        cargados = len(self._desplazamientos) - 1
+        if indice < cargados:
+            inicio = self._desplazamientos[indice]
+            fin = self._desplazamientos[indice + 1]
+            return str(self._bloque_textos[inicio:fin], 'utf-8')
+        return self._textos[indice - cargados]
+
+    def metricas(self, indice: int) -> Optional[Dict[str, Any]]:
+        """
+        Retorna las métricas de la llamada al LLM de una fila, si las hay.
+
+        Args:
+            indice: Posición de la fila (admite índices negativos)
+
+        Returns:
+            Optional[Dict[str, Any]]: Métricas de la fila
+        """
+        indice = self._posicion(indice)
+        cargados = len(self._desplazamientos_metricas) - 1
+        if indice < cargados:
+            bloque, desplazamientos = self._bloque_metricas, self._desplazamientos_metricas
+        else:
+            bloque, desplazamientos = self._metricas_agregadas, self._desplazamientos_agregados
+            indice -= cargados
+        codificadas = bloque[desplazamientos[indice]:desplazamientos[indice + 1]]
+        return json.loads(str(codificadas, 'utf-8')) if len(codificadas) else None
+
+    def agregar(self, resultado: ResultadoClasificacion):
+        """
+        Agrega un resultado al final del lote.
+
+        Args:
+            resultado: Resultado de una clasificación individual
+        """
+        if resultado.modelo not in ETIQUETAS_RESULTADO:
+            raise ValueError(f"Modelo desconocido: {resultado.modelo}")
+
+        codigo_metodo = self._codigos_metodo.get(resultado.metodo)
+        if codigo_metodo is None:
+            codigo_metodo = len(self._tabla_metodos)
+            if codigo_metodo > 127:
+                raise ValueError("Demasiados métodos distintos en un mismo lote")
+            self._tabla_metodos.append(resultado.metodo)
+            self._codigos_metodo[resultado.metodo] = codigo_metodo
+
+        self._modelos.append(ETIQUETAS_RESULTADO.index(resultado.modelo))
+        self._metodos.append(codigo_metodo)
+        self._confianzas.append(resultado.confianza)
+        self._puntajes.extend(
+            resultado.puntajes.get(etiqueta, 0.0) for etiqueta in ETIQUETAS_MODELO
+        )
+        self._textos.append(resultado.texto_original)
+        if resultado.metricas is not None:
+            self._metricas_agregadas += json.dumps(resultado.metricas, ensure_ascii=False).encode('utf-8')
+        self._desplazamientos_agregados.append(len(self._metricas_agregadas))
+
+    def a_numpy(self) -> Dict[str, Any]:
+        """
+        Exporta las columnas numéricas como arreglos de NumPy sin copiarlas.
+
+        Los arreglos comparten memoria con el lote, por lo que el lote no puede
+        crecer mientras existan.
+
+        Returns:
+            Dict[str, Any]: Arreglos ``modelos``, ``metodos``, ``confianzas`` y ``puntajes``
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError("Se requiere numpy para exportar el lote: pip install numpy") from e
+
+        return {
+            'modelos': np.frombuffer(self._modelos, dtype=np.int8),
+            'metodos': np.frombuffer(self._metodos, dtype=np.int8),
+            'confianzas': np.frombuffer(self._confianzas, dtype=np.float64),
+            'puntajes': np.frombuffer(self._puntajes, dtype=np.float32).reshape(
+                -1, len(ETIQUETAS_MODELO)
+            ),
+        }
+
+    @property
+    def tabla_metodos(self) -> List[str]:
+        """Retorna la tabla que traduce los códigos de método a su nombre."""
+        return list(self._tabla_metodos)
+
+    @staticmethod
+    def _bloque(cargado: Any, desplazamientos: array,
+                agregados: List[bytes]) -> Tuple[List[Any], array]:
+        """Retorna las partes de un bloque (cargado más agregados) y sus desplazamientos."""
+        desplazamientos = array('Q', desplazamientos)
+        partes = [cargado[:desplazamientos[-1]]]
+        for contenido in agregados:
+            partes.append(contenido)
+            desplazamientos.append(desplazamientos[-1] + len(contenido))
+        return partes, desplazamientos
+
+    def _bloque_metricas_completo(self) -> Tuple[List[Any], array]:
+        """Retorna las partes del bloque de métricas (cargadas más agregadas) y sus desplazamientos."""
+        desplazamientos = array('Q', self._desplazamientos_metricas)
+        base = desplazamientos[-1]
+        desplazamientos.extend(base + fin for fin in self._desplazamientos_agregados[1:])
+        return [self._bloque_metricas[:base], self._metricas_agregadas], desplazamientos
+
+    def guardar(self, ruta: str):
+        """
+        Serializa el lote completo en un archivo binario.
+
+        Se escribe en un temporal que luego reemplaza al destino, de modo que
+        se puede guardar sobre el mismo archivo del que se cargó el lote.
+
+        Args:
+            ruta: Ruta del archivo de destino
+        """
+        textos, desplazamientos = self._bloque(
+            self._bloque_textos, self._desplazamientos,
+            [texto.encode('utf-8') for texto in self._textos]
+        )
+        metricas, desplazamientos_metricas = self._bloque_metricas_completo()
+        cabecera_metodos = json.dumps(self._tabla_metodos).encode('utf-8')
+
+        temporal = f"{ruta}.tmp"
+        with open(temporal, 'wb') as f:
+            f.write(self._MAGIA)
+            f.write(arreglo_a_bytes(array('Q', [len(self), len(cabecera_metodos)])))
+            f.write(cabecera_metodos)
+            f.write(self._modelos.tobytes())
+            f.write(self._metodos.tobytes())
+            f.write(arreglo_a_bytes(self._confianzas))
+            f.write(arreglo_a_bytes(self._puntajes))
+            f.write(arreglo_a_bytes(desplazamientos))
+            f.write(arreglo_a_bytes(desplazamientos_metricas))
+            for parte in textos + metricas:
+                f.write(parte)
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta: str) -> 'LoteResultados':
+        """
+        Carga un lote guardado con ``guardar``.
+
+        El archivo se mapea en memoria: las columnas numéricas se copian, pero
+        los textos y las métricas se leen del mapa sólo al acceder a cada fila.
+
+        Args:
+            ruta: Ruta del archivo binario
+
+        Returns:
+            LoteResultados: Lote reconstruido
+        """
+        with open(ruta, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < len(cls._MAGIA) + 16:
+                raise ValueError(f"El archivo no es un lote de resultados: {ruta}")
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        datos = memoryview(mapa)
+
+        if bytes(datos[:len(cls._MAGIA)]) != cls._MAGIA:
+            raise ValueError(f"El archivo no es un lote de resultados: {ruta}")
+
+        posicion = len(cls._MAGIA)
+        cabecera = leer_arreglo('Q', datos, posicion, 2)
+        total, longitud_metodos = cabecera
+        posicion += 16
+
+        lote = cls()
+        lote._mapa = mapa
+        lote._tabla_metodos = json.loads(bytes(datos[posicion:posicion + longitud_metodos]))
+        lote._codigos_metodo = {metodo: i for i, metodo in enumerate(lote._tabla_metodos)}
+        posicion += longitud_metodos
+
+        columnas = len(ETIQUETAS_MODELO)
+        lote._modelos = leer_arreglo('b', datos, posicion, total)
+        posicion += total
+        lote._metodos = leer_arreglo('b', datos, posicion, total)
+        posicion += total
+        lote._confianzas = leer_arreglo('d', datos, posicion, total)
+        posicion += 8 * total
+        lote._puntajes = leer_arreglo('f', datos, posicion, total * columnas)
+        posicion += 4 * total * columnas
+        lote._desplazamientos = leer_arreglo('Q', datos, posicion, total + 1)
+        posicion += 8 * (total + 1)
+        lote._desplazamientos_metricas = leer_arreglo('Q', datos, posicion, total + 1)
+        posicion += 8 * (total + 1)
+
+        fin_textos = posicion + lote._desplazamientos[-1]
+        lote._bloque_textos = datos[posicion:fin_textos]
+        lote._bloque_metricas = datos[fin_textos:fin_textos + lote._desplazamientos_metricas[-1]]
+
+        return lote
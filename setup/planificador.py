@@ -0,0 +1,232 @@
+"""
+Planificador de peticiones con prioridades para tráfico interactivo y por lotes.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, Iterable, Optional, Tuple
+
+
+PRIORIDAD_INTERACTIVA = 'interactiva'
+PRIORIDAD_LOTE = 'lote'
+PRIORIDAD_SOMBRA = 'sombra'
+
+# Peso de cada clase en el reparto justo de los trabajadores
+PESOS_POR_DEFECTO = {PRIORIDAD_INTERACTIVA: 8.0, PRIORIDAD_LOTE: 1.0}
+
+# Clases que sólo usan trabajadores ociosos (no entran en el reparto ponderado)
+CLASES_SECUNDARIAS = (PRIORIDAD_SOMBRA,)
+
+
+class PeticionExpirada(Exception):
+    """La petición superó su plazo antes de enviarse y se descartó."""
+
+
+class _Tarea:
+    """Petición encolada en el planificador."""
+
+    __slots__ = ('funcion', 'args', 'kwargs', 'futuro', 'vencimiento', 'encolada')
+
+    def __init__(self, funcion: Callable, args: tuple, kwargs: dict, vencimiento: Optional[float]):
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.futuro: Future = Future()
+        self.vencimiento = vencimiento
+        self.encolada = time.monotonic()
+
+
+class PlanificadorPeticiones:
+    """
+    Ejecuta las llamadas a los backends con un número fijo de trabajadores.
+
+    Cada clase de prioridad tiene su propia cola. Los trabajadores atienden las
+    colas con reparto justo ponderado (cada clase avanza un "pase" de
+    ``1 / peso`` por tarea y se atiende la de menor pase), así que el tráfico
+    interactivo se adelanta al de lotes sin dejarlo sin servicio. Algunos
+    trabajadores pueden reservarse para las clases interactivas, de modo que
+    una petición interactiva nunca espera a que termine una llamada de lote.
+    Las clases secundarias (el modo sombra) quedan fuera del reparto: sólo se
+    atienden cuando las demás colas están vacías y nunca en los trabajadores
+    reservados, así que no quitan capacidad al tráfico de producción. Las tareas cuyo plazo vence mientras esperan se descartan sin enviarse.
+    """
+
+    def __init__(self, trabajadores: int = 4, pesos: Optional[Dict[str, float]] = None,
+                 trabajadores_reservados: int = 1,
+                 clases_reservadas: Iterable[str] = (PRIORIDAD_INTERACTIVA,),
+                 clases_secundarias: Iterable[str] = CLASES_SECUNDARIAS):
+        """
+        Inicializa el planificador y arranca sus trabajadores.
+
+        Args:
+            trabajadores: Número total de trabajadores
+            pesos: Peso de cada clase de prioridad
+            trabajadores_reservados: Trabajadores que sólo atienden las clases reservadas
+            clases_reservadas: Clases que pueden usar los trabajadores reservados
+            clases_secundarias: Clases que sólo se atienden con las demás colas vacías
+        """
+        self.pesos = dict(pesos or PESOS_POR_DEFECTO)
+        self._secundarias = tuple(clases_secundarias)
+        for clase in self._secundarias:
+            self.pesos.setdefault(clase, 1.0)
+        self._colas: Dict[str, Deque[_Tarea]] = {clase: deque() for clase in self.pesos}
+        self._pases: Dict[str, float] = {clase: 0.0 for clase in self.pesos}
+        self._condicion = threading.Condition()
+        self._cerrado = False
+
+        self._estadisticas = {
+            clase: {"enviadas": 0, "completadas": 0, "expiradas": 0,
+                    "espera_total": 0.0, "espera_maxima": 0.0}
+            for clase in self.pesos
+        }
+
+        trabajadores_reservados = min(trabajadores_reservados, max(trabajadores - 1, 0))
+        clases_reservadas = tuple(c for c in clases_reservadas
+                                  if c in self.pesos and c not in self._secundarias)
+
+        self._hilos = []
+        for numero in range(trabajadores):
+            permitidas = clases_reservadas if numero < trabajadores_reservados else tuple(self.pesos)
+            hilo = threading.Thread(
+                target=self._trabajar, args=(permitidas,),
+                name=f"planificador-{numero}", daemon=True
+            )
+            hilo.start()
+            self._hilos.append(hilo)
+
+    def enviar(self, funcion: Callable, *args: Any, prioridad: str = PRIORIDAD_LOTE,
+               plazo: Optional[float] = None, **kwargs: Any) -> Future:
+        """
+        Encola una llamada.
+
+        Args:
+            funcion: Función a ejecutar
+            *args: Argumentos posicionales de la función
+            prioridad: Clase de prioridad
+            plazo: Segundos máximos de espera antes de descartarla (opcional)
+            **kwargs: Argumentos con nombre de la función
+
+        Returns:
+            Future: Resultado de la llamada (o ``PeticionExpirada``)
+        """
+        if prioridad not in self._colas:
+            raise ValueError(f"Prioridad desconocida: {prioridad}")
+
+        vencimiento = time.monotonic() + plazo if plazo is not None else None
+        tarea = _Tarea(funcion, args, kwargs, vencimiento)
+
+        with self._condicion:
+            if self._cerrado:
+                raise RuntimeError("El planificador está cerrado")
+
+            cola = self._colas[prioridad]
+            if not cola:
+                # Una clase que estuvo inactiva no acumula crédito
+                activas = [self._pases[c] for c, q in self._colas.items() if q]
+                if activas:
+                    self._pases[prioridad] = max(self._pases[prioridad], min(activas))
+
+            cola.append(tarea)
+            self._estadisticas[prioridad]["enviadas"] += 1
+            self._condicion.notify_all()
+
+        return tarea.futuro
+
+    def ejecutar(self, funcion: Callable, *args: Any, prioridad: str = PRIORIDAD_LOTE,
+                 plazo: Optional[float] = None, **kwargs: Any) -> Any:
+        """
+        Encola una llamada y espera su resultado.
+
+        Args:
+            funcion: Función a ejecutar
+            *args: Argumentos posicionales de la función
+            prioridad: Clase de prioridad
+            plazo: Segundos máximos de espera antes de descartarla (opcional)
+            **kwargs: Argumentos con nombre de la función
+
+        Returns:
+            Any: Valor devuelto por la función
+        """
+        return self.enviar(funcion, *args, prioridad=prioridad, plazo=plazo, **kwargs).result()
+
+    def cerrar(self):
+        """Deja de aceptar peticiones y espera a que se vacíen las colas."""
+        with self._condicion:
+            self._cerrado = True
+            self._condicion.notify_all()
+
+        for hilo in self._hilos:
+            hilo.join()
+
+    def estadisticas(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna las estadísticas de cada clase de prioridad.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Enviadas, completadas, expiradas, en cola y espera
+        """
+        with self._condicion:
+            resultado = {}
+            for clase, datos in self._estadisticas.items():
+                atendidas = datos["completadas"] + datos["expiradas"]
+                resultado[clase] = {
+                    "enviadas": datos["enviadas"],
+                    "completadas": datos["completadas"],
+                    "expiradas": datos["expiradas"],
+                    "en_cola": len(self._colas[clase]),
+                    "espera_media": datos["espera_total"] / atendidas if atendidas else 0.0,
+                    "espera_maxima": datos["espera_maxima"]
+                }
+            return resultado
+
+    def _siguiente(self, permitidas: Tuple[str, ...]) -> Optional[Tuple[str, _Tarea]]:
+        """Saca la siguiente tarea según el reparto ponderado (con el bloqueo tomado)."""
+        candidatas = [clase for clase in permitidas
+                      if self._colas[clase] and clase not in self._secundarias]
+        if not candidatas:
+            # Las clases secundarias sólo ocupan trabajadores que, si no, estarían ociosos
+            candidatas = [clase for clase in permitidas if self._colas[clase]]
+        if not candidatas:
+            return None
+
+        clase = min(candidatas, key=self._pases.__getitem__)
+        self._pases[clase] += 1.0 / self.pesos[clase]
+        return clase, self._colas[clase].popleft()
+
+    def _trabajar(self, permitidas: Tuple[str, ...]):
+        """Bucle de cada trabajador."""
+        while True:
+            with self._condicion:
+                siguiente = self._siguiente(permitidas)
+                while siguiente is None:
+                    if self._cerrado:
+                        return
+                    self._condicion.wait()
+                    siguiente = self._siguiente(permitidas)
+
+                clase, tarea = siguiente
+                ahora = time.monotonic()
+                espera = ahora - tarea.encolada
+                datos = self._estadisticas[clase]
+                datos["espera_total"] += espera
+                datos["espera_maxima"] = max(datos["espera_maxima"], espera)
+                expirada = tarea.vencimiento is not None and ahora > tarea.vencimiento
+                datos["expiradas" if expirada else "completadas"] += 1
+
+            if expirada:
+                tarea.futuro.set_exception(
+                    PeticionExpirada(f"La petición esperó {espera:.2f} s y superó su plazo")
+                )
+                continue
+
+            if not tarea.futuro.set_running_or_notify_cancel():
+                continue
+
+            try:
+                valor = tarea.funcion(*tarea.args, **tarea.kwargs)
+            except BaseException as e:
+                tarea.futuro.set_exception(e)
+            else:
+                tarea.futuro.set_result(valor)
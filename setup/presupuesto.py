@@ -0,0 +1,242 @@
+"""
+Contabilidad de tokens y costo de las llamadas al LLM y control del presupuesto.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+
+ACCION_DETENER = 'detener'
+ACCION_RALENTIZAR = 'ralentizar'
+ACCION_DEGRADAR = 'degradar'
+ACCIONES = (ACCION_DETENER, ACCION_RALENTIZAR, ACCION_DEGRADAR)
+
+
+class PresupuestoAgotado(Exception):
+    """Se alcanzó el límite de tokens o de costo y no se permiten más llamadas."""
+
+
+def _completar_uso(uso: Dict[str, Any]) -> Dict[str, Any]:
+    """Añade los tokens totales y el costo (None si alguna llamada no tiene precio)."""
+    uso["tokens"] = uso["tokens_entrada"] + uso["tokens_salida"]
+    uso["costo"] = None if uso["llamadas_sin_precio"] else uso["costo_conocido"]
+    return uso
+
+
+class ContadorUso:
+    """
+    Acumula las llamadas, los tokens y el costo estimado de las llamadas al LLM.
+
+    Las llamadas a modelos sin precio en MODEL_PRICES se cuentan aparte: el
+    costo total es desconocido (None) en cuanto hay alguna, en lugar de
+    contarlas como gratuitas.
+    """
+
+    def __init__(self):
+        """Inicializa los contadores a cero."""
+        self._bloqueo = threading.Lock()
+        self._uso = {"llamadas": 0, "tokens_entrada": 0, "tokens_salida": 0,
+                     "costo_conocido": 0.0, "llamadas_sin_precio": 0}
+
+    def registrar(self, metricas: Dict[str, Any]):
+        """
+        Suma el uso de una llamada.
+
+        Args:
+            metricas: Métricas de la llamada (``tokens_entrada``, ``tokens_salida`` y ``costo``)
+        """
+        costo = metricas.get("costo")
+        with self._bloqueo:
+            self._uso["llamadas"] += 1
+            self._uso["tokens_entrada"] += metricas.get("tokens_entrada", 0)
+            self._uso["tokens_salida"] += metricas.get("tokens_salida", 0)
+            if costo is None:
+                self._uso["llamadas_sin_precio"] += 1
+            else:
+                self._uso["costo_conocido"] += costo
+
+    def instantanea(self) -> Dict[str, Any]:
+        """
+        Retorna el uso acumulado hasta ahora.
+
+        Returns:
+            Dict[str, Any]: Llamadas, tokens de entrada y salida, tokens totales,
+            costo de las llamadas con precio, llamadas sin precio y costo total
+            (None si alguna llamada no tiene precio)
+        """
+        with self._bloqueo:
+            uso = dict(self._uso)
+        return _completar_uso(uso)
+
+    @staticmethod
+    def diferencia(final: Dict[str, Any], inicial: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Retorna el uso entre dos instantáneas (por ejemplo, el de un trabajo).
+
+        Args:
+            final: Instantánea tomada al final
+            inicial: Instantánea tomada al principio
+
+        Returns:
+            Dict[str, Any]: Uso del intervalo
+        """
+        return _completar_uso({
+            clave: final[clave] - inicial[clave]
+            for clave in ("llamadas", "tokens_entrada", "tokens_salida",
+                          "costo_conocido", "llamadas_sin_precio")
+        })
+
+
+# Uso de todos los clasificadores del proceso
+_uso_proceso = ContadorUso()
+
+
+def uso_proceso() -> Dict[str, Any]:
+    """
+    Retorna el uso acumulado por todos los clasificadores del proceso.
+
+    Returns:
+        Dict[str, Any]: Llamadas, tokens y costo
+    """
+    return _uso_proceso.instantanea()
+
+
+def registrar_uso_proceso(metricas: Dict[str, Any]):
+    """
+    Suma el uso de una llamada al contador del proceso.
+
+    Args:
+        metricas: Métricas de la llamada
+    """
+    _uso_proceso.registrar(metricas)
+
+
+class ControlPresupuesto:
+    """
+    Aplica un límite de tokens y/o de costo al uso de un contador.
+
+    Al llegar al umbral (por defecto el 90 % del límite) se aplica la acción
+    configurada: ``detener`` rechaza las llamadas siguientes, ``ralentizar``
+    espera antes de cada llamada y ``degradar`` las envía a un modelo más
+    barato. Al llegar al 100 % se rechazan siempre.
+
+    Con un límite de costo y una tabla de precios, las llamadas a modelos sin
+    precio se rechazan: su costo no se puede contar contra el límite.
+    """
+
+    def __init__(self, contador: ContadorUso, limite_tokens: int = 0, limite_costo: float = 0.0,
+                 umbral: float = 0.9, accion: str = ACCION_DETENER,
+                 modelo_degradado: str = '', pausa: float = 1.0,
+                 precios: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        Inicializa el control.
+
+        Args:
+            contador: Contador cuyo uso se limita
+            limite_tokens: Tokens máximos (0 sin límite)
+            limite_costo: Costo máximo en USD (0 sin límite)
+            umbral: Fracción del límite a partir de la que se aplica la acción
+            accion: ``detener``, ``ralentizar`` o ``degradar``
+            modelo_degradado: Modelo para la acción ``degradar``
+            pausa: Segundos de espera por llamada para la acción ``ralentizar``
+            precios: Precio por millón de tokens de cada modelo (opcional)
+        """
+        if accion not in ACCIONES:
+            raise ValueError(f"Acción de presupuesto desconocida: {accion}")
+        if accion == ACCION_DEGRADAR and not modelo_degradado:
+            raise ValueError("La acción 'degradar' necesita un modelo degradado")
+        if (accion == ACCION_DEGRADAR and limite_costo > 0 and precios is not None
+                and not precios.get(modelo_degradado)):
+            raise ValueError(f"El modelo degradado {modelo_degradado} no tiene precio en MODEL_PRICES")
+
+        self.contador = contador
+        self.limite_tokens = limite_tokens
+        self.limite_costo = limite_costo
+        self.umbral = umbral
+        self.accion = accion
+        self.modelo_degradado = modelo_degradado
+        self.pausa = pausa
+        self.precios = precios
+        self._activaciones = 0
+
+    def fraccion_usada(self) -> float:
+        """
+        Retorna la fracción consumida del límite más cercano a agotarse.
+
+        Returns:
+            float: Fracción usada (0.0 si no hay límites)
+        """
+        uso = self.contador.instantanea()
+        fracciones = [0.0]
+        if self.limite_tokens > 0:
+            fracciones.append(uso["tokens"] / self.limite_tokens)
+        if self.limite_costo > 0:
+            fracciones.append(uso["costo_conocido"] / self.limite_costo)
+        return max(fracciones)
+
+    def autorizar(self, modelo: str) -> str:
+        """
+        Autoriza una llamada y retorna el modelo con el que hacerla.
+
+        Args:
+            modelo: Modelo previsto para la llamada
+
+        Returns:
+            str: Modelo a usar (el degradado si se superó el umbral con ``degradar``)
+
+        Raises:
+            PresupuestoAgotado: Si el presupuesto no permite más llamadas o si hay
+                límite de costo y el modelo no tiene precio
+        """
+        if self.limite_costo > 0 and self.precios is not None and not self.precios.get(modelo):
+            raise PresupuestoAgotado(
+                f"El modelo {modelo} no tiene precio en MODEL_PRICES; no se puede aplicar BUDGET_COST"
+            )
+
+        fraccion = self.fraccion_usada()
+        if fraccion < self.umbral:
+            return modelo
+
+        self._activaciones += 1
+        if fraccion >= 1.0 or self.accion == ACCION_DETENER:
+            raise PresupuestoAgotado(f"Presupuesto consumido al {fraccion:.0%}")
+
+        if self.accion == ACCION_RALENTIZAR:
+            time.sleep(self.pausa)
+            return modelo
+
+        return self.modelo_degradado
+
+    def estado(self) -> Dict[str, Any]:
+        """
+        Retorna los límites, el uso y la acción del presupuesto.
+
+        Returns:
+            Dict[str, Any]: Estado del presupuesto
+        """
+        return {
+            "limite_tokens": self.limite_tokens,
+            "limite_costo": self.limite_costo,
+            "fraccion_usada": self.fraccion_usada(),
+            "umbral": self.umbral,
+            "accion": self.accion,
+            "activaciones": self._activaciones
+        }
+
+
+def costo_por_mil(costo: Optional[float], clasificaciones: int) -> Optional[float]:
+    """
+    Retorna el costo por cada mil clasificaciones.
+
+    Args:
+        costo: Costo total en USD (None si se desconoce)
+        clasificaciones: Clasificaciones realizadas
+
+    Returns:
+        Optional[float]: Costo por mil clasificaciones, o None si no hubo
+        ninguna o si el costo se desconoce
+    """
+    if costo is None or not clasificaciones:
+        return None
+    return costo * 1000 / clasificaciones
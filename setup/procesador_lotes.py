@@ -0,0 +1,382 @@
+"""
+Procesamiento por lotes de archivos de entrada para el clasificador de modelos de nube.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, fields, replace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .clasificador import ClasificadorModelosNube
+from .diario import DiarioProgreso
+from .lector import LectorCorpus
+from .modelos import ResultadoClasificacion
+from .presupuesto import ContadorUso, costo_por_mil
+from .procesos import PoolProcesosLocal
+from .utilidades import hash_contenido, preprocesar_texto
+
+
+class TrabajoCancelado(Exception):
+    """Se pidió cancelar el trabajo en curso; el diario se conserva para reanudarlo."""
+
+
+class ProcesadorLotes:
+    """Clasifica un corpus completo (o un rango de registros) y escribe los resultados en JSONL."""
+
+    def __init__(self, clasificador: Optional[ClasificadorModelosNube] = None,
+                 tamano_bloque: int = 1000, tamano_grupo_diario: int = 100,
+                 deduplicar: bool = True, procesos: Optional[int] = None,
+                 capacidad_cache: int = 100000):
+        """
+        Inicializa el procesador.
+
+        Args:
+            clasificador: Clasificador a usar (por defecto uno nuevo con NLP)
+            tamano_bloque: Registros que se clasifican y escriben por bloque
+            tamano_grupo_diario: Registros del diario entre dos sincronizaciones con disco
+            deduplicar: Si los registros con el mismo texto preprocesado se clasifican una sola vez
+            procesos: Procesos que ejecutan el modelo local (por defecto BATCH_PROCESSES)
+            capacidad_cache: Textos distintos cuyo resultado se recuerda para deduplicar
+                (se descartan los menos usados)
+        """
+        self.clasificador = clasificador or ClasificadorModelosNube(usar_nlp=True)
+        self.tamano_bloque = tamano_bloque
+        self.tamano_grupo_diario = tamano_grupo_diario
+        self.deduplicar = deduplicar
+        self.capacidad_cache = capacidad_cache
+        self.procesos = self.clasificador.config.procesos_lotes if procesos is None else procesos
+        self._pool_local: Optional[PoolProcesosLocal] = None
+        self._cancelado = threading.Event()
+
+    def cancelar(self):
+        """
+        Pide que el trabajo en curso se detenga tras el resultado que se está clasificando.
+
+        Se puede llamar desde otro hilo; ``procesar`` lanza entonces ``TrabajoCancelado``.
+        """
+        self._cancelado.set()
+
+    def procesar(self, ruta_entrada: str, ruta_salida: str,
+                 inicio: int = 0, fin: Optional[int] = None,
+                 reanudar: bool = False, ruta_anterior: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Clasifica los registros ``[inicio, fin)`` del archivo de entrada.
+
+        Cada línea de salida contiene el número de registro (``id``), los
+        campos de ``ResultadoClasificacion``, el hash del texto preprocesado
+        (``hash``) y la huella de la configuración del clasificador
+        (``huella``). Mientras el trabajo avanza, los
+        resultados se anotan en ``<ruta_salida>.diario``; el archivo de salida
+        sólo se reemplaza cuando el trabajo termina, así que una interrupción
+        nunca deja una salida a medias. Con ``reanudar`` se reutilizan los
+        resultados del diario y sólo se clasifican los registros pendientes
+        (los que terminaron con error se reintentan).
+
+        Con ``deduplicar``, los registros se agrupan por su texto preprocesado
+        y cada texto distinto se clasifica una sola vez durante todo el
+        trabajo; el resultado se replica en cada registro conservando su
+        ``texto_original``.
+
+        Con ``procesos`` mayor que 1 y un modelo local cargado, el modelo local
+        se ejecuta en varios procesos que comparten el modelo en uso al
+        empezar el trabajo; sólo los textos que no resuelve van a la API.
+
+        Con ``ruta_anterior`` (la salida de un trabajo previo, puede ser la
+        misma ``ruta_salida``) la clasificación es incremental: los registros
+        cuyo hash ya aparece allí con la huella actual reutilizan ese resultado
+        y sólo los nuevos, los modificados o los de huella obsoleta se
+        clasifican. La salida sigue siendo el resultado completo.
+
+        Args:
+            ruta_entrada: Archivo de texto o JSONL con un registro por línea
+            ruta_salida: Archivo JSONL de resultados
+            inicio: Primer registro a clasificar
+            fin: Registro final exclusivo (por defecto, el final del archivo)
+            reanudar: Si se debe continuar un trabajo interrumpido
+            ruta_anterior: Salida de un trabajo previo cuyos resultados vigentes se reutilizan
+
+        Returns:
+            Dict[str, Any]: Resumen del trabajo
+
+        Raises:
+            PresupuestoAgotado: Si se agota el presupuesto; el diario se conserva
+            para reanudar el trabajo
+            TrabajoCancelado: Si se llamó a ``cancelar``; el diario también se conserva
+        """
+        self._cancelado.clear()
+        tiempo_inicio = time.perf_counter()
+        uso_inicial = self.clasificador.uso.instantanea()
+        total = 0
+        errores = 0
+        reanudados = 0
+        self._clasificaciones = 0
+        self._reutilizados = 0
+        # Hash del texto preprocesado -> (modelo, confianza, puntajes, metodo, metricas)
+        self._cache_claves: OrderedDict = OrderedDict()
+        huella = self.clasificador.huella_configuracion()
+        self._anteriores = self._cargar_anteriores(ruta_anterior, huella) if ruta_anterior else {}
+
+        ruta_temporal = f"{ruta_salida}.tmp"
+        diario = DiarioProgreso(f"{ruta_salida}.diario", tamano_grupo=self.tamano_grupo_diario)
+
+        # Más procesos que núcleos sólo añaden comunicación; con un núcleo se predice aquí
+        modelo_local = self.clasificador.modelo_local
+        procesos = min(self.procesos, os.cpu_count() or 1)
+        if procesos > 1 and modelo_local is not None:
+            self._pool_local = PoolProcesosLocal(
+                modelo_local, procesos, ruta_modelo=self.clasificador.config.ruta_modelo_local
+            )
+
+        try:
+            with LectorCorpus(ruta_entrada) as lector:
+                fin = len(lector) if fin is None else min(fin, len(lector))
+                # El hash del contenido detecta ediciones que conservan el tamaño
+                # (la fecha no sirve: el spool la actualiza al reclamar el archivo)
+                identidad = {**lector.identidad(), "inicio": inicio, "fin": fin}
+                completados = diario.abrir(identidad, reanudar=reanudar)
+                if self.deduplicar:
+                    # Los textos ya clasificados antes de la interrupción no vuelven a la API
+                    for linea in completados.values():
+                        datos = json.loads(linea)
+                        if datos.get("hash"):
+                            self._recordar(datos["hash"], ResultadoClasificacion(
+                                **{campo.name: datos.get(campo.name)
+                                   for campo in fields(ResultadoClasificacion)}
+                            ))
+
+                with open(ruta_temporal, 'w', encoding='utf-8') as salida:
+                    for inicio_bloque in range(inicio, fin, self.tamano_bloque):
+                        fin_bloque = min(inicio_bloque + self.tamano_bloque, fin)
+                        pendientes = [
+                            i for i in range(inicio_bloque, fin_bloque) if i not in completados
+                        ]
+                        nuevas = {}
+                        for id_registro, resultado in self._clasificar_bloque(lector, pendientes):
+                            if self._cancelado.is_set():
+                                raise TrabajoCancelado("Trabajo cancelado")
+                            linea = json.dumps({
+                                "id": id_registro,
+                                **asdict(resultado),
+                                "hash": hash_contenido(resultado.texto_procesado),
+                                "huella": huella
+                            }, ensure_ascii=False)
+                            nuevas[id_registro] = linea
+                            if resultado.modelo == "Error":
+                                errores += 1
+                            else:
+                                diario.registrar(linea)
+
+                        for id_registro in range(inicio_bloque, fin_bloque):
+                            linea = nuevas.get(id_registro)
+                            if linea is None:
+                                linea = completados.pop(id_registro)
+                                reanudados += 1
+                            salida.write(linea + "\n")
+
+                        total += fin_bloque - inicio_bloque
+
+                    salida.flush()
+                    os.fsync(salida.fileno())
+
+            os.replace(ruta_temporal, ruta_salida)
+            diario.eliminar()
+        finally:
+            diario.cerrar()
+            if self._pool_local is not None:
+                self._pool_local.cerrar()
+                self._pool_local = None
+
+        duracion = time.perf_counter() - tiempo_inicio
+        procesados = total - reanudados
+        self._cache_claves = OrderedDict()
+        self._anteriores = {}
+        uso = ContadorUso.diferencia(self.clasificador.uso.instantanea(), uso_inicial)
+
+        return {
+            "total_registros": total,
+            "reanudados": reanudados,
+            "clasificaciones": self._clasificaciones,
+            "reutilizados": self._reutilizados,
+            "ratio_deduplicacion": (
+                1 - (self._clasificaciones + self._reutilizados) / procesados if procesados else 0.0
+            ),
+            "errores": errores,
+            "duracion_segundos": duracion,
+            "registros_por_segundo": total / duracion if duracion > 0 else 0.0,
+            "uso": uso,
+            "costo_por_1000": costo_por_mil(uso["costo"], procesados),
+            "backends": self.clasificador.estadisticas_backends(),
+            "enrutamiento": self.clasificador.estadisticas_enrutamiento(),
+            "reglas": self.clasificador.estadisticas_reglas(),
+            # Se da un margen al candidato para terminar las muestras de este trabajo
+            "sombra": self.clasificador.estadisticas_sombra(esperar=5.0)
+        }
+
+    def _clasificar_bloque(self, lector: LectorCorpus,
+                           pendientes: List[int]) -> Iterator[Tuple[int, ResultadoClasificacion]]:
+        """
+        Clasifica los registros pendientes de un bloque.
+
+        Los pares ``(id, resultado)`` se entregan en cuanto cada resultado está
+        disponible, no necesariamente en orden de ``id``. Al terminar el bloque,
+        las clasificaciones hechas en él (una por texto distinto, sin los
+        duplicados ni los resultados reutilizados) se añaden al historial.
+
+        Args:
+            lector: Lector del corpus de entrada
+            pendientes: Números de registro a clasificar
+
+        Yields:
+            Tuple[int, ResultadoClasificacion]: Registro y su resultado
+        """
+        clasificados: List[ResultadoClasificacion] = []
+        try:
+            yield from self._clasificar_pendientes(lector, pendientes, clasificados)
+        finally:
+            self.clasificador.registrar_historial(clasificados)
+
+    def _clasificar_pendientes(self, lector: LectorCorpus, pendientes: List[int],
+                               clasificados: List[ResultadoClasificacion]
+                               ) -> Iterator[Tuple[int, ResultadoClasificacion]]:
+        """Clasifica los registros pendientes y anota en ``clasificados`` lo que llegó a clasificarse."""
+        if not self.deduplicar:
+            por_clasificar = []
+            for id_registro in pendientes:
+                texto = lector.registro(id_registro)
+                anterior = self._reutilizar(texto, preprocesar_texto(texto))
+                if anterior is None:
+                    por_clasificar.append((id_registro, texto))
+                else:
+                    yield id_registro, anterior
+            resultados = self._clasificar_textos([texto for _, texto in por_clasificar])
+            for (id_registro, _), resultado in zip(por_clasificar, resultados):
+                self._clasificaciones += 1
+                clasificados.append(resultado)
+                yield id_registro, resultado
+            return
+
+        # Agrupar los registros del bloque por su texto preprocesado
+        textos: Dict[int, str] = {}
+        registros_por_clave: Dict[str, List[int]] = {}
+        for id_registro in pendientes:
+            texto = lector.registro(id_registro)
+            textos[id_registro] = texto
+            registros_por_clave.setdefault(preprocesar_texto(texto), []).append(id_registro)
+
+        # Las claves ya clasificadas en bloques o trabajos anteriores no vuelven a la API
+        claves_nuevas = []
+        for clave, registros in registros_por_clave.items():
+            resultado = self._recordado(clave)
+            if resultado is None:
+                resultado = self._reutilizar(textos[registros[0]], clave)
+                if resultado is None:
+                    claves_nuevas.append(clave)
+                    continue
+                self._recordar(hash_contenido(clave), resultado)
+            for id_registro in registros:
+                yield id_registro, replace(resultado, texto_original=textos[id_registro])
+
+        resultados = self._clasificar_textos(
+            [textos[registros_por_clave[clave][0]] for clave in claves_nuevas]
+        )
+        for clave, resultado in zip(claves_nuevas, resultados):
+            self._clasificaciones += 1
+            clasificados.append(resultado)
+            if resultado.modelo != "Error":
+                self._recordar(hash_contenido(clave), resultado)
+            for id_registro in registros_por_clave[clave]:
+                yield id_registro, replace(resultado, texto_original=textos[id_registro])
+
+    def _recordar(self, hash_clave: str, resultado: ResultadoClasificacion):
+        """Guarda en la caché de deduplicación la etiqueta y los puntajes de un texto, sin sus textos."""
+        self._cache_claves[hash_clave] = (
+            resultado.modelo, resultado.confianza, resultado.puntajes,
+            resultado.metodo, resultado.metricas
+        )
+        self._cache_claves.move_to_end(hash_clave)
+        while len(self._cache_claves) > self.capacidad_cache:
+            self._cache_claves.popitem(last=False)
+
+    def _recordado(self, clave: str) -> Optional[ResultadoClasificacion]:
+        """Retorna el resultado recordado de un texto preprocesado (sin texto original), si lo hay."""
+        hash_clave = hash_contenido(clave)
+        recordado = self._cache_claves.get(hash_clave)
+        if recordado is None:
+            return None
+        self._cache_claves.move_to_end(hash_clave)
+        modelo, confianza, puntajes, metodo, metricas = recordado
+        return ResultadoClasificacion(modelo, confianza, puntajes, '', clave, metodo, metricas)
+
+    def _cargar_anteriores(self, ruta: str, huella: str) -> Dict[str, str]:
+        """
+        Lee los resultados vigentes de un trabajo anterior.
+
+        Args:
+            ruta: Archivo JSONL de resultados anterior
+            huella: Huella de la configuración actual
+
+        Returns:
+            Dict[str, str]: Línea de resultado por hash de contenido, sólo de los
+            registros sin error clasificados con la misma huella
+        """
+        anteriores = {}
+        if not os.path.exists(ruta):
+            return anteriores
+
+        with open(ruta, 'r', encoding='utf-8') as f:
+            for linea in f:
+                try:
+                    datos = json.loads(linea)
+                except ValueError:
+                    continue
+                if datos.get("huella") == huella and datos.get("hash") and datos.get("modelo") != "Error":
+                    anteriores[datos["hash"]] = linea
+        return anteriores
+
+    def _reutilizar(self, texto: str, clave: str) -> Optional[ResultadoClasificacion]:
+        """Retorna el resultado anterior vigente de un texto, si lo hay."""
+        if not self._anteriores:
+            return None
+        linea = self._anteriores.get(hash_contenido(clave))
+        if linea is None:
+            return None
+
+        datos = json.loads(linea)
+        self._reutilizados += 1
+        return replace(ResultadoClasificacion(
+            **{campo.name: datos.get(campo.name) for campo in fields(ResultadoClasificacion)}
+        ), texto_original=texto)
+
+    def _clasificar_textos(self, textos: List[str]) -> Iterator[ResultadoClasificacion]:
+        """
+        Clasifica textos en orden, resolviendo primero con las reglas y el modelo local en varios procesos.
+
+        Args:
+            textos: Textos a clasificar
+
+        Yields:
+            ResultadoClasificacion: Resultado de cada texto, en el mismo orden
+        """
+        if self._pool_local is None:
+            yield from self.clasificador.clasificar_varios(textos)
+            return
+
+        # Las reglas son baratas y van primero; el modelo local, en los procesos
+        locales = [
+            self.clasificador.clasificar_con_reglas(texto) if self.clasificador.es_entrada_valida(texto)
+            else None
+            for texto in textos
+        ]
+        sin_resolver = [i for i, local in enumerate(locales) if local is None]
+        predicciones = self._pool_local.predecir([textos[i] for i in sin_resolver])
+        for i, (texto_procesado, prediccion) in zip(sin_resolver, predicciones):
+            locales[i] = self.clasificador.aceptar_prediccion_local(textos[i], texto_procesado, prediccion)
+        remotos = self.clasificador.clasificar_varios(
+            (texto for texto, local in zip(textos, locales) if local is None),
+            usar_modelo_local=False
+        )
+        for local in locales:
+            yield local if local is not None else next(remotos)
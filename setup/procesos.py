@@ -0,0 +1,122 @@
+"""
+Ejecución del modelo local en varios procesos para aprovechar todos los núcleos.
+"""
+
+import gc
+import multiprocessing
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .destilacion import ModeloLocal
+from .utilidades import preprocesar_texto
+
+
+Prediccion = Optional[Tuple[str, float, Dict[str, float]]]
+
+# Modelo de cada proceso trabajador (sólo se asigna en los trabajadores)
+_modelo_proceso: Optional[ModeloLocal] = None
+
+
+def _asignar_modelo_proceso(modelo: ModeloLocal):
+    """Fija el modelo del trabajador (con fork, el objeto heredado del padre)."""
+    global _modelo_proceso
+    _modelo_proceso = modelo
+
+
+def _cargar_modelo_proceso(ruta_modelo: str):
+    """Carga el modelo una vez por proceso cuando no se puede heredar con fork."""
+    global _modelo_proceso
+    _modelo_proceso = ModeloLocal.cargar(ruta_modelo)
+
+
+def _predecir_trozo(textos: List[str]) -> List[Tuple[str, Prediccion]]:
+    """Preprocesa y predice un trozo de textos en el proceso trabajador."""
+    resultados = []
+    for texto in textos:
+        texto_procesado = preprocesar_texto(texto) if isinstance(texto, str) else ''
+        resultados.append((texto_procesado, _modelo_proceso.predecir(texto_procesado)))
+    return resultados
+
+
+class PoolProcesosLocal:
+    """
+    Reparte la predicción del modelo local entre varios procesos.
+
+    Donde existe ``fork`` y el proceso no tiene otros hilos, los trabajadores
+    heredan el modelo ya cargado y lo comparten con el padre por copia en
+    escritura; antes de crearlos se congelan los objetos del recolector de
+    basura para que no se copien sus páginas. Si hay hilos en marcha (el
+    planificador o el modo sombra), un fork podría heredar bloqueos tomados por
+    ellos, así que se usa ``forkserver`` (o ``spawn``) y cada trabajador carga el
+    modelo desde disco, o lo recibe serializado, una sola vez al arrancar. Los
+    textos se envían en trozos grandes para amortizar la comunicación entre
+    procesos.
+    """
+
+    def __init__(self, modelo: ModeloLocal, procesos: Optional[int] = None,
+                 tamano_trozo: int = 2000, ruta_modelo: Optional[str] = None):
+        """
+        Inicializa el pool y arranca sus procesos.
+
+        Args:
+            modelo: Modelo local ya cargado
+            procesos: Número de procesos (por defecto, uno por núcleo)
+            tamano_trozo: Textos que se envían a un proceso de una vez
+            ruta_modelo: Archivo del modelo que cargan los trabajadores cuando no se
+                puede usar ``fork`` (sin él, el modelo se les envía serializado)
+        """
+        self.procesos = procesos or os.cpu_count() or 1
+        self.tamano_trozo = tamano_trozo
+        metodos = multiprocessing.get_all_start_methods()
+
+        if 'fork' in metodos and threading.active_count() == 1:
+            self.metodo_inicio = 'fork'
+            gc.freeze()
+            try:
+                # Con fork los argumentos del inicializador se heredan sin serializarse
+                self._pool = multiprocessing.get_context('fork').Pool(
+                    self.procesos, initializer=_asignar_modelo_proceso, initargs=(modelo,)
+                )
+            finally:
+                gc.unfreeze()
+        else:
+            self.metodo_inicio = 'forkserver' if 'forkserver' in metodos else 'spawn'
+            if ruta_modelo:
+                inicializador, argumentos = _cargar_modelo_proceso, (ruta_modelo,)
+            else:
+                inicializador, argumentos = _asignar_modelo_proceso, (modelo,)
+            self._pool = multiprocessing.get_context(self.metodo_inicio).Pool(
+                self.procesos, initializer=inicializador, initargs=argumentos
+            )
+
+    def predecir(self, textos: List[str]) -> List[Tuple[str, Prediccion]]:
+        """
+        Preprocesa y predice los textos en los procesos trabajadores.
+
+        Args:
+            textos: Textos a predecir
+
+        Returns:
+            List[Tuple[str, Prediccion]]: Texto preprocesado y predicción de
+            cada texto, en el mismo orden
+        """
+        # Trozos grandes, pero suficientes para ocupar todos los procesos
+        tamano = max(1, min(self.tamano_trozo, -(-len(textos) // self.procesos)))
+        trozos = [textos[i:i + tamano] for i in range(0, len(textos), tamano)]
+
+        resultados = []
+        for trozo in self._pool.imap(_predecir_trozo, trozos):
+            resultados.extend(trozo)
+        return resultados
+
+    def cerrar(self):
+        """Termina los procesos trabajadores."""
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self) -> 'PoolProcesosLocal':
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
@@ -0,0 +1,238 @@
+"""
+Motor de reglas de productos y frases clave (Aho-Corasick) para preclasificar sin llamar al LLM.
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from .modelos import ETIQUETAS_MODELO
+from .utilidades import preprocesar_texto, quitar_acentos
+
+
+# Diccionario de reglas incluido con el paquete
+RUTA_REGLAS_POR_DEFECTO = os.path.join(os.path.dirname(__file__), 'reglas.txt')
+
+
+def cargar_reglas(ruta: str) -> List[Tuple[str, str]]:
+    """
+    Lee un diccionario de reglas.
+
+    Cada línea tiene la forma ``<modelo>: <frase>, <frase>, ...``; las líneas
+    vacías y las que empiezan por ``#`` se ignoran. Las frases se normalizan
+    con ``preprocesar_texto``.
+
+    Args:
+        ruta: Archivo del diccionario
+
+    Returns:
+        List[Tuple[str, str]]: Pares (frase preprocesada, modelo)
+    """
+    reglas = []
+
+    with open(ruta, 'r', encoding='utf-8') as f:
+        for numero, linea in enumerate(f, 1):
+            linea = linea.strip()
+            if not linea or linea.startswith('#'):
+                continue
+
+            etiqueta, separador, frases = linea.partition(':')
+            etiqueta = etiqueta.strip()
+            if not separador or etiqueta not in ETIQUETAS_MODELO:
+                raise ValueError(f"{ruta}:{numero}: se esperaba '<modelo>: <frases>'")
+
+            for frase in frases.split(','):
+                frase = preprocesar_texto(frase)
+                if frase:
+                    reglas.append((frase, etiqueta))
+
+    return reglas
+
+
+class MotorReglas:
+    """
+    Clasifica por las frases conocidas que aparecen en el texto.
+
+    Todas las frases se compilan en un único autómata de Aho-Corasick sobre el
+    texto preprocesado, así que el costo de buscar no depende del tamaño del
+    diccionario. Las frases y el texto se comparan sin tildes, de modo que
+    "maquinas virtuales" encuentra "máquinas virtuales". Sólo cuentan las
+    coincidencias de palabras completas, y una
+    frase contenida en otra más larga que también aparece se descarta (por
+    ejemplo, "cloud functions" dentro de "google cloud functions"). Si todas
+    las frases encontradas indican el mismo modelo, se responde con él; si no
+    hay ninguna o indican modelos distintos, se deja el texto al LLM.
+    """
+
+    def __init__(self, reglas: List[Tuple[str, str]], confianza: float = 0.95):
+        """
+        Compila el autómata.
+
+        Args:
+            reglas: Pares (frase preprocesada, modelo)
+            confianza: Confianza de las respuestas del motor
+        """
+        self.confianza = confianza
+
+        # Una frase repetida se queda con su última etiqueta
+        etiquetas = {quitar_acentos(frase): etiqueta for frase, etiqueta in reglas}
+        self.frases: List[str] = list(etiquetas)
+        self.etiquetas: List[str] = [etiquetas[frase] for frase in self.frases]
+
+        self._transiciones: List[Dict[str, int]] = [{}]
+        self._fallos: List[int] = [0]
+        self._salidas: List[List[int]] = [[]]
+        self._compilar()
+
+        self._bloqueo = threading.Lock()
+        self._consultas = 0
+        self._resueltas = 0
+        self._conflictos = 0
+        self._coincidencias = [0] * len(self.frases)
+        self._aciertos = [0] * len(self.frases)
+
+    @classmethod
+    def desde_archivo(cls, ruta: str, confianza: float = 0.95) -> 'MotorReglas':
+        """
+        Crea un motor a partir de un diccionario de reglas.
+
+        Args:
+            ruta: Archivo del diccionario
+            confianza: Confianza de las respuestas del motor
+
+        Returns:
+            MotorReglas: Motor compilado
+        """
+        return cls(cargar_reglas(ruta), confianza=confianza)
+
+    def _compilar(self):
+        """Construye el trie de las frases y sus enlaces de fallo."""
+        for indice, frase in enumerate(self.frases):
+            estado = 0
+            for caracter in frase:
+                siguiente = self._transiciones[estado].get(caracter)
+                if siguiente is None:
+                    siguiente = len(self._transiciones)
+                    self._transiciones[estado][caracter] = siguiente
+                    self._transiciones.append({})
+                    self._fallos.append(0)
+                    self._salidas.append([])
+                estado = siguiente
+            self._salidas[estado].append(indice)
+
+        # Recorrido en anchura: el fallo de un estado es el sufijo propio más largo en el trie
+        cola = deque(self._transiciones[0].values())
+        while cola:
+            estado = cola.popleft()
+            for caracter, siguiente in self._transiciones[estado].items():
+                cola.append(siguiente)
+                fallo = self._fallos[estado]
+                while fallo and caracter not in self._transiciones[fallo]:
+                    fallo = self._fallos[fallo]
+                destino = self._transiciones[fallo].get(caracter, 0)
+                self._fallos[siguiente] = destino if destino != siguiente else 0
+                self._salidas[siguiente] = self._salidas[siguiente] + self._salidas[self._fallos[siguiente]]
+
+    def buscar(self, texto_procesado: str) -> List[Tuple[int, int, int]]:
+        """
+        Busca las frases del diccionario en un texto preprocesado.
+
+        Args:
+            texto_procesado: Texto preprocesado y sin tildes
+
+        Returns:
+            List[Tuple[int, int, int]]: (inicio, fin exclusivo, índice de la frase)
+            de cada coincidencia de palabras completas
+        """
+        coincidencias = []
+        longitud = len(texto_procesado)
+        estado = 0
+
+        for posicion, caracter in enumerate(texto_procesado):
+            while estado and caracter not in self._transiciones[estado]:
+                estado = self._fallos[estado]
+            estado = self._transiciones[estado].get(caracter, 0)
+
+            if not self._salidas[estado]:
+                continue
+            fin = posicion + 1
+            if fin < longitud and texto_procesado[fin] != ' ':
+                continue
+            for indice in self._salidas[estado]:
+                inicio = fin - len(self.frases[indice])
+                if inicio == 0 or texto_procesado[inicio - 1] == ' ':
+                    coincidencias.append((inicio, fin, indice))
+
+        return coincidencias
+
+    def predecir(self, texto_procesado: str) -> Optional[Tuple[str, float, Dict[str, float], List[str]]]:
+        """
+        Clasifica un texto preprocesado con las reglas.
+
+        Args:
+            texto_procesado: Texto preprocesado
+
+        Returns:
+            Optional[Tuple[str, float, Dict[str, float], List[str]]]: (modelo,
+            confianza, puntajes, frases encontradas), o None si no hay ninguna
+            frase o indican modelos distintos
+        """
+        coincidencias = self.buscar(quitar_acentos(texto_procesado))
+        # Descartar las frases contenidas en otra coincidencia más larga
+        maximales = [
+            (inicio, fin, indice) for inicio, fin, indice in coincidencias
+            if not any(i <= inicio and fin <= f and f - i > fin - inicio for i, f, _ in coincidencias)
+        ]
+        encontradas = sorted({indice for _, _, indice in maximales})
+        modelos = {self.etiquetas[indice] for indice in encontradas}
+
+        with self._bloqueo:
+            self._consultas += 1
+            for indice in encontradas:
+                self._coincidencias[indice] += 1
+            if len(modelos) > 1:
+                self._conflictos += 1
+            if len(modelos) != 1:
+                return None
+            self._resueltas += 1
+            for indice in encontradas:
+                self._aciertos[indice] += 1
+
+        modelo = modelos.pop()
+        puntajes = {etiqueta: 1.0 if etiqueta == modelo else 0.0 for etiqueta in ETIQUETAS_MODELO}
+        return modelo, self.confianza, puntajes, [self.frases[indice] for indice in encontradas]
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Retorna cuántos textos resolvió el motor y la tasa de aciertos de cada regla.
+
+        Returns:
+            Dict[str, Any]: Consultas, resueltas, conflictos y reglas que
+            coincidieron alguna vez, de la más a la menos frecuente
+        """
+        with self._bloqueo:
+            consultas = self._consultas
+            reglas = [
+                {
+                    "frase": frase,
+                    "modelo": etiqueta,
+                    "coincidencias": coincidencias,
+                    "aciertos": aciertos,
+                    "tasa": coincidencias / consultas if consultas else 0.0
+                }
+                for frase, etiqueta, coincidencias, aciertos in zip(
+                    self.frases, self.etiquetas, self._coincidencias, self._aciertos
+                )
+                if coincidencias
+            ]
+            resumen = {
+                "reglas_totales": len(self.frases),
+                "consultas": consultas,
+                "resueltas": self._resueltas,
+                "conflictos": self._conflictos,
+                "tasa_resolucion": self._resueltas / consultas if consultas else 0.0
+            }
+
+        resumen["reglas"] = sorted(reglas, key=lambda r: r["coincidencias"], reverse=True)
+        return resumen
@@ -0,0 +1,237 @@
+"""
+Modo sombra: compara en segundo plano una configuración candidata con la principal.
+"""
+
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Dict
+
+from .modelos import ResultadoClasificacion
+from .utilidades import percentil
+
+
+class EvaluadorSombra:
+    """
+    Replica una fracción de las clasificaciones en un candidato y compara los resultados.
+
+    El camino principal sólo sortea la muestra y deja el texto en una cola
+    acotada con ``put_nowait``: nunca espera al candidato ni a la cola, y si
+    ésta está llena la muestra se descarta. Un hilo aparte ejecuta el
+    candidato y acumula la coincidencia de etiquetas y las diferencias de
+    latencia y tokens. El tiempo que ``observar`` añade a cada llamada
+    principal también se mide, para poder comprobar que el modo sombra no
+    afecta a su latencia.
+    """
+
+    def __init__(self, candidato: Callable[[str], ResultadoClasificacion], fraccion: float = 0.1,
+                 capacidad: int = 100, descripcion: str = '', muestras_latencia: int = 10000):
+        """
+        Inicializa el evaluador y arranca su hilo.
+
+        Args:
+            candidato: Función que clasifica un texto con la configuración candidata
+            fraccion: Fracción de las llamadas que se replican (0 a 1)
+            capacidad: Muestras que pueden esperar en cola antes de descartarse
+            descripcion: Descripción del candidato para el informe
+            muestras_latencia: Latencias que se conservan para los percentiles
+        """
+        self.candidato = candidato
+        self.fraccion = fraccion
+        self.descripcion = descripcion
+
+        self._cola: queue.Queue = queue.Queue(maxsize=capacidad)
+        self._bloqueo = threading.Lock()
+        self._aleatorio = random.Random()
+
+        self._muestreadas = 0
+        self._descartadas = 0
+        self._comparadas = 0
+        self._coincidencias = 0
+        self._errores = 0
+        self._desacuerdos: Counter = Counter()
+        self._latencias_principal: deque = deque(maxlen=muestras_latencia)
+        self._latencias_candidato: deque = deque(maxlen=muestras_latencia)
+        self._sobrecostos: deque = deque(maxlen=muestras_latencia)
+        self._tokens = {"principal": 0, "candidato": 0}
+        self._costo = {"principal": 0.0, "candidato": 0.0}
+        self._sin_precio = {"principal": 0, "candidato": 0}
+
+        self._hilo = threading.Thread(target=self._trabajar, name="sombra", daemon=True)
+        self._hilo.start()
+
+    def observar(self, texto: str, resultado: ResultadoClasificacion, latencia: float) -> bool:
+        """
+        Sortea si la llamada se replica en el candidato y, si es así, la encola sin esperar.
+
+        Args:
+            texto: Texto clasificado
+            resultado: Resultado de la configuración principal
+            latencia: Segundos que tardó la configuración principal
+
+        Returns:
+            bool: True si la llamada quedó encolada para el candidato
+        """
+        inicio = time.perf_counter()
+        encolada = False
+
+        if resultado.modelo != "Error" and self._aleatorio.random() < self.fraccion:
+            try:
+                self._cola.put_nowait((texto, resultado, latencia))
+                encolada = True
+            except queue.Full:
+                pass
+
+            with self._bloqueo:
+                self._muestreadas += 1
+                self._descartadas += not encolada
+                self._sobrecostos.append(time.perf_counter() - inicio)
+
+        return encolada
+
+    def _trabajar(self):
+        """Ejecuta el candidato para cada muestra encolada."""
+        while True:
+            muestra = self._cola.get()
+            try:
+                if muestra is None:
+                    return
+                self._comparar(*muestra)
+            finally:
+                self._cola.task_done()
+
+    def _comparar(self, texto: str, principal: ResultadoClasificacion, latencia_principal: float):
+        """Clasifica una muestra con el candidato y acumula la comparación."""
+        inicio = time.perf_counter()
+        try:
+            candidato = self.candidato(texto)
+        except Exception:
+            candidato = None
+        latencia_candidato = time.perf_counter() - inicio
+
+        with self._bloqueo:
+            if candidato is None or candidato.modelo == "Error":
+                self._errores += 1
+                return
+
+            self._comparadas += 1
+            if candidato.modelo == principal.modelo:
+                self._coincidencias += 1
+            else:
+                self._desacuerdos[f"{principal.modelo}→{candidato.modelo}"] += 1
+
+            self._latencias_principal.append(latencia_principal)
+            self._latencias_candidato.append(latencia_candidato)
+            for clave, resultado in (("principal", principal), ("candidato", candidato)):
+                metricas = resultado.metricas or {}
+                self._tokens[clave] += metricas.get("tokens_entrada", 0) + metricas.get("tokens_salida", 0)
+                if "costo" in metricas and metricas["costo"] is None:
+                    # Llamada a un modelo sin precio: su costo es desconocido, no cero
+                    self._sin_precio[clave] += 1
+                else:
+                    self._costo[clave] += metricas.get("costo", 0.0)
+
+    def esperar(self, tiempo_maximo: float) -> bool:
+        """
+        Espera a que el candidato termine las muestras encoladas.
+
+        Args:
+            tiempo_maximo: Segundos máximos de espera
+
+        Returns:
+            bool: True si no quedan muestras pendientes
+        """
+        limite = time.monotonic() + tiempo_maximo
+        while self._cola.unfinished_tasks and time.monotonic() < limite:
+            time.sleep(0.01)
+        return not self._cola.unfinished_tasks
+
+    def cerrar(self, tiempo_maximo: float = 5.0):
+        """
+        Termina las muestras pendientes (como mucho ``tiempo_maximo`` segundos) y detiene el hilo.
+
+        Args:
+            tiempo_maximo: Segundos máximos de espera
+        """
+        self.esperar(tiempo_maximo)
+        try:
+            self._cola.put_nowait(None)
+        except queue.Full:
+            # El hilo es un daemon: si sigue ocupado, muere con el proceso
+            return
+        self._hilo.join(timeout=tiempo_maximo)
+
+    def informe(self) -> Dict[str, Any]:
+        """
+        Retorna la comparación acumulada entre el candidato y la configuración principal.
+
+        Returns:
+            Dict[str, Any]: Muestras, coincidencia, desacuerdos por par de etiquetas,
+            percentiles de latencia, tokens y costo medios, y el tiempo añadido al
+            camino principal
+        """
+        with self._bloqueo:
+            comparadas = self._comparadas
+            latencias = {
+                "principal": list(self._latencias_principal),
+                "candidato": list(self._latencias_candidato)
+            }
+            sobrecostos = list(self._sobrecostos)
+            resumen = {
+                "candidato": self.descripcion,
+                "fraccion": self.fraccion,
+                "muestreadas": self._muestreadas,
+                "descartadas": self._descartadas,
+                "comparadas": comparadas,
+                "errores_candidato": self._errores,
+                "pendientes": self._cola.qsize(),
+                "coincidencia": self._coincidencias / comparadas if comparadas else None,
+                "desacuerdos": dict(self._desacuerdos.most_common()),
+                "tokens_medios": {
+                    clave: total / comparadas if comparadas else 0.0
+                    for clave, total in self._tokens.items()
+                },
+                "costo": {
+                    clave: None if self._sin_precio[clave] else total
+                    for clave, total in self._costo.items()
+                },
+                "llamadas_sin_precio": dict(self._sin_precio)
+            }
+
+        resumen["latencia"] = {
+            clave: {"p50": percentil(valores, 0.5), "p99": percentil(valores, 0.99)}
+            for clave, valores in latencias.items()
+        }
+        resumen["latencia"]["delta_p50"] = (
+            resumen["latencia"]["candidato"]["p50"] - resumen["latencia"]["principal"]["p50"]
+        )
+        resumen["delta_tokens_medios"] = (
+            resumen["tokens_medios"]["candidato"] - resumen["tokens_medios"]["principal"]
+        )
+        # Tiempo que ``observar`` añadió a las llamadas principales muestreadas
+        resumen["sobrecosto_principal"] = {
+            "p99": percentil(sobrecostos, 0.99),
+            "maximo": max(sobrecostos, default=0.0)
+        }
+        return resumen
+
+    def guardar_informe(self, ruta: str) -> Dict[str, Any]:
+        """
+        Escribe el informe en un archivo JSON de forma atómica.
+
+        Args:
+            ruta: Archivo de destino
+
+        Returns:
+            Dict[str, Any]: Informe guardado
+        """
+        informe = self.informe()
+        temporal = f"{ruta}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+        os.replace(temporal, ruta)
+        return informe
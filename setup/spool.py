@@ -0,0 +1,266 @@
+"""
+Trabajador que vigila un directorio de spool y clasifica los archivos que aparecen en él.
+"""
+
+import fnmatch
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .presupuesto import PresupuestoAgotado
+from .procesador_lotes import ProcesadorLotes
+
+
+# Sufijos que se añaden al nombre del archivo de entrada en cada estado
+SUFIJO_PROCESANDO = '.procesando'
+SUFIJO_PROCESADO = '.procesado'
+SUFIJO_FALLIDO = '.fallido'
+SUFIJO_RESULTADOS = '.resultados.jsonl'
+SUFIJO_HECHO = '.hecho'
+
+
+class TrabajadorSpool:
+    """
+    Clasifica de forma continua los archivos JSONL que se dejan en un directorio.
+
+    Cada archivo ``lote.jsonl`` se reclama renombrándolo a
+    ``lote.jsonl.procesando``; el renombrado es atómico, así que varios
+    trabajadores pueden compartir el directorio sin clasificar dos veces el
+    mismo archivo. Al terminar se escriben ``lote.jsonl.resultados.jsonl`` y
+    la marca ``lote.jsonl.hecho`` (con el resumen del trabajo), y la entrada
+    pasa a ``lote.jsonl.procesado``. Si el trabajo se interrumpe, el archivo
+    se libera con su nombre original y el siguiente trabajador lo reanuda
+    desde el diario de progreso. Los archivos que empiezan por punto se
+    ignoran, de modo que los productores pueden escribir ``.lote.jsonl`` y
+    renombrarlo al terminar.
+    """
+
+    def __init__(self, directorio: str, procesador: Optional[ProcesadorLotes] = None,
+                 patron: str = '*.jsonl', intervalo: float = 2.0,
+                 tiempo_abandono: float = 600.0,
+                 al_terminar: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Inicializa el trabajador.
+
+        Args:
+            directorio: Directorio de spool
+            procesador: Procesador por lotes a usar (por defecto uno nuevo)
+            patron: Patrón de los archivos de entrada
+            intervalo: Segundos entre dos revisiones del directorio vacío
+            tiempo_abandono: Segundos sin actividad tras los que un archivo
+                reclamado por un trabajador caído vuelve a la cola
+            al_terminar: Función que recibe el informe de cada archivo terminado
+        """
+        self.directorio = directorio
+        self.procesador = procesador or ProcesadorLotes()
+        self.patron = patron
+        self.intervalo = intervalo
+        self.tiempo_abandono = tiempo_abandono
+        self.al_terminar = al_terminar
+        self._detenido = threading.Event()
+        self._en_proceso: Optional[str] = None
+
+        self._estadisticas = {
+            "archivos_procesados": 0,
+            "archivos_fallidos": 0,
+            "registros": 0,
+            "espera_total": 0.0,
+            "latencia_total": 0.0,
+            "latencia_maxima": 0.0
+        }
+
+    def pendientes(self) -> List[str]:
+        """
+        Retorna los archivos en cola, del más antiguo al más reciente.
+
+        Returns:
+            List[str]: Rutas de los archivos sin reclamar
+        """
+        candidatos = []
+        for nombre in os.listdir(self.directorio):
+            if nombre.startswith('.') or nombre.endswith(SUFIJO_RESULTADOS):
+                continue
+            if not fnmatch.fnmatch(nombre, self.patron):
+                continue
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                candidatos.append((os.stat(ruta).st_mtime, ruta))
+            except FileNotFoundError:
+                # Otro trabajador lo reclamó mientras se listaba
+                continue
+        return [ruta for _, ruta in sorted(candidatos)]
+
+    def reclamar(self, ruta: str) -> Optional[str]:
+        """
+        Reclama un archivo de entrada renombrándolo.
+
+        Args:
+            ruta: Archivo de entrada
+
+        Returns:
+            Optional[str]: Ruta del archivo reclamado, o None si otro trabajador se adelantó
+        """
+        reclamado = ruta + SUFIJO_PROCESANDO
+        try:
+            os.rename(ruta, reclamado)
+        except FileNotFoundError:
+            return None
+        # La fecha del archivo reclamado indica que un trabajador está vivo
+        os.utime(reclamado)
+        return reclamado
+
+    def recuperar_abandonados(self) -> int:
+        """
+        Devuelve a la cola los archivos reclamados sin actividad reciente.
+
+        Un archivo se considera abandonado si ni él ni su diario de progreso
+        se modificaron en ``tiempo_abandono`` segundos.
+
+        Returns:
+            int: Archivos devueltos a la cola
+        """
+        recuperados = 0
+        ahora = time.time()
+
+        for nombre in os.listdir(self.directorio):
+            if not nombre.endswith(SUFIJO_PROCESANDO):
+                continue
+            reclamado = os.path.join(self.directorio, nombre)
+            if reclamado == self._en_proceso:
+                continue
+
+            original = reclamado[:-len(SUFIJO_PROCESANDO)]
+            actividad = 0.0
+            for ruta in (reclamado, f"{original}{SUFIJO_RESULTADOS}.diario"):
+                try:
+                    actividad = max(actividad, os.stat(ruta).st_mtime)
+                except FileNotFoundError:
+                    continue
+
+            if actividad and ahora - actividad > self.tiempo_abandono:
+                try:
+                    os.rename(reclamado, original)
+                    recuperados += 1
+                except FileNotFoundError:
+                    continue
+
+        return recuperados
+
+    def procesar_archivo(self, ruta: str) -> Optional[Dict[str, Any]]:
+        """
+        Reclama y clasifica un archivo de entrada.
+
+        Args:
+            ruta: Archivo de entrada
+
+        Returns:
+            Optional[Dict[str, Any]]: Informe del archivo, o None si no se pudo reclamar
+        """
+        try:
+            llegada = os.stat(ruta).st_mtime
+        except FileNotFoundError:
+            return None
+
+        reclamado = self.reclamar(ruta)
+        if reclamado is None:
+            return None
+
+        inicio = time.time()
+        ruta_resultados = ruta + SUFIJO_RESULTADOS
+        self._en_proceso = reclamado
+        informe = {"archivo": ruta, "resultados": ruta_resultados, "espera": inicio - llegada}
+
+        try:
+            # Siempre se reanuda: si otro trabajador lo dejó a medias, su diario sigue ahí
+            resumen = self.procesador.procesar(reclamado, ruta_resultados, reanudar=True)
+        except (KeyboardInterrupt, PresupuestoAgotado):
+            # Liberar el archivo para que se reanude más tarde
+            os.rename(reclamado, ruta)
+            raise
+        except (OSError, ValueError) as e:
+            os.rename(reclamado, ruta + SUFIJO_FALLIDO)
+            informe["error"] = str(e)
+            informe["latencia"] = time.time() - llegada
+            self._estadisticas["archivos_fallidos"] += 1
+        else:
+            informe["latencia"] = time.time() - llegada
+            informe["resumen"] = {
+                clave: valor for clave, valor in resumen.items()
+                if clave not in ("backends", "enrutamiento", "reglas", "sombra")
+            }
+            self._escribir_marca(ruta + SUFIJO_HECHO, informe)
+            os.rename(reclamado, ruta + SUFIJO_PROCESADO)
+            # El índice del lector sólo servía para reanudar este archivo
+            try:
+                os.remove(f"{reclamado}.idx")
+            except FileNotFoundError:
+                pass
+            self._estadisticas["archivos_procesados"] += 1
+            self._estadisticas["registros"] += resumen["total_registros"]
+        finally:
+            self._en_proceso = None
+
+        latencia = informe["latencia"]
+        self._estadisticas["espera_total"] += informe["espera"]
+        self._estadisticas["latencia_total"] += latencia
+        self._estadisticas["latencia_maxima"] = max(self._estadisticas["latencia_maxima"], latencia)
+        informe["pendientes"] = len(self.pendientes())
+
+        if self.al_terminar is not None:
+            self.al_terminar(informe)
+        return informe
+
+    def ejecutar(self):
+        """
+        Vigila el directorio hasta que se llama a ``detener``.
+
+        Tras ``detener`` se termina el archivo en curso y no se reclaman más.
+        Un ``KeyboardInterrupt`` o un ``PresupuestoAgotado`` corta el archivo
+        en curso, que se libera para reanudarlo después.
+        """
+        while not self._detenido.is_set():
+            self.recuperar_abandonados()
+            pendientes = self.pendientes()
+            if not pendientes:
+                self._detenido.wait(self.intervalo)
+                continue
+
+            for ruta in pendientes:
+                if self._detenido.is_set():
+                    break
+                self.procesar_archivo(ruta)
+
+    def detener(self):
+        """Pide al trabajador que se detenga al terminar el archivo en curso."""
+        self._detenido.set()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Retorna la cola pendiente y la latencia de los archivos procesados.
+
+        Returns:
+            Dict[str, Any]: Archivos pendientes, en proceso, procesados, fallidos
+            y latencias (desde que el archivo llegó al directorio)
+        """
+        datos = self._estadisticas
+        terminados = datos["archivos_procesados"] + datos["archivos_fallidos"]
+        return {
+            "pendientes": len(self.pendientes()),
+            "en_proceso": self._en_proceso,
+            "archivos_procesados": datos["archivos_procesados"],
+            "archivos_fallidos": datos["archivos_fallidos"],
+            "registros": datos["registros"],
+            "espera_media": datos["espera_total"] / terminados if terminados else 0.0,
+            "latencia_media": datos["latencia_total"] / terminados if terminados else 0.0,
+            "latencia_maxima": datos["latencia_maxima"]
+        }
+
+    @staticmethod
+    def _escribir_marca(ruta: str, informe: Dict[str, Any]):
+        """Escribe la marca de archivo terminado de forma atómica."""
+        temporal = f"{ruta}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+        os.replace(temporal, ruta)
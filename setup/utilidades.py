@@ -2,8 +2,13 @@
 Módulo de utilidades para el preprocesamiento de texto y validaciones.
 """
 
+import hashlib
+import math
 import re
-from typing import Tuple
+import sys
+import unicodedata
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 
 def preprocesar_texto(texto: str) -> str:
@@ -31,6 +36,184 @@ def preprocesar_texto(texto: str) -> str:
     return texto
 
 
+def quitar_acentos(texto: str) -> str:
+    """
+    Elimina tildes y diéresis ("máquinas" pasa a "maquinas").
+    
+    Args:
+        texto: Texto a normalizar
+        
+    Returns:
+        str: Texto sin marcas diacríticas
+    """
+    descompuesto = unicodedata.normalize('NFD', texto)
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+# Términos que indican contenido relevante para distinguir modelos de nube
+TERMINOS_NUBE = {
+    # Nombres de los modelos
+    'iaas': 3.0, 'paas': 3.0, 'saas': 3.0, 'faas': 3.0,
+    'infraestructura': 2.0, 'plataforma': 2.0, 'software': 1.5, 'funciones': 2.0,
+    'serverless': 3.0, 'servidor': 1.5, 'servidores': 1.5,
+    # Infraestructura
+    'virtual': 1.5, 'virtuales': 1.5, 'máquina': 1.0, 'máquinas': 1.0, 'almacenamiento': 1.5,
+    'red': 1.0, 'redes': 1.0, 'cpu': 1.5, 'ram': 1.5, 'disco': 1.0, 'instancias': 1.5,
+    # Plataforma
+    'desplegar': 1.5, 'despliegue': 1.5, 'desarrollo': 1.0, 'contenedores': 1.5,
+    'kubernetes': 1.5, 'runtime': 1.5, 'gestionada': 1.5, 'gestionadas': 1.5, 'api': 1.0,
+    'base': 0.5, 'datos': 0.5,
+    # Software
+    'aplicación': 1.0, 'navegador': 2.0, 'suscripción': 1.5, 'usuarios': 1.0, 'crm': 2.0,
+    'correo': 1.0, 'online': 1.0,
+    # Funciones
+    'eventos': 1.5, 'evento': 1.5, 'disparadores': 1.5, 'lambda': 2.0, 'ejecuta': 1.0,
+    # Genéricos de nube
+    'nube': 1.0, 'cloud': 1.0, 'servicio': 0.5, 'escalable': 1.0, 'escalables': 1.0,
+}
+
+
+def estimar_tokens(texto: str) -> int:
+    """
+    Estima los tokens de un texto (aproximadamente cuatro caracteres por token).
+    
+    Args:
+        texto: Texto a medir
+        
+    Returns:
+        int: Tokens estimados
+    """
+    return (len(texto) + 3) // 4
+
+
+def dividir_en_fragmentos(texto: str, longitud_maxima: int) -> List[str]:
+    """
+    Divide un texto en oraciones, partiendo las que superan la longitud máxima.
+    
+    Args:
+        texto: Texto a dividir
+        longitud_maxima: Longitud máxima de cada fragmento
+        
+    Returns:
+        List[str]: Fragmentos no vacíos en su orden original
+    """
+    fragmentos = []
+    
+    for oracion in re.split(r'(?<=[.!?;:])\s+|\n+', texto):
+        oracion = oracion.strip()
+        if not oracion:
+            continue
+        
+        # Partir por palabras las oraciones demasiado largas
+        while len(oracion) > longitud_maxima:
+            corte = oracion.rfind(' ', 0, longitud_maxima)
+            if corte <= 0:
+                corte = longitud_maxima
+            fragmentos.append(oracion[:corte].strip())
+            oracion = oracion[corte:].strip()
+        
+        if oracion:
+            fragmentos.append(oracion)
+    
+    return fragmentos
+
+
+def puntuar_fragmento(fragmento: str) -> float:
+    """
+    Puntúa cuánto contenido relevante para la clasificación contiene un fragmento.
+    
+    Args:
+        fragmento: Fragmento de texto
+        
+    Returns:
+        float: Suma de los pesos de los términos de nube del fragmento
+    """
+    return sum(TERMINOS_NUBE.get(palabra, 0.0) for palabra in preprocesar_texto(fragmento).split())
+
+
+def extraer_fragmentos_relevantes(texto: str, presupuesto_tokens: int, longitud_maxima: int) -> str:
+    """
+    Selecciona los fragmentos más relevantes de un texto largo.
+    
+    Los fragmentos se eligen por puntaje hasta agotar el presupuesto de tokens
+    (sin superar la longitud máxima) y se devuelven en su orden original.
+    
+    Args:
+        texto: Texto largo
+        presupuesto_tokens: Tokens máximos del extracto
+        longitud_maxima: Longitud máxima del extracto en caracteres
+        
+    Returns:
+        str: Extracto con los fragmentos seleccionados
+    """
+    fragmentos = dividir_en_fragmentos(texto, longitud_maxima)
+    puntajes = [puntuar_fragmento(fragmento) for fragmento in fragmentos]
+    orden = sorted(range(len(fragmentos)), key=puntajes.__getitem__, reverse=True)
+    
+    # Los fragmentos sin términos de nube sólo se usan si no hay otros
+    if orden and puntajes[orden[0]] > 0:
+        orden = [i for i in orden if puntajes[i] > 0]
+    
+    elegidos = []
+    tokens = 0
+    longitud = 0
+    for indice in orden:
+        fragmento = fragmentos[indice]
+        tokens_fragmento = estimar_tokens(fragmento)
+        if tokens + tokens_fragmento > presupuesto_tokens or longitud + len(fragmento) + 1 > longitud_maxima:
+            continue
+        elegidos.append(indice)
+        tokens += tokens_fragmento
+        longitud += len(fragmento) + 1
+    
+    # Si ningún fragmento cabe entero, usar el inicio del más relevante
+    if not elegidos and fragmentos:
+        limite = min(longitud_maxima, presupuesto_tokens * 4)
+        return fragmentos[orden[0]][:limite]
+    
+    return ' '.join(fragmentos[i] for i in sorted(elegidos))
+
+
+def ventanas_relevantes(texto: str, presupuesto_tokens: int, longitud_maxima: int,
+                        cantidad: int) -> List[str]:
+    """
+    Agrupa las oraciones de un texto largo en ventanas y devuelve las más relevantes.
+    
+    Cada ventana reúne oraciones consecutivas sin superar el presupuesto de
+    tokens ni la longitud máxima.
+    
+    Args:
+        texto: Texto largo
+        presupuesto_tokens: Tokens máximos de cada ventana
+        longitud_maxima: Longitud máxima de cada ventana en caracteres
+        cantidad: Número máximo de ventanas a devolver
+        
+    Returns:
+        List[str]: Ventanas con mayor puntaje, en su orden original
+    """
+    limite = min(longitud_maxima, presupuesto_tokens * 4)
+    ventanas = []
+    actual = ''
+    
+    for fragmento in dividir_en_fragmentos(texto, limite):
+        if actual and len(actual) + 1 + len(fragmento) > limite:
+            ventanas.append(actual)
+            actual = fragmento
+        else:
+            actual = f"{actual} {fragmento}" if actual else fragmento
+    if actual:
+        ventanas.append(actual)
+    
+    puntajes = [puntuar_fragmento(ventana) for ventana in ventanas]
+    orden = sorted(range(len(ventanas)), key=puntajes.__getitem__, reverse=True)[:cantidad]
+    
+    # Las ventanas sin términos de nube no votan si hay otras
+    if orden and puntajes[orden[0]] > 0:
+        orden = [i for i in orden if puntajes[i] > 0]
+    
+    return [ventanas[i] for i in sorted(orden)]
+
+
 def validar_entrada(texto: str, longitud_minima: int = 3, longitud_maxima: int = 1000) -> Tuple[bool, str]:
     """
     Valida el texto de entrada.
@@ -85,6 +268,25 @@ def extraer_modelo_de_respuesta(respuesta: str) -> str:
     return "No determinado"
 
 
+def etiqueta_inequivoca(respuesta_parcial: str) -> Optional[str]:
+    """
+    Detecta si una respuesta parcial ya contiene un único modelo de nube.
+    
+    Se usa con respuestas transmitidas para cortar la conexión en cuanto la
+    etiqueta es segura.
+    
+    Args:
+        respuesta_parcial: Texto acumulado de la respuesta
+        
+    Returns:
+        Optional[str]: El modelo mencionado si es el único, o None
+    """
+    respuesta = respuesta_parcial.lower()
+    encontrados = [modelo for modelo in ('IaaS', 'PaaS', 'SaaS', 'FaaS') if modelo.lower() in respuesta]
+    
+    return encontrados[0] if len(encontrados) == 1 else None
+
+
 def calcular_confianza_de_respuesta(respuesta: str) -> float:
     """
     Calcula la confianza basada en la claridad de la respuesta.
@@ -127,3 +329,170 @@ def calcular_confianza_de_respuesta(respuesta: str) -> float:
     
     # Asegurar que esté en el rango [0.0, 1.0]
     return max(0.0, min(1.0, confianza))
+
+
+def etiqueta_de_token(token: str) -> Optional[str]:
+    """
+    Identifica la etiqueta de modelo que empieza por un token de la respuesta.
+    
+    Las cuatro etiquetas empiezan por letras distintas, así que basta con que
+    las letras del token sean un prefijo de la etiqueta (``"Pa"``, ``" I"``)
+    o la etiqueta completa seguida de otros signos (``"SaaS."``).
+    
+    Args:
+        token: Token tal como lo devuelve la API
+        
+    Returns:
+        Optional[str]: Etiqueta, o None si el token no corresponde a ninguna
+    """
+    letras = re.sub(r'[^a-z]', '', token.lower())
+    if not letras:
+        return None
+    
+    for etiqueta in ('IaaS', 'PaaS', 'SaaS', 'FaaS'):
+        minusculas = etiqueta.lower()
+        if minusculas.startswith(letras) or letras.startswith(minusculas):
+            return etiqueta
+    return None
+
+
+def distribucion_de_logprobs(contenido_logprobs: Optional[List[dict]]) -> Optional[Dict[str, float]]:
+    """
+    Convierte los logprobs del token de la etiqueta en una distribución sobre los cuatro modelos.
+    
+    Se toma el primer token de la respuesta que contiene letras (se saltan
+    espacios, comillas o asteriscos) y se suma la probabilidad de cada
+    alternativa de ``top_logprobs`` a la etiqueta que empieza por ella.
+    
+    Args:
+        contenido_logprobs: ``choices[0].logprobs.content`` de la respuesta
+        
+    Returns:
+        Optional[Dict[str, float]]: Probabilidad normalizada de cada modelo, o
+        None si la respuesta no trae logprobs o no empieza por una etiqueta
+    """
+    for entrada in contenido_logprobs or []:
+        token = entrada.get('token') or ''
+        if not re.search(r'[A-Za-z]', token):
+            continue
+        if etiqueta_de_token(token) is None:
+            return None
+        
+        alternativas = entrada.get('top_logprobs') or [entrada]
+        masas = {'IaaS': 0.0, 'PaaS': 0.0, 'SaaS': 0.0, 'FaaS': 0.0}
+        for alternativa in alternativas:
+            etiqueta = etiqueta_de_token(alternativa.get('token') or '')
+            if etiqueta is not None and alternativa.get('logprob') is not None:
+                masas[etiqueta] += math.exp(alternativa['logprob'])
+        
+        total = sum(masas.values())
+        if total <= 0:
+            return None
+        return {etiqueta: masa / total for etiqueta, masa in masas.items()}
+    
+    return None
+
+
+def arreglo_a_bytes(arreglo: array) -> bytes:
+    """
+    Convierte un arreglo numérico a bytes en orden little-endian.
+    
+    Args:
+        arreglo: Arreglo a serializar
+        
+    Returns:
+        bytes: Contenido del arreglo en little-endian
+    """
+    if sys.byteorder == 'little':
+        return arreglo.tobytes()
+    
+    copia = array(arreglo.typecode, arreglo)
+    copia.byteswap()
+    return copia.tobytes()
+
+
+def leer_arreglo(tipo: str, datos: memoryview, posicion: int, cantidad: int) -> array:
+    """
+    Lee un arreglo numérico little-endian desde un bloque de bytes.
+    
+    Args:
+        tipo: Código de tipo del arreglo (por ejemplo 'Q' o 'f')
+        datos: Bloque de bytes de origen
+        posicion: Desplazamiento del primer elemento
+        cantidad: Número de elementos a leer
+        
+    Returns:
+        array: Arreglo leído
+    """
+    arreglo = array(tipo)
+    arreglo.frombytes(datos[posicion:posicion + cantidad * arreglo.itemsize])
+    
+    if sys.byteorder != 'little':
+        arreglo.byteswap()
+    
+    return arreglo
+
+
+def estimar_costo(tokens_entrada: int, tokens_salida: int,
+                  precio: Optional[Tuple[float, float]]) -> Optional[float]:
+    """
+    Estima el costo en USD de una llamada al LLM.
+    
+    Args:
+        tokens_entrada: Tokens del prompt
+        tokens_salida: Tokens de la respuesta
+        precio: Precio por millón de tokens (entrada, salida), o None si se desconoce
+        
+    Returns:
+        Optional[float]: Costo estimado (None si no hay precio, para no contarlo como gratuito)
+    """
+    if not precio:
+        return None
+    
+    return (tokens_entrada * precio[0] + tokens_salida * precio[1]) / 1_000_000
+
+
+def sumar_costos(metricas: Iterable[Dict[str, Any]]) -> Optional[float]:
+    """
+    Suma el costo de varias llamadas omitiendo las de precio desconocido.
+    
+    Args:
+        metricas: Métricas de cada llamada
+        
+    Returns:
+        Optional[float]: Costo total (None si ninguna llamada tiene precio)
+    """
+    costos = [m["costo"] for m in metricas if m.get("costo") is not None]
+    return sum(costos) if costos else None
+
+
+def percentil(valores: List[float], fraccion: float) -> float:
+    """
+    Calcula un percentil por el método del rango más cercano.
+    
+    Args:
+        valores: Muestras (no hace falta que estén ordenadas)
+        fraccion: Percentil como fracción (0.5 para la mediana, 0.99 para p99)
+        
+    Returns:
+        float: Valor del percentil (0.0 si no hay muestras)
+    """
+    if not valores:
+        return 0.0
+    
+    ordenados = sorted(valores)
+    posicion = math.ceil(fraccion * len(ordenados)) - 1
+    return ordenados[min(max(posicion, 0), len(ordenados) - 1)]
+
+
+def hash_contenido(texto_procesado: str) -> str:
+    """
+    Calcula el hash del contenido de un texto preprocesado.
+    
+    Args:
+        texto_procesado: Texto preprocesado (clave de deduplicación)
+        
+    Returns:
+        str: Hash hexadecimal de 32 caracteres
+    """
+    return hashlib.blake2b(texto_procesado.encode('utf-8'), digest_size=16).hexdigest()
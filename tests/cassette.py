@@ -0,0 +1,145 @@
+"""
+Grabación y reproducción de respuestas HTTP para ejecutar las pruebas sin red.
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, List
+
+from requests import Session
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.models import PreparedRequest, Response
+from requests.structures import CaseInsensitiveDict
+
+
+MODO_REPRODUCIR = 'reproducir'
+MODO_GRABAR = 'grabar'
+
+# Campos de la petición que no forman parte de la clave de búsqueda, para que
+# un cambio de modelo o de temperatura en config.env no invalide las grabaciones
+CAMPOS_IGNORADOS = ('model', 'max_tokens', 'temperature')
+
+
+def clave_peticion(cuerpo: Dict[str, Any]) -> str:
+    """
+    Calcula la clave con la que se busca una petición en el cassette.
+
+    Args:
+        cuerpo: Cuerpo JSON de la petición
+
+    Returns:
+        str: Clave canónica de la petición
+    """
+    relevante = {k: v for k, v in cuerpo.items() if k not in CAMPOS_IGNORADOS}
+    return json.dumps(relevante, sort_keys=True, ensure_ascii=False)
+
+
+class AdaptadorCassette(BaseAdapter):
+    """
+    Adaptador de transporte de ``requests`` que graba o reproduce respuestas.
+
+    En modo ``reproducir`` nunca abre conexiones: cada petición se responde con
+    la respuesta grabada para el mismo cuerpo. Las peticiones que no están en
+    el cassette se anotan en ``faltantes`` y se responden con un error 599.
+    En modo ``grabar`` las peticiones se envían de verdad y cada respuesta se
+    añade al archivo del cassette.
+    """
+
+    def __init__(self, ruta: Path, modo: str = MODO_REPRODUCIR):
+        """
+        Inicializa el adaptador cargando el cassette.
+
+        Args:
+            ruta: Archivo JSON del cassette
+            modo: ``reproducir`` o ``grabar``
+        """
+        super().__init__()
+        self.ruta = Path(ruta)
+        self.modo = modo
+        self.faltantes: List[str] = []
+        self._bloqueo = threading.Lock()
+        self._real = HTTPAdapter() if modo == MODO_GRABAR else None
+
+        self._interacciones: List[Dict[str, Any]] = []
+        if self.ruta.exists():
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                self._interacciones = json.load(f)["interacciones"]
+
+        self._respuestas = {
+            clave_peticion(interaccion["peticion"]["cuerpo"]): interaccion["respuesta"]
+            for interaccion in self._interacciones
+        }
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        """Responde la petición desde el cassette (o la envía y la graba)."""
+        cuerpo = json.loads(request.body or b'{}')
+        clave = clave_peticion(cuerpo)
+
+        if self.modo == MODO_GRABAR:
+            respuesta = self._real.send(request, **kwargs)
+            self._grabar(request, cuerpo, respuesta)
+            return respuesta
+
+        grabada = self._respuestas.get(clave)
+        if grabada is None:
+            with self._bloqueo:
+                self.faltantes.append(clave)
+            grabada = {"estado": 599, "encabezados": {}, "cuerpo": "Interacción no grabada"}
+
+        return self._construir_respuesta(request, grabada)
+
+    def close(self):
+        if self._real is not None:
+            self._real.close()
+
+    def _grabar(self, request: PreparedRequest, cuerpo: Dict[str, Any], respuesta: Response):
+        """Añade la interacción al cassette y lo guarda."""
+        interaccion = {
+            "peticion": {"metodo": request.method, "url": request.url, "cuerpo": cuerpo},
+            "respuesta": {
+                "estado": respuesta.status_code,
+                "encabezados": {"Content-Type": respuesta.headers.get("Content-Type", "")},
+                "cuerpo": respuesta.text
+            }
+        }
+
+        with self._bloqueo:
+            self._interacciones.append(interaccion)
+            self._respuestas[clave_peticion(cuerpo)] = interaccion["respuesta"]
+            self.ruta.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.ruta, 'w', encoding='utf-8') as f:
+                json.dump({"version": 1, "interacciones": self._interacciones},
+                          f, ensure_ascii=False, indent=2)
+                f.write("\n")
+
+    @staticmethod
+    def _construir_respuesta(request: PreparedRequest, grabada: Dict[str, Any]) -> Response:
+        """Construye un ``Response`` de requests a partir de una respuesta grabada."""
+        respuesta = Response()
+        respuesta.status_code = grabada["estado"]
+        respuesta.headers = CaseInsensitiveDict(grabada.get("encabezados", {}))
+        respuesta._content = grabada["cuerpo"].encode('utf-8')
+        respuesta._content_consumed = True
+        respuesta.encoding = 'utf-8'
+        respuesta.url = request.url
+        respuesta.request = request
+        return respuesta
+
+
+def usar_cassette(sesion: Session, ruta: Path, modo: str = MODO_REPRODUCIR) -> AdaptadorCassette:
+    """
+    Monta un cassette como transporte de todas las URLs de la sesión.
+
+    Args:
+        sesion: Sesión de requests del clasificador
+        ruta: Archivo JSON del cassette
+        modo: ``reproducir`` o ``grabar``
+
+    Returns:
+        AdaptadorCassette: Adaptador montado
+    """
+    adaptador = AdaptadorCassette(ruta, modo)
+    sesion.mount('http://', adaptador)
+    sesion.mount('https://', adaptador)
+    return adaptador
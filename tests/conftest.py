@@ -0,0 +1,72 @@
+"""
+Configuración compartida de pytest para las pruebas del clasificador.
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from setup import ClasificadorModelosNube
+from tests.cassette import MODO_REPRODUCIR, usar_cassette
+
+
+DIRECTORIO_CASSETTES = Path(__file__).parent / "cassettes"
+
+# Variables que cambian el camino de las peticiones y no deben afectar a las pruebas
+VARIABLES_AISLADAS = (
+    'OPENROUTER_BACKENDS',
+    'DEEPSEEK_MODEL_FAST',
+    'DEEPSEEK_MODEL_STRONG',
+    'SCHEDULER_WORKERS',
+    'BATCH_CONCURRENCY',
+    'DISTILLATION_STORE',
+    'LOCAL_MODEL_PATH',
+    'STREAMING',
+    'LONG_DOCUMENT_MODE',
+    'LONG_DOCUMENT_CHUNKS',
+    'BUDGET_TOKENS',
+    'BUDGET_COST',
+    'RULES_ENABLED',
+    'PROMPT_TEMPLATE',
+    'SHADOW_FRACTION',
+    'SHADOW_ENGINE',
+    'LOGPROBS',
+    'VOTING_SAMPLES',
+    'HISTORY_PATH',
+)
+
+
+@pytest.fixture
+def cassette(request):
+    """
+    Ruta del cassette de la prueba (por defecto ``casos_prueba.json``).
+
+    Se puede cambiar con ``@pytest.mark.parametrize('cassette', [...], indirect=True)``.
+    """
+    nombre = getattr(request, 'param', 'casos_prueba')
+    return DIRECTORIO_CASSETTES / f"{nombre}.json"
+
+
+@pytest.fixture
+def clasificador(monkeypatch, cassette):
+    """
+    Clasificador cuyas peticiones HTTP se responden desde un cassette.
+
+    Con ``CASSETTE_MODE=grabar`` las peticiones se envían a la API real (se
+    necesita una clave válida) y las respuestas se añaden al cassette.
+    """
+    modo = os.getenv('CASSETTE_MODE', MODO_REPRODUCIR)
+
+    for variable in VARIABLES_AISLADAS:
+        monkeypatch.delenv(variable, raising=False)
+    if modo == MODO_REPRODUCIR:
+        monkeypatch.setenv('OPENROUTER_API_KEY', 'sk-or-cassette')
+
+    clasificador = ClasificadorModelosNube(usar_nlp=True)
+    clasificador.adaptador = usar_cassette(clasificador.sesion, cassette, modo)
+    yield clasificador
+
+    assert not clasificador.adaptador.faltantes, (
+        "Peticiones sin grabar en el cassette; vuelve a grabarlo con CASSETTE_MODE=grabar"
+    )
@@ -2,8 +2,8 @@
 Script principal para ejecutar todas las pruebas del clasificador de modelos de nube.
 """
 
-from casos_prueba import CasosPrueba
 from utilidades_prueba import UtilidadesPrueba
+from setup.casos_prueba import CasosPrueba
 
 def ejecutar_pruebas_basicas():
     """Ejecuta las pruebas básicas del clasificador."""
@@ -0,0 +1,175 @@
+"""
+Pruebas del reparto de peticiones entre varios backends.
+"""
+
+import json
+import random
+import time
+
+from requests.adapters import BaseAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+from setup.backends import Backend, PoolBackends
+from setup.clasificador import ClasificadorModelosNube
+from tests.conftest import VARIABLES_AISLADAS
+
+
+RESPUESTA_IAAS = json.dumps({
+    "choices": [{"message": {"role": "assistant", "content": "IaaS"}}],
+    "usage": {"prompt_tokens": 100, "completion_tokens": 2}
+})
+
+
+class AdaptadorBackends(BaseAdapter):
+    """Responde cada URL con el estado indicado (o lanza la excepción indicada)."""
+
+    def __init__(self, respuestas):
+        super().__init__()
+        self.respuestas = respuestas
+        self.peticiones = []
+
+    def send(self, request, **kwargs):
+        self.peticiones.append(request)
+        respuesta_url = self.respuestas[request.url]
+        if isinstance(respuesta_url, Exception):
+            raise respuesta_url
+        estado, cuerpo = respuesta_url
+        respuesta = Response()
+        respuesta.status_code = estado
+        respuesta.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        respuesta._content = cuerpo.encode('utf-8')
+        respuesta._content_consumed = True
+        respuesta.encoding = 'utf-8'
+        respuesta.url = request.url
+        respuesta.request = request
+        return respuesta
+
+    def close(self):
+        pass
+
+
+def _clasificador(monkeypatch, backends, respuestas):
+    for variable in VARIABLES_AISLADAS:
+        monkeypatch.delenv(variable, raising=False)
+    monkeypatch.setenv('OPENROUTER_BACKENDS', ','.join(backends))
+    clasificador = ClasificadorModelosNube(usar_nlp=True)
+    adaptador = AdaptadorBackends(respuestas)
+    clasificador.sesion.mount('http://', adaptador)
+    return clasificador, adaptador
+
+
+def test_pool_pondera_expulsa_con_espera_creciente_y_excluye_intentados():
+    rapido = Backend("http://rapido", peso=1.0)
+    lento = Backend("http://lento", peso=1.0)
+    pool = PoolBackends([rapido, lento], tiempo_expulsion=10.0, tiempo_expulsion_maximo=25.0)
+    pool._aleatorio = random.Random(7)
+    rapido.latencia_media, lento.latencia_media = 0.1, 1.0
+
+    elegidos = []
+    for _ in range(1000):
+        backend = pool.seleccionar()
+        elegidos.append(backend)
+        pool.liberar(backend)
+    assert 850 < sum(b is rapido for b in elegidos) < 960
+    assert rapido.en_vuelo == lento.en_vuelo == 0
+
+    # Las peticiones en vuelo reparten la carga aunque la latencia sea igual
+    lento.latencia_media = 0.1
+    rapido.en_vuelo = 9
+    lentos = 0
+    for _ in range(200):
+        backend = pool.seleccionar()
+        lentos += backend is lento
+        pool.liberar(backend)
+    assert lentos > 150
+    rapido.en_vuelo = 0
+
+    # 429/5xx y errores de conexión expulsan con espera doble, hasta el máximo
+    esperas = []
+    for codigo in (429, None, 503):
+        pool.registrar_fallo(pool.seleccionar(excluir=[lento]), codigo)
+        esperas.append(rapido.expulsado_hasta - time.monotonic())
+    assert [round(espera) for espera in esperas] == [10, 20, 25]
+    assert all(pool.seleccionar() is lento for _ in range(20))
+    lento.en_vuelo = 0
+
+    # Un 400 no es un fallo temporal: no expulsa
+    pool.registrar_fallo(pool.seleccionar(excluir=[rapido]), 400)
+    assert lento.expulsado_hasta <= time.monotonic()
+
+    # Con todos expulsados se elige el que vuelve antes, salvo que ya se intentó
+    lento.expulsado_hasta = time.monotonic() + 5
+    assert pool.seleccionar() is lento
+    assert pool.seleccionar(excluir=[lento]) is rapido
+    assert pool.seleccionar(excluir=[lento, rapido]) is lento
+
+
+def test_clasificador_pasa_al_siguiente_backend_y_libera_las_peticiones(monkeypatch):
+    clasificador, adaptador = _clasificador(
+        monkeypatch,
+        ['http://saturado/v1/chat/completions|sk-a|1000', 'http://propio/v1/chat/completions||0.001'],
+        {
+            'http://saturado/v1/chat/completions': (503, '{"error": "saturado"}'),
+            'http://propio/v1/chat/completions': (200, RESPUESTA_IAAS)
+        }
+    )
+    saturado, propio = clasificador.pool.backends
+    # El saturado pesa tanto que siempre se intenta primero mientras no esté expulsado
+
+    for _ in range(3):
+        resultado = clasificador.clasificar_con_nlp("AWS EC2 proporciona servidores virtuales")
+        assert resultado.modelo == "IaaS"
+
+    assert saturado.expulsiones == 1
+    assert propio.exitos == 3
+    assert saturado.en_vuelo == propio.en_vuelo == 0
+    # El endpoint propio no lleva clave ni encabezado de autorización
+    assert all("Authorization" not in p.headers for p in adaptador.peticiones if "propio" in p.url)
+
+    # Una excepción inesperada también libera la petición en vuelo
+    adaptador.respuestas['http://propio/v1/chat/completions'] = RuntimeError("fallo interno")
+    saturado.expulsado_hasta = time.monotonic() + 60
+    resultado = clasificador.clasificar_con_nlp("AWS EC2 proporciona servidores virtuales")
+    assert resultado.modelo == "Error"
+    assert saturado.en_vuelo == propio.en_vuelo == 0
+
+    # Si todos los backends están saturados, cada uno se intenta una sola vez
+    adaptador.respuestas['http://propio/v1/chat/completions'] = (503, '{}')
+    adaptador.peticiones.clear()
+    resultado = clasificador.clasificar_con_nlp("AWS EC2 proporciona servidores virtuales")
+    assert resultado.modelo == "Error"
+    assert sorted(p.url for p in adaptador.peticiones) == [
+        'http://propio/v1/chat/completions', 'http://saturado/v1/chat/completions'
+    ]
+
+
+def _transmision(*eventos):
+    return "".join(f"data: {evento}\n\n" for evento in eventos)
+
+
+def test_evento_ilegible_reintenta_y_el_corte_estima_el_uso(monkeypatch):
+    fragmento = json.dumps({"choices": [{"delta": {"content": "IaaS"}}]})
+    clasificador, _ = _clasificador(
+        monkeypatch,
+        ['http://roto/v1/chat/completions|sk-a|1000', 'http://propio/v1/chat/completions||0.001'],
+        {
+            'http://roto/v1/chat/completions': (200, _transmision('{"choices": [', '[DONE]')),
+            # Se corta en la etiqueta, antes del bloque de uso
+            'http://propio/v1/chat/completions': (
+                200, _transmision(fragmento, json.dumps({"usage": {"prompt_tokens": 9}}), '[DONE]')
+            )
+        }
+    )
+    roto, propio = clasificador.pool.backends
+
+    resultado = clasificador.clasificar_con_nlp("AWS EC2 proporciona servidores virtuales",
+                                                transmitir=True)
+
+    assert resultado.modelo == "IaaS"
+    assert roto.expulsiones == 1 and propio.exitos == 1
+    assert roto.en_vuelo == propio.en_vuelo == 0
+    assert resultado.metricas["uso_estimado"] is True
+    assert resultado.metricas["tokens_entrada"] > 10
+    assert resultado.metricas["tokens_salida"] == 1
+    assert clasificador.estadisticas_uso()["tokens_entrada"] == resultado.metricas["tokens_entrada"]
@@ -0,0 +1,121 @@
+"""
+Benchmark de escalado del modelo local ejecutado en varios procesos.
+
+Como prueba (marcada ``slow``, que se excluye por defecto) mide una carga
+reducida con ``python -m pytest -m slow``; para el benchmark completo:
+    python -m tests.test_benchmark_procesos [--textos 200000] [--procesos 1,2,4,8]
+"""
+
+import argparse
+import os
+import random
+import time
+
+import pytest
+
+from setup.destilacion import ModeloLocal
+from setup.procesos import PoolProcesosLocal
+from setup.utilidades import preprocesar_texto
+from setup.casos_prueba import CasosPrueba
+
+
+def construir_modelo() -> ModeloLocal:
+    """Ajusta un modelo local con los casos de prueba conocidos."""
+    modelo = ModeloLocal()
+    modelo.ajustar(
+        {"texto": preprocesar_texto(caso["texto"]), "modelo": caso["modelo_esperado"], "confianza": 1.0}
+        for caso in CasosPrueba.obtener_todos_los_casos()
+    )
+    return modelo
+
+
+def generar_textos(cantidad: int, semilla: int = 0) -> list:
+    """Genera textos mezclando frases de los casos de prueba."""
+    aleatorio = random.Random(semilla)
+    frases = [caso["texto"] for caso in CasosPrueba.obtener_todos_los_casos()]
+    return [" ".join(aleatorio.sample(frases, 3)) for _ in range(cantidad)]
+
+
+def medir(modelo: ModeloLocal, textos: list, procesos: int) -> float:
+    """Retorna los textos por segundo con el número de procesos indicado."""
+    if procesos <= 1:
+        inicio = time.perf_counter()
+        for texto in textos:
+            modelo.predecir(preprocesar_texto(texto))
+        return len(textos) / (time.perf_counter() - inicio)
+
+    with PoolProcesosLocal(modelo, procesos) as pool:
+        # Calentar los procesos antes de medir
+        pool.predecir(textos[:procesos])
+        inicio = time.perf_counter()
+        pool.predecir(textos)
+        return len(textos) / (time.perf_counter() - inicio)
+
+
+def medir_escalado(modelo: ModeloLocal, textos: list, procesos: list) -> list:
+    """
+    Mide el rendimiento con cada número de procesos frente al de un solo proceso.
+
+    Returns:
+        list: Por cada número de procesos, los textos por segundo, la aceleración
+        respecto a un proceso y la eficiencia (aceleración por proceso)
+    """
+    base = medir(modelo, textos, 1)
+    filas = []
+    for cantidad in procesos:
+        rendimiento = base if cantidad <= 1 else medir(modelo, textos, cantidad)
+        aceleracion = rendimiento / base
+        filas.append({"procesos": cantidad, "rendimiento": rendimiento,
+                      "aceleracion": aceleracion, "eficiencia": aceleracion / max(cantidad, 1)})
+    return filas
+
+
+def imprimir_escalado(filas: list):
+    """Imprime la tabla de rendimiento, aceleración y eficiencia."""
+    print(f"{'procesos':>9} {'textos/s':>12} {'aceleración':>12} {'eficiencia':>11}")
+    for fila in filas:
+        print(f"{fila['procesos']:>9} {fila['rendimiento']:>12.0f} "
+              f"{fila['aceleracion']:>11.2f}x {fila['eficiencia']:>10.0%}")
+
+
+@pytest.mark.slow
+def test_escalado_con_varios_procesos(capsys):
+    modelo = construir_modelo()
+    textos = generar_textos(20000)
+
+    with PoolProcesosLocal(modelo, 2) as pool:
+        assert pool.predecir(textos[:50]) == [
+            (preprocesar_texto(texto), modelo.predecir(preprocesar_texto(texto)))
+            for texto in textos[:50]
+        ]
+
+    # Más procesos que núcleos sólo añade comunicación entre procesos
+    nucleos = os.cpu_count() or 1
+    filas = medir_escalado(modelo, textos, sorted({1, min(nucleos, 2), min(nucleos, 4)}))
+    with capsys.disabled():
+        print(f"\n🔬 {len(textos)} textos, {nucleos} núcleos")
+        imprimir_escalado(filas)
+
+    if nucleos >= 2:
+        assert filas[1]["aceleracion"] > 1.0
+
+
+def main():
+    """Función principal del benchmark."""
+    nucleos = os.cpu_count() or 1
+    por_defecto = ",".join(str(n) for n in (1, 2, 4, 8, 16, 32) if n <= nucleos) or "1"
+
+    parser = argparse.ArgumentParser(description="Escalado del modelo local con varios procesos")
+    parser.add_argument("--textos", type=int, default=200000, help="Textos a clasificar por medición")
+    parser.add_argument("--procesos", default=por_defecto, help="Números de procesos a medir, separados por comas")
+    args = parser.parse_args()
+
+    modelo = construir_modelo()
+    textos = generar_textos(args.textos)
+
+    print(f"🔬 {args.textos} textos, {nucleos} núcleos")
+    imprimir_escalado(medir_escalado(modelo, textos, [int(p) for p in args.procesos.split(",")]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Pruebas de la comparación de configuraciones sobre conjuntos etiquetados.
+"""
+
+import os
+
+from setup import ClasificadorModelosNube
+from setup.comparacion import comparar_configuraciones, interpretar_configuracion, marcar_pareto
+from setup.casos_prueba import CasosPrueba
+from tests.cassette import MODO_REPRODUCIR, usar_cassette
+
+
+def test_interpretar_configuracion():
+    configuracion = interpretar_configuracion("libre:llm:DEEPSEEK_MODEL=deepseek/deepseek-chat:free,TEMPERATURE=0")
+
+    assert configuracion.nombre == "libre"
+    assert configuracion.motor == "llm"
+    assert dict(configuracion.variables) == {
+        "DEEPSEEK_MODEL": "deepseek/deepseek-chat:free", "TEMPERATURE": "0"
+    }
+    assert interpretar_configuracion("actual").motor == "clasificador"
+
+
+def test_compara_configuraciones_y_marca_las_optimas(clasificador, cassette, monkeypatch, tmp_path):
+    # La comparación no escribe en el almacén de destilación ni en el historial
+    monkeypatch.setenv('DISTILLATION_STORE', str(tmp_path / "almacen.jsonl"))
+    monkeypatch.setenv('HISTORY_PATH', str(tmp_path / "historial.db"))
+    adaptadores = []
+
+    def fabrica(config):
+        nuevo = ClasificadorModelosNube(usar_nlp=True, config=config)
+        adaptadores.append(usar_cassette(nuevo.sesion, cassette, os.getenv('CASSETTE_MODE', MODO_REPRODUCIR)))
+        return nuevo
+
+    casos = CasosPrueba.obtener_todos_los_casos()
+    configuraciones = [interpretar_configuracion("llm:llm"), interpretar_configuracion("reglas:reglas")]
+    resumen = comparar_configuraciones(configuraciones, casos, concurrencia=4, fabrica=fabrica)
+
+    llm, reglas = resumen["configuraciones"]
+    for informe in (llm, reglas):
+        assert sum(sum(fila.values()) for fila in informe["matriz_confusion"].values()) == len(casos)
+        assert informe["aciertos"] == sum(
+            fila.get(esperado, 0) for esperado, fila in informe["matriz_confusion"].items()
+        )
+    assert llm["tokens_por_1000"] > 0
+    assert reglas["tokens_por_1000"] == 0
+    assert reglas["metodos"].get("reglas", 0) >= len(casos) // 2
+    # Las reglas no gastan tokens, así que nunca quedan dominadas
+    assert reglas["pareto"]
+    assert not any(adaptador.faltantes for adaptador in adaptadores)
+    assert not (tmp_path / "almacen.jsonl").exists()
+    assert not (tmp_path / "historial.db").exists()
+    # Las variables de cada configuración no se aplican al entorno del proceso
+    assert os.environ['DISTILLATION_STORE'] == str(tmp_path / "almacen.jsonl")
+
+
+def test_costo_desconocido_no_cuenta_para_pareto():
+    def informe(nombre, costo_por_1000):
+        return {"nombre": nombre, "exactitud": 0.9, "latencia_p50": 1.0,
+                "tokens_por_1000": 100.0, "costo_por_1000": costo_por_1000}
+
+    # Sin precio no es "gratis": no domina a la de costo conocido ni queda dominada por ella
+    sin_precio, con_precio, cara = marcar_pareto(
+        [informe("sin_precio", None), informe("con_precio", 0.5), informe("cara", 0.9)]
+    )
+    assert sin_precio["pareto"] and con_precio["pareto"]
+    assert not cara["pareto"]
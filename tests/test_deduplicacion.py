@@ -0,0 +1,82 @@
+"""
+Pruebas de la deduplicación por texto preprocesado en el modo por lotes.
+"""
+
+import json
+
+import pytest
+
+from setup.procesador_lotes import ProcesadorLotes
+from setup.casos_prueba import CasosPrueba
+
+
+def _escribir(ruta, textos):
+    ruta.write_text("".join(json.dumps({"texto": texto}) + "\n" for texto in textos), encoding='utf-8')
+
+
+def _contar_clasificados(clasificador, monkeypatch):
+    """Anota los textos que llegan a clasificarse."""
+    original = clasificador.clasificar_varios
+    clasificados = []
+
+    def clasificar_varios(textos, *args, **kwargs):
+        textos = list(textos)
+        clasificados.extend(textos)
+        return original(textos, *args, **kwargs)
+
+    monkeypatch.setattr(clasificador, "clasificar_varios", clasificar_varios)
+    return clasificados
+
+
+def test_duplicados_se_clasifican_una_vez_con_cache_acotada(clasificador, tmp_path, monkeypatch):
+    a, b, c = [caso["texto"] for caso in CasosPrueba.obtener_todos_los_casos()][:3]
+    entrada = tmp_path / "catalogo.jsonl"
+    # Duplicados en el mismo bloque, en otro bloque y con otras mayúsculas y espacios
+    _escribir(entrada, [a, a, b, f"  {a.upper()} ", b, c, a])
+    clasificados = _contar_clasificados(clasificador, monkeypatch)
+
+    resumen = ProcesadorLotes(clasificador, tamano_bloque=2).procesar(
+        str(entrada), str(tmp_path / "resultados.jsonl")
+    )
+    assert sorted(clasificados) == sorted([a, b, c])
+    assert resumen["clasificaciones"] == 3
+    filas = [json.loads(linea) for linea in (tmp_path / "resultados.jsonl").read_text().splitlines()]
+    assert filas[3]["texto_original"] == f"  {a.upper()} "
+    assert filas[3]["modelo"] == filas[0]["modelo"]
+
+    # Con capacidad 1 sólo se recuerda el último texto: el resto se vuelve a clasificar
+    clasificados.clear()
+    procesador = ProcesadorLotes(clasificador, tamano_bloque=1, capacidad_cache=1)
+    _escribir(entrada, [a, b, a, a])
+    resumen = procesador.procesar(str(entrada), str(tmp_path / "resultados.jsonl"))
+    assert clasificados == [a, b, a]
+    assert resumen["clasificaciones"] == 3
+
+
+def test_reanudar_recuerda_los_textos_del_diario(clasificador, tmp_path, monkeypatch):
+    a, b, c = [caso["texto"] for caso in CasosPrueba.obtener_todos_los_casos()][:3]
+    entrada = tmp_path / "catalogo.jsonl"
+    salida = tmp_path / "resultados.jsonl"
+    _escribir(entrada, [a, b, c, a, b])
+    procesador = ProcesadorLotes(clasificador, tamano_bloque=2, tamano_grupo_diario=1)
+
+    original = clasificador.clasificar_varios
+
+    def interrumpir_en_segundo_bloque(textos, *args, **kwargs):
+        textos = list(textos)
+        if c in textos:
+            raise KeyboardInterrupt
+        return original(textos, *args, **kwargs)
+
+    monkeypatch.setattr(clasificador, "clasificar_varios", interrumpir_en_segundo_bloque)
+    with pytest.raises(KeyboardInterrupt):
+        procesador.procesar(str(entrada), str(salida))
+    monkeypatch.undo()
+
+    clasificados = _contar_clasificados(clasificador, monkeypatch)
+    resumen = procesador.procesar(str(entrada), str(salida), reanudar=True)
+
+    # El segundo bloque llegó a anotar el duplicado de ``a`` antes de interrumpirse
+    assert clasificados == [c]
+    assert resumen["reanudados"] == 3
+    assert resumen["clasificaciones"] == 1
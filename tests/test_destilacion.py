@@ -0,0 +1,87 @@
+"""
+Pruebas de la destilación de etiquetas del LLM en el modelo local.
+"""
+
+import threading
+
+from setup.destilacion import AlmacenEntrenamiento, ModeloLocal, reentrenar
+from setup.modelos import ResultadoClasificacion
+from setup.procesos import PoolProcesosLocal
+from setup.casos_prueba import CasosPrueba
+from setup.utilidades import preprocesar_texto
+
+
+def _registrar_casos(almacen, casos, metodo="deepseek_nlp"):
+    for caso in casos:
+        texto_procesado = preprocesar_texto(caso["texto"])
+        almacen.registrar(ResultadoClasificacion(
+            modelo=caso["modelo_esperado"],
+            confianza=1.0,
+            puntajes={},
+            texto_original=caso["texto"],
+            texto_procesado=texto_procesado,
+            metodo=metodo
+        ))
+
+
+def test_reentrenar_es_incremental(tmp_path):
+    almacen = AlmacenEntrenamiento(str(tmp_path / "almacen.jsonl"))
+    ruta_modelo = str(tmp_path / "modelo.json")
+    casos = CasosPrueba.obtener_casos_basicos()
+
+    _registrar_casos(almacen, casos[:5])
+    primero = reentrenar(almacen.ruta, ruta_modelo)
+    _registrar_casos(almacen, casos[5:])
+    segundo = reentrenar(almacen.ruta, ruta_modelo)
+
+    assert primero["ejemplos_nuevos"] == 5
+    assert segundo["ejemplos_nuevos"] == len(casos) - 5
+    assert segundo["ejemplos_totales"] == len(casos)
+
+    # Sólo las respuestas directas del LLM son ejemplos de entrenamiento
+    for metodo in ("deepseek_nlp_autoconsistencia", "deepseek_nlp_extracto",
+                   "deepseek_nlp_votacion", "reglas", "modelo_local"):
+        _registrar_casos(almacen, casos[:2], metodo=metodo)
+    assert reentrenar(almacen.ruta, ruta_modelo)["ejemplos_nuevos"] == 0
+
+
+def test_modelo_local_aprende_las_etiquetas(tmp_path):
+    almacen = AlmacenEntrenamiento(str(tmp_path / "almacen.jsonl"))
+    ruta_modelo = str(tmp_path / "modelo.json")
+    _registrar_casos(almacen, CasosPrueba.obtener_todos_los_casos())
+    reentrenar(almacen.ruta, ruta_modelo)
+
+    modelo = ModeloLocal.cargar(ruta_modelo)
+    etiqueta, confianza, puntajes = modelo.predecir("aws lambda funciones sin servidor")
+
+    assert etiqueta == "FaaS"
+    assert abs(sum(puntajes.values()) - 1.0) < 1e-9
+    assert modelo.predecir("texto totalmente desconocido") is None
+
+
+def test_pool_de_procesos_predice_igual_que_el_modelo(tmp_path):
+    almacen = AlmacenEntrenamiento(str(tmp_path / "almacen.jsonl"))
+    ruta_modelo = str(tmp_path / "modelo.json")
+    _registrar_casos(almacen, CasosPrueba.obtener_todos_los_casos())
+    reentrenar(almacen.ruta, ruta_modelo)
+    modelo = ModeloLocal.cargar(ruta_modelo)
+    textos = [caso["texto"] for caso in CasosPrueba.obtener_todos_los_casos()]
+
+    esperadas = [
+        (preprocesar_texto(texto), modelo.predecir(preprocesar_texto(texto))) for texto in textos
+    ]
+
+    with PoolProcesosLocal(modelo, procesos=2, tamano_trozo=4, ruta_modelo=ruta_modelo) as pool:
+        assert pool.predecir(textos) == esperadas
+
+    # Con otros hilos en marcha no se hace fork: el modelo llega a cada proceso
+    detener = threading.Event()
+    hilo = threading.Thread(target=detener.wait)
+    hilo.start()
+    try:
+        with PoolProcesosLocal(modelo, procesos=2, tamano_trozo=4) as pool:
+            assert pool.metodo_inicio != 'fork'
+            assert pool.predecir(textos) == esperadas
+    finally:
+        detener.set()
+        hilo.join()
@@ -0,0 +1,91 @@
+"""
+Pruebas de la reanudación de trabajos por lotes desde el diario de progreso.
+"""
+
+import json
+
+import pytest
+
+from setup.procesador_lotes import ProcesadorLotes
+from setup.casos_prueba import CasosPrueba
+
+
+def _escribir(ruta, textos):
+    ruta.write_text("".join(json.dumps({"texto": texto}) + "\n" for texto in textos), encoding='utf-8')
+
+
+def _interrumpir_tras(clasificador, monkeypatch, cantidad):
+    """Hace que el clasificador se interrumpa tras entregar ``cantidad`` resultados."""
+    original = clasificador.clasificar_varios
+    entregados = []
+
+    def clasificar_varios(textos, *args, **kwargs):
+        for resultado in original(textos, *args, **kwargs):
+            if len(entregados) == cantidad:
+                raise KeyboardInterrupt
+            entregados.append(resultado)
+            yield resultado
+
+    monkeypatch.setattr(clasificador, "clasificar_varios", clasificar_varios)
+
+
+def test_reanudar_tras_interrupcion_y_linea_final_cortada(clasificador, tmp_path, monkeypatch):
+    textos = [caso["texto"] for caso in CasosPrueba.obtener_todos_los_casos()][:8]
+    entrada = tmp_path / "catalogo.jsonl"
+    salida = tmp_path / "resultados.jsonl"
+    diario = tmp_path / "resultados.jsonl.diario"
+    _escribir(entrada, textos)
+    salida.write_text("salida anterior\n", encoding='utf-8')
+    procesador = ProcesadorLotes(clasificador, tamano_bloque=3, tamano_grupo_diario=1,
+                                 deduplicar=False)
+
+    _interrumpir_tras(clasificador, monkeypatch, 5)
+    with pytest.raises(KeyboardInterrupt):
+        procesador.procesar(str(entrada), str(salida))
+    monkeypatch.undo()
+
+    # La salida anterior sigue intacta: sólo se reemplaza al terminar
+    assert salida.read_text(encoding='utf-8') == "salida anterior\n"
+    lineas = diario.read_bytes().splitlines(keepends=True)
+    assert len(lineas) == 1 + 5
+
+    # Simular una caída a mitad de escribir la última línea
+    diario.write_bytes(b"".join(lineas[:-1]) + lineas[-1][:20])
+
+    resumen = procesador.procesar(str(entrada), str(salida), reanudar=True)
+
+    assert resumen["reanudados"] == 4
+    assert resumen["clasificaciones"] == 4
+    filas = [json.loads(linea) for linea in salida.read_text(encoding='utf-8').splitlines()]
+    assert [fila["id"] for fila in filas] == list(range(8))
+    assert [fila["texto_original"] for fila in filas] == textos
+    assert not diario.exists()
+    assert not (tmp_path / "resultados.jsonl.tmp").exists()
+
+
+def test_diario_de_otra_entrada_o_con_cabecera_danada(clasificador, tmp_path, monkeypatch):
+    textos = [caso["texto"] for caso in CasosPrueba.obtener_todos_los_casos()][:4]
+    entrada = tmp_path / "catalogo.jsonl"
+    salida = tmp_path / "resultados.jsonl"
+    diario = tmp_path / "resultados.jsonl.diario"
+    _escribir(entrada, textos)
+    procesador = ProcesadorLotes(clasificador, tamano_bloque=2, tamano_grupo_diario=1)
+
+    _interrumpir_tras(clasificador, monkeypatch, 2)
+    with pytest.raises(KeyboardInterrupt):
+        procesador.procesar(str(entrada), str(salida))
+    monkeypatch.undo()
+
+    # Misma ruta y mismo tamaño, otro contenido: no se mezclan resultados obsoletos
+    original = entrada.read_bytes()
+    entrada.write_bytes(original.replace(b"AWS", b"GCP", 1))
+    assert len(entrada.read_bytes()) == len(original)
+    with pytest.raises(ValueError):
+        procesador.procesar(str(entrada), str(salida), reanudar=True)
+    entrada.write_bytes(original)
+
+    # Una cabecera cortada invalida el diario y el trabajo empieza de nuevo
+    diario.write_bytes(diario.read_bytes()[:15] + b"\n")
+    resumen = procesador.procesar(str(entrada), str(salida), reanudar=True)
+    assert resumen["reanudados"] == 0
+    assert resumen["clasificaciones"] == 4
@@ -0,0 +1,163 @@
+"""
+Pruebas del coordinador y los trabajadores del modo distribuido.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+
+from setup.distribuido import Coordinador, TrabajadorRemoto, recibir_mensaje
+
+
+class ProcesadorFalso:
+    """Procesador por lotes que etiqueta cada registro con su texto en mayúsculas."""
+
+    def procesar(self, ruta_entrada, ruta_salida):
+        with open(ruta_entrada, encoding='utf-8') as f:
+            lineas = f.read().splitlines()
+        with open(ruta_salida, 'w', encoding='utf-8') as f:
+            for numero, linea in enumerate(lineas):
+                f.write(json.dumps({"id": numero, "modelo": linea.upper()}) + "\n")
+        return {"total_registros": len(lineas), "errores": 0, "clasificaciones": len(lineas)}
+
+    def cancelar(self):
+        pass
+
+
+class ProcesadorBloqueado(ProcesadorFalso):
+    """Procesador que no termina hasta que se le cancela."""
+
+    def __init__(self):
+        self.cancelado = threading.Event()
+
+    def procesar(self, ruta_entrada, ruta_salida):
+        self.cancelado.wait(10)
+        raise RuntimeError("Trabajo cancelado")
+
+    def cancelar(self):
+        self.cancelado.set()
+
+
+def _mensaje_crudo(direccion, linea):
+    with socket.create_connection(direccion) as conexion, conexion.makefile('rwb') as canal:
+        canal.write(linea + b"\n")
+        canal.flush()
+        return recibir_mensaje(canal)[0]
+
+
+def _ejecutar(tmp_path, copias_maximas):
+    entrada = tmp_path / "corpus.txt"
+    entrada.write_text("".join(f"registro {i}\n" for i in range(95)), encoding='utf-8')
+    salida = tmp_path / "resultados.jsonl"
+
+    coordinador = Coordinador(str(entrada), str(salida), direccion=('127.0.0.1', 0),
+                              tamano_fragmento=10, tiempo_concesion=0.5,
+                              copias_maximas=copias_maximas, espera_cierre=0.5)
+    coordinador.iniciar()
+    direccion = ('127.0.0.1', coordinador.puerto)
+
+    # Un trabajador que toma el primer fragmento y muere sin terminarlo
+    muerto = TrabajadorRemoto(direccion, ProcesadorFalso(), nombre="muerto")
+    assert muerto._enviar({"tipo": "pedir"})[0]["id"] == 0
+
+    trabajadores = [
+        TrabajadorRemoto(direccion, ProcesadorFalso(), nombre=f"t{n}",
+                         intervalo_latido=0.1, reintentos_conexion=1)
+        for n in range(3)
+    ]
+    hilos = [threading.Thread(target=t.ejecutar) for t in trabajadores]
+    for hilo in hilos:
+        hilo.start()
+    resumen = coordinador.ejecutar()
+    for hilo in hilos:
+        hilo.join()
+
+    registros = [json.loads(linea) for linea in salida.read_text(encoding='utf-8').splitlines()]
+    assert [r["id"] for r in registros] == list(range(95))
+    assert registros[42]["modelo"] == "REGISTRO 42"
+    assert resumen["fragmentos"] == 10
+    assert resumen["clasificaciones"] == 95
+    return resumen
+
+
+def test_fragmento_de_un_trabajador_muerto_se_reasigna(tmp_path):
+    resumen = _ejecutar(tmp_path, copias_maximas=1)
+
+    assert resumen["reasignaciones"] >= 1
+
+
+def test_trabajadores_libres_roban_fragmentos_en_curso(tmp_path):
+    resumen = _ejecutar(tmp_path, copias_maximas=2)
+
+    assert resumen["robos"] >= 1
+
+
+def test_mensajes_no_validos_token_y_cancelacion_del_fragmento_ya_completado(tmp_path):
+    entrada = tmp_path / "corpus.txt"
+    entrada.write_text("".join(f"registro {i}\n" for i in range(5)), encoding='utf-8')
+    salida = tmp_path / "resultados.jsonl"
+    coordinador = Coordinador(str(entrada), str(salida), direccion=('127.0.0.1', 0),
+                              tamano_fragmento=10, espera_cierre=0.3, token="secreto")
+    coordinador.iniciar()
+    direccion = ('127.0.0.1', coordinador.puerto)
+    assert coordinador._servidor.server_address[0] == '127.0.0.1'
+
+    # Cada mensaje mal formado recibe un error y el coordinador sigue atendiendo
+    for linea in (b"no es json", b"[1, 2]",
+                  b'{"tipo": "latido", "token": "secreto"}',
+                  b'{"tipo": "latido", "id": "0", "token": "secreto"}',
+                  b'{"tipo": "completado", "id": 99, "token": "secreto"}',
+                  b'{"tipo": "pedir", "token": "otro"}'):
+        assert _mensaje_crudo(direccion, linea)["tipo"] == "error", linea
+
+    # Un trabajador lento recibe "cancelar" en cuanto otro completa su fragmento
+    lento = TrabajadorRemoto(direccion, ProcesadorBloqueado(), nombre="lento",
+                             intervalo_latido=0.05, reintentos_conexion=1, token="secreto")
+    hilo_lento = threading.Thread(target=lento.ejecutar)
+    hilo_lento.start()
+    while not coordinador.estadisticas()["en_curso"]:
+        time.sleep(0.01)
+
+    rapido = TrabajadorRemoto(direccion, ProcesadorFalso(), nombre="rapido",
+                              reintentos_conexion=1, token="secreto")
+    hilo_rapido = threading.Thread(target=rapido.ejecutar)
+    hilo_rapido.start()
+    resumen = coordinador.ejecutar()
+    hilo_rapido.join()
+    hilo_lento.join()
+
+    assert rapido.fragmentos_procesados == 1
+    assert lento.fragmentos_cancelados == 1 and lento.fragmentos_procesados == 0
+    assert resumen["duplicados_descartados"] == 0
+    assert len(salida.read_text(encoding='utf-8').splitlines()) == 5
+
+
+def test_reinicio_descarta_fragmentos_si_la_entrada_cambia_con_el_mismo_tamano(tmp_path):
+    entrada = tmp_path / "corpus.txt"
+    entrada.write_text("".join(f"registro {i}\n" for i in range(20)), encoding='utf-8')
+    salida = tmp_path / "resultados.jsonl"
+
+    def coordinador():
+        return Coordinador(str(entrada), str(salida), direccion=('127.0.0.1', 0), tamano_fragmento=10)
+
+    primero = coordinador()
+    primero._atender({"tipo": "pedir", "trabajador": "t"}, b'')
+    primero._atender({"tipo": "completado", "trabajador": "t", "id": 0}, b'{"id": 0}\n')
+    primero.cerrar()
+
+    # Con la misma entrada se conserva el fragmento recibido
+    reiniciado = coordinador()
+    assert reiniciado.estadisticas()["completados"] == 1
+    reiniciado.cerrar()
+
+    # Mismo tamaño, otro contenido en medio: los fragmentos anteriores se descartan
+    contenido = entrada.read_bytes()
+    entrada.write_bytes(contenido.replace(b"registro 12", b"registro XX"))
+    assert entrada.stat().st_size == len(contenido)
+    estado = os.stat(entrada)
+    os.utime(entrada, ns=(estado.st_atime_ns, estado.st_mtime_ns + 1_000_000_000))
+    cambiado = coordinador()
+    assert cambiado.estadisticas()["completados"] == 0
+    cambiado.cerrar()
@@ -0,0 +1,28 @@
+"""
+Pruebas de la extracción de fragmentos relevantes en documentos largos.
+"""
+
+from setup.utilidades import estimar_tokens, extraer_fragmentos_relevantes, ventanas_relevantes
+
+
+RELLENO = "La empresa fue fundada hace muchos años en una ciudad grande. " * 40
+RELEVANTE = "Alquilamos servidores virtuales con almacenamiento y redes escalables."
+
+
+def test_extracto_conserva_las_oraciones_relevantes():
+    documento = RELLENO + RELEVANTE + " " + RELLENO
+
+    extracto = extraer_fragmentos_relevantes(documento, presupuesto_tokens=100, longitud_maxima=1000)
+
+    assert extracto == RELEVANTE
+    assert estimar_tokens(extracto) <= 100
+
+
+def test_ventanas_respetan_el_presupuesto():
+    documento = (RELLENO + RELEVANTE + " ") * 3
+
+    ventanas = ventanas_relevantes(documento, presupuesto_tokens=50, longitud_maxima=1000, cantidad=2)
+
+    assert len(ventanas) == 2
+    assert all(len(ventana) <= 200 for ventana in ventanas)
+    assert all("servidores" in ventana for ventana in ventanas)
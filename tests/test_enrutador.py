@@ -0,0 +1,88 @@
+"""
+Pruebas del enrutamiento entre el modelo rápido y el fuerte.
+"""
+
+from setup.clasificador import ClasificadorModelosNube
+from setup.enrutador import EnrutadorModelos
+from setup.modelos import ResultadoClasificacion
+from setup.utilidades import estimar_costo, sumar_costos
+from tests.conftest import VARIABLES_AISLADAS
+
+
+def _resultado(modelo, confianza, costo=None):
+    metricas = {"latencia": 0.5, "tokens_entrada": 100, "tokens_salida": 2, "costo": costo}
+    return ResultadoClasificacion(modelo, confianza, {}, "texto", "texto", "deepseek_nlp", metricas)
+
+
+def test_umbrales_de_ruta_escalado_y_costo_desconocido():
+    enrutador = EnrutadorModelos("rapido", "fuerte", longitud_maxima_rapida=10,
+                                 confianza_escalado=0.7)
+
+    assert enrutador.elegir("x" * 10) == (EnrutadorModelos.RUTA_RAPIDA, "rapido")
+    assert enrutador.elegir("x" * 11) == (EnrutadorModelos.RUTA_FUERTE, "fuerte")
+
+    assert enrutador.debe_escalar(_resultado("No determinado", 0.9))
+    assert enrutador.debe_escalar(_resultado("IaaS", 0.69))
+    assert not enrutador.debe_escalar(_resultado("IaaS", 0.7))
+    assert not enrutador.debe_escalar(_resultado("Error", 0.0))
+
+    # Un modelo sin precio no se cuenta como gratuito
+    assert estimar_costo(100, 2, None) is None
+    assert estimar_costo(1_000_000, 0, (0.27, 1.10)) == 0.27
+    assert sumar_costos([{"costo": None}, {}]) is None
+    assert sumar_costos([{"costo": None}, {"costo": 0.5}]) == 0.5
+
+    enrutador.registrar(EnrutadorModelos.RUTA_RAPIDA, _resultado("IaaS", 0.9, costo=None))
+    enrutador.registrar(EnrutadorModelos.RUTA_FUERTE, _resultado("IaaS", 0.9, costo=0.25))
+    enrutador.registrar(EnrutadorModelos.RUTA_FUERTE, _resultado("PaaS", 0.9, costo=None))
+    rutas = enrutador.estadisticas()["rutas"]
+    assert rutas["rapida"]["llamadas"] == 1
+    assert rutas["rapida"]["costo_total"] is None
+    assert rutas["fuerte"]["costo_total"] == 0.25
+    assert rutas["fuerte"]["llamadas_con_precio"] == 1
+    assert rutas["fuerte"]["tokens"] == 204
+    assert rutas["escalada"]["latencia_media"] == 0.0
+
+
+def test_clasificador_escala_al_modelo_fuerte_y_registra_la_coincidencia(monkeypatch):
+    for variable in VARIABLES_AISLADAS:
+        monkeypatch.delenv(variable, raising=False)
+    monkeypatch.setenv('DEEPSEEK_MODEL_FAST', 'rapido')
+    monkeypatch.setenv('DEEPSEEK_MODEL_STRONG', 'fuerte')
+    monkeypatch.setenv('ROUTING_MAX_FAST_LENGTH', '40')
+    clasificador = ClasificadorModelosNube(usar_nlp=True)
+
+    respuestas = {"rapido": _resultado("No determinado", 0.5), "fuerte": _resultado("IaaS", 0.9)}
+    llamadas = []
+
+    def clasificar_con_nlp(texto, modelo_llm=None, **kwargs):
+        llamadas.append(modelo_llm)
+        return respuestas[modelo_llm]
+
+    monkeypatch.setattr(clasificador, "clasificar_con_nlp", clasificar_con_nlp)
+
+    # Texto corto con respuesta dudosa: rápido y luego fuerte
+    assert clasificador.clasificar_con_enrutamiento("servidores virtuales").modelo == "IaaS"
+    assert llamadas == ["rapido", "fuerte"]
+
+    # Texto corto con respuesta segura: sólo el rápido
+    respuestas["rapido"] = _resultado("IaaS", 0.95)
+    llamadas.clear()
+    assert clasificador.clasificar_con_enrutamiento("servidores virtuales").modelo == "IaaS"
+    assert llamadas == ["rapido"]
+
+    # Texto largo: directamente al fuerte, sin escalado
+    llamadas.clear()
+    clasificador.clasificar_con_enrutamiento("servidores virtuales " * 5)
+    assert llamadas == ["fuerte"]
+
+    # Escalado en el que el fuerte confirma la etiqueta del rápido
+    respuestas["rapido"] = _resultado("IaaS", 0.6)
+    clasificador.clasificar_con_enrutamiento("servidores virtuales")
+
+    estadisticas = clasificador.estadisticas_enrutamiento()
+    assert estadisticas["escalados"] == 2
+    assert estadisticas["coincidencia_escalado"] == 0.5
+    assert estadisticas["rutas"]["rapida"]["llamadas"] == 3
+    assert estadisticas["rutas"]["fuerte"]["llamadas"] == 1
+    assert estadisticas["rutas"]["escalada"]["llamadas"] == 2
@@ -0,0 +1,73 @@
+"""
+Pruebas del historial de clasificaciones indexado por texto y por fecha.
+"""
+
+import json
+import time
+
+import pytest
+
+from setup.historial import HistorialClasificaciones, interpretar_momento
+from setup.modelos import ResultadoClasificacion
+from setup.procesador_lotes import ProcesadorLotes
+from setup.utilidades import preprocesar_texto
+from setup.casos_prueba import CasosPrueba
+
+
+def _resultado(texto, modelo, latencia=None, tokens=0, costo=None):
+    metricas = None
+    if latencia is not None:
+        metricas = {"modelo_llm": "deepseek", "latencia": latencia, "tokens_entrada": tokens,
+                    "tokens_salida": 0, "costo": costo}
+    return ResultadoClasificacion(modelo, 0.9, {modelo: 0.9}, texto, preprocesar_texto(texto),
+                                  "deepseek_nlp" if metricas else "reglas", metricas)
+
+
+def test_lote_registra_cada_clasificacion_en_el_historial(clasificador, tmp_path):
+    textos = [caso["texto"] for caso in CasosPrueba.obtener_todos_los_casos()][:4]
+    entrada = tmp_path / "catalogo.jsonl"
+    # El primer texto aparece dos veces: sólo se clasifica (y se registra) una
+    entrada.write_text("".join(json.dumps({"texto": texto}) + "\n" for texto in textos + textos[:1]),
+                       encoding='utf-8')
+    clasificador.historial = HistorialClasificaciones(str(tmp_path / "historial.db"))
+
+    ProcesadorLotes(clasificador).procesar(str(entrada), str(tmp_path / "resultados.jsonl"))
+
+    resumen = clasificador.historial.resumen(agrupar='huella')
+    assert resumen[0]["grupo"] == clasificador.huella_configuracion()
+    assert resumen[0]["clasificaciones"] == 4
+    assert resumen[0]["tokens"] > 0
+
+    filas = clasificador.historial.buscar(f"  {textos[0].upper()} ")
+    assert len(filas) == 1
+    assert filas[0]["texto"] == textos[0]
+    assert filas[0]["latencia"] is not None
+    assert filas[0]["modelo_llm"]
+    clasificador.historial.cerrar()
+
+
+def test_resumen_por_intervalo_y_agrupacion(tmp_path):
+    ahora = time.time()
+    with HistorialClasificaciones(str(tmp_path / "historial.db")) as historial:
+        historial.registrar([_resultado("AWS Lambda", "FaaS", 0.5, 100, 0.001)] * 3,
+                            huella="a", momento=ahora - 10 * 86400)
+        historial.registrar([_resultado("AWS Lambda", "FaaS", 1.5, 100, 0.001),
+                             _resultado("Amazon EC2", "IaaS"),
+                             _resultado("error", "Error")],
+                            huella="b", momento=ahora - 3600)
+
+        semana = {fila["grupo"]: fila for fila in historial.resumen(desde=interpretar_momento("7d"))}
+        assert set(semana) == {"FaaS", "IaaS"}
+        assert semana["FaaS"]["clasificaciones"] == 1
+        assert semana["FaaS"]["latencia_media"] == pytest.approx(1.5)
+        assert semana["IaaS"]["latencia_media"] is None
+
+        todo = {fila["grupo"]: fila for fila in historial.resumen(agrupar='huella')}
+        assert todo["a"]["clasificaciones"] == 3
+        assert todo["a"]["tokens"] == 300
+        assert todo["a"]["costo"] == pytest.approx(0.003)
+
+        assert [fila["huella"] for fila in historial.buscar("aws lambda")] == ["b", "a", "a", "a"]
+        assert historial.resumen(hasta=ahora - 20 * 86400) == []
+        with pytest.raises(ValueError):
+            historial.resumen(agrupar='texto')
@@ -0,0 +1,60 @@
+"""
+Pruebas de la reclasificación incremental por hash de contenido y huella de configuración.
+"""
+
+import json
+
+from setup.procesador_lotes import ProcesadorLotes
+from setup.casos_prueba import CasosPrueba
+
+
+def _escribir(ruta, textos):
+    ruta.write_text("".join(json.dumps({"texto": texto}) + "\n" for texto in textos), encoding='utf-8')
+
+
+def _leer(ruta):
+    return [json.loads(linea) for linea in ruta.read_text(encoding='utf-8').splitlines()]
+
+
+def test_solo_se_clasifican_los_registros_nuevos_o_modificados(clasificador, tmp_path):
+    textos = [caso["texto"] for caso in CasosPrueba.obtener_todos_los_casos()]
+    entrada = tmp_path / "catalogo.jsonl"
+    salida = tmp_path / "resultados.jsonl"
+    procesador = ProcesadorLotes(clasificador)
+
+    _escribir(entrada, textos[:5])
+    procesador.procesar(str(entrada), str(salida))
+    primera = _leer(salida)
+    assert all(fila["huella"] == clasificador.huella_configuracion() for fila in primera)
+
+    # Un registro cambia, otro desaparece y llegan dos nuevos
+    _escribir(entrada, [textos[0], textos[6], textos[2], textos[3], textos[7]])
+    resumen = procesador.procesar(str(entrada), str(salida), ruta_anterior=str(salida))
+
+    assert resumen["reutilizados"] == 3
+    assert resumen["clasificaciones"] == 2
+    segunda = _leer(salida)
+    assert [fila["texto_original"] for fila in segunda] == [
+        textos[0], textos[6], textos[2], textos[3], textos[7]
+    ]
+    assert segunda[2]["modelo"] == primera[2]["modelo"]
+
+
+def test_resultados_con_huella_obsoleta_se_reclasifican(clasificador, tmp_path):
+    textos = [caso["texto"] for caso in CasosPrueba.obtener_todos_los_casos()][:4]
+    entrada = tmp_path / "catalogo.jsonl"
+    anterior = tmp_path / "anterior.jsonl"
+    salida = tmp_path / "resultados.jsonl"
+    procesador = ProcesadorLotes(clasificador)
+
+    _escribir(entrada, textos)
+    procesador.procesar(str(entrada), str(anterior))
+    filas = _leer(anterior)
+    filas[1]["huella"] = "otra-instruccion"
+    anterior.write_text("".join(json.dumps(fila) + "\n" for fila in filas), encoding='utf-8')
+
+    resumen = procesador.procesar(str(entrada), str(salida), ruta_anterior=str(anterior))
+
+    assert resumen["reutilizados"] == 3
+    assert resumen["clasificaciones"] == 1
+    assert len(_leer(salida)) == 4
@@ -0,0 +1,98 @@
+"""
+Pruebas del lector de corpus indexado por líneas.
+"""
+
+import hashlib
+import json
+import os
+
+import pytest
+
+from setup.lector import LectorCorpus
+
+
+def test_indice_se_construye_reutiliza_y_descarta_si_el_archivo_cambia(tmp_path, monkeypatch):
+    ruta = tmp_path / "corpus.jsonl"
+    ruta.write_bytes(
+        b'{"texto": "AWS EC2"}\r\n\n'
+        b'Heroku plataforma\n'
+        + json.dumps({"texto": "Gmail correo"}).encode('utf-8')  # sin salto final
+    )
+
+    with LectorCorpus(str(ruta)) as lector:
+        assert len(lector) == 3
+        assert list(lector.rango()) == ["AWS EC2", "Heroku plataforma", "Gmail correo"]
+        assert lector[-1] == "Gmail correo"
+    assert os.path.exists(f"{ruta}.idx")
+
+    # Un índice vigente se reutiliza sin volver a recorrer el archivo
+    def no_reconstruir(self):
+        raise AssertionError("se reconstruyó un índice vigente")
+
+    monkeypatch.setattr(LectorCorpus, "_construir_indice", no_reconstruir)
+    with LectorCorpus(str(ruta)) as lector:
+        assert lector.registro(1) == "Heroku plataforma"
+    monkeypatch.undo()
+
+    # Mismo tamaño, otro contenido y otra fecha: el índice guardado queda obsoleto
+    tamano = ruta.stat().st_size
+    nuevo = b"x\n" * (tamano // 2 - 1) + b"y" * (tamano % 2 + 2)
+    assert len(nuevo) == tamano
+    ruta.write_bytes(nuevo)
+    estado = os.stat(ruta)
+    os.utime(ruta, ns=(estado.st_atime_ns, estado.st_mtime_ns + 1_000_000_000))
+    with LectorCorpus(str(ruta)) as lector:
+        assert len(lector) == tamano // 2
+        assert lector[-1] == "y" * (tamano % 2 + 2)
+
+    # Un índice dañado se descarta
+    with open(f"{ruta}.idx", 'r+b') as f:
+        f.truncate(20)
+    with LectorCorpus(str(ruta)) as lector:
+        assert len(lector) == tamano // 2
+
+
+def test_particionar_y_rango_en_los_limites(tmp_path):
+    ruta = tmp_path / "corpus.txt"
+    ruta.write_text("".join(f"registro {i}\n" for i in range(10)), encoding='utf-8')
+
+    with LectorCorpus(str(ruta)) as lector:
+        rangos = lector.particionar(3)
+        assert rangos == [(0, 4), (4, 7), (7, 10)]
+        assert [r for inicio, fin in rangos for r in lector.rango(inicio, fin)] == list(lector.rango())
+        assert lector.particionar(50) == [(i, i + 1) for i in range(10)]
+        assert lector.particionar(0) == [(0, 10)]
+        assert list(lector.rango(8, 100)) == ["registro 8", "registro 9"]
+        assert list(lector.rango(-3, 1)) == ["registro 0"]
+        assert list(lector.rango(10)) == []
+        with pytest.raises(IndexError):
+            lector.registro(10)
+
+    vacio = tmp_path / "vacio.txt"
+    vacio.write_bytes(b"")
+    with LectorCorpus(str(vacio)) as lector:
+        assert len(lector) == 0
+        assert lector.particionar(4) == []
+
+
+def test_identidad_con_hash_del_contenido_completo(tmp_path):
+    ruta = tmp_path / "grande.txt"
+    contenido = bytearray(b"".join(b"registro %07d\n" % i for i in range(200000)))
+    ruta.write_bytes(bytes(contenido))
+
+    with LectorCorpus(str(ruta)) as lector:
+        identidad = lector.identidad()
+    assert identidad["contenido"] == hashlib.blake2b(bytes(contenido), digest_size=16).hexdigest()
+    # El índice guardado conserva el hash sin volver a leer el archivo
+    with LectorCorpus(str(ruta)) as lector:
+        assert lector.identidad() == identidad
+
+    # Un cambio en medio que conserva el tamaño cambia la identidad
+    mitad = len(contenido) // 2
+    contenido[mitad] = ord(b"X") if contenido[mitad] != ord(b"X") else ord(b"Y")
+    ruta.write_bytes(bytes(contenido))
+    estado = os.stat(ruta)
+    os.utime(ruta, ns=(estado.st_atime_ns, estado.st_mtime_ns + 1_000_000_000))
+    with LectorCorpus(str(ruta)) as lector:
+        assert lector.identidad()["tamano"] == identidad["tamano"]
+        assert lector.identidad()["contenido"] != identidad["contenido"]
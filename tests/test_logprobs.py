@@ -0,0 +1,60 @@
+"""
+Pruebas de los puntajes calculados a partir de los logprobs del token de la etiqueta.
+"""
+
+import math
+
+from setup.utilidades import distribucion_de_logprobs
+
+
+def _respuesta(contenido, logprobs=None):
+    opcion = {"message": {"role": "assistant", "content": contenido}}
+    if logprobs is not None:
+        opcion["logprobs"] = {"content": logprobs}
+    return {"choices": [opcion], "usage": {"prompt_tokens": 90, "completion_tokens": 3}}
+
+
+LOGPROBS_PAAS = [
+    {"token": "**", "logprob": 0.0, "top_logprobs": []},
+    {"token": "Pa", "logprob": math.log(0.6), "top_logprobs": [
+        {"token": "Pa", "logprob": math.log(0.6)},
+        {"token": "I", "logprob": math.log(0.2)},
+        {"token": " Pa", "logprob": math.log(0.1)},
+        {"token": "No", "logprob": math.log(0.1)},
+    ]},
+    {"token": "aS", "logprob": 0.0, "top_logprobs": []},
+]
+
+
+def test_distribucion_sobre_las_etiquetas():
+    distribucion = distribucion_de_logprobs(LOGPROBS_PAAS)
+
+    assert abs(distribucion["PaaS"] - 0.7 / 0.9) < 1e-9
+    assert abs(distribucion["IaaS"] - 0.2 / 0.9) < 1e-9
+    assert distribucion["SaaS"] == distribucion["FaaS"] == 0.0
+    assert distribucion_de_logprobs([{"token": "No", "logprob": -0.1, "top_logprobs": []}]) is None
+    assert distribucion_de_logprobs(None) is None
+
+
+def test_puntajes_con_logprobs_y_sin_ellos(clasificador, monkeypatch):
+    monkeypatch.setenv('LOGPROBS', '1')
+    peticiones = []
+
+    def enviar(datos_peticion, **kwargs):
+        peticiones.append(datos_peticion)
+        return respuestas.pop(0)
+
+    respuestas = [_respuesta("**PaaS**", LOGPROBS_PAAS), _respuesta("PaaS")]
+    monkeypatch.setattr(clasificador, "_enviar_peticion", enviar)
+
+    resultado = clasificador.clasificar_con_nlp("Heroku despliega aplicaciones web")
+    assert peticiones[0]["logprobs"] is True and peticiones[0]["top_logprobs"] == 5
+    assert resultado.modelo == "PaaS"
+    assert abs(resultado.confianza - 0.7 / 0.9) < 1e-9
+    assert abs(sum(resultado.puntajes.values()) - 1.0) < 1e-9
+    assert resultado.metricas["puntajes_logprobs"]
+
+    # Un proveedor que ignora los logprobs deja los puntajes heurísticos
+    resultado = clasificador.clasificar_con_nlp("Heroku despliega aplicaciones web")
+    assert resultado.puntajes == {"IaaS": 0.0, "PaaS": 1.0, "SaaS": 0.0, "FaaS": 0.0}
+    assert "puntajes_logprobs" not in resultado.metricas
@@ -0,0 +1,76 @@
+"""
+Pruebas del lote columnar de resultados: vistas por fila y guardado en disco.
+"""
+
+from array import array
+from dataclasses import FrozenInstanceError, asdict
+
+import pytest
+
+from setup.modelos import ETIQUETAS_MODELO, LoteResultados, ResultadoClasificacion
+from setup.utilidades import preprocesar_texto
+
+
+def _resultados():
+    textos = ["AWS EC2 máquinas virtuales", "Heroku despliega aplicaciones 🚀", "Gmail"]
+    return [
+        ResultadoClasificacion("IaaS", 0.9123456789, {"IaaS": 0.9123456789, "PaaS": 0.0877},
+                               textos[0], preprocesar_texto(textos[0]), "deepseek_nlp",
+                               {"modelo_llm": "deepseek", "latencia": 0.25, "tokens_entrada": 80}),
+        ResultadoClasificacion("PaaS", 0.7, {"PaaS": 0.7, "IaaS": 0.1, "SaaS": 0.1, "FaaS": 0.1},
+                               textos[1], preprocesar_texto(textos[1]), "reglas"),
+        ResultadoClasificacion("Error", 0.0, {}, textos[2], preprocesar_texto(textos[2]), "error")
+    ]
+
+
+def _completos(resultado):
+    # El lote guarda los puntajes en precisión simple
+    puntajes = {etiqueta: array('f', [resultado.puntajes.get(etiqueta, 0.0)])[0]
+                for etiqueta in ETIQUETAS_MODELO}
+    return {**asdict(resultado), "puntajes": puntajes}
+
+
+def test_vistas_por_fila_iguales_a_los_resultados(tmp_path):
+    resultados = _resultados()
+    lote = LoteResultados()
+    for resultado in resultados:
+        lote.agregar(resultado)
+
+    assert len(lote) == 3
+    assert [_completos(r) for r in resultados] == [asdict(fila) for fila in lote]
+    assert lote[-1].modelo == "Error"
+    assert lote.texto(-2) == resultados[1].texto_original
+    assert lote.metricas(0)["latencia"] == 0.25
+    assert lote.metricas(1) is None
+    with pytest.raises(FrozenInstanceError):
+        resultados[0].modelo = "PaaS"
+    with pytest.raises(IndexError):
+        lote.texto(3)
+    with pytest.raises(IndexError):
+        lote[-4]
+
+
+def test_guardar_y_cargar_conserva_filas_y_permite_ampliar(tmp_path):
+    resultados = _resultados()
+    ruta = str(tmp_path / "lote.bin")
+    lote = LoteResultados()
+    for resultado in resultados[:2]:
+        lote.agregar(resultado)
+    lote.guardar(ruta)
+
+    cargado = LoteResultados.cargar(ruta)
+    assert [asdict(fila) for fila in cargado] == [asdict(fila) for fila in lote]
+    assert cargado[0].confianza == resultados[0].confianza
+    assert cargado[0].metricas == resultados[0].metricas
+    assert cargado.texto(-1) == resultados[1].texto_original
+
+    # Un lote cargado puede crecer y guardarse sobre su propio archivo
+    cargado.agregar(resultados[2])
+    cargado.guardar(ruta)
+    recargado = LoteResultados.cargar(ruta)
+    assert [_completos(r) for r in resultados] == [asdict(fila) for fila in recargado]
+    assert recargado.tabla_metodos == ["deepseek_nlp", "reglas", "error"]
+
+    (tmp_path / "otro.bin").write_bytes(b"no es un lote")
+    with pytest.raises(ValueError):
+        LoteResultados.cargar(str(tmp_path / "otro.bin"))
@@ -0,0 +1,65 @@
+"""
+Pruebas del planificador de peticiones con prioridades.
+"""
+
+import threading
+import time
+
+import pytest
+
+from setup.planificador import (
+    PeticionExpirada, PlanificadorPeticiones, PRIORIDAD_INTERACTIVA, PRIORIDAD_LOTE
+)
+from setup.casos_prueba import CasosPrueba
+
+
+def _llamada_lenta():
+    time.sleep(0.05)
+
+
+def _espera_interactiva(planificador, consultas=5):
+    """Latencia máxima de varias consultas interactivas instantáneas."""
+    latencias = []
+    for _ in range(consultas):
+        inicio = time.perf_counter()
+        planificador.ejecutar(lambda: None, prioridad=PRIORIDAD_INTERACTIVA)
+        latencias.append(time.perf_counter() - inicio)
+    return max(latencias)
+
+
+def test_latencia_interactiva_no_crece_con_carga_de_lotes():
+    planificador = PlanificadorPeticiones(trabajadores=3, trabajadores_reservados=1)
+    try:
+        sin_carga = _espera_interactiva(planificador)
+
+        # Cola de lotes que tarda más de un segundo en vaciarse con dos trabajadores
+        futuros = [planificador.enviar(_llamada_lenta, prioridad=PRIORIDAD_LOTE)
+                   for _ in range(50)]
+        con_carga = _espera_interactiva(planificador)
+
+        assert planificador.estadisticas()[PRIORIDAD_LOTE]["en_cola"] > 30
+        # Sin reserva tendría que esperar al menos a que acabe una llamada de lote
+        assert con_carga < sin_carga + 0.02
+        for futuro in futuros:
+            futuro.result()
+    finally:
+        planificador.cerrar()
+
+
+def test_plazo_vencido_se_lanza_y_no_se_confunde_con_un_error(clasificador):
+    texto = CasosPrueba.obtener_todos_los_casos()[0]["texto"]
+    planificador = PlanificadorPeticiones(trabajadores=1, trabajadores_reservados=0)
+    clasificador.planificador = planificador
+    liberar = threading.Event()
+    try:
+        # El único trabajador queda ocupado más allá del plazo de la consulta
+        planificador.enviar(liberar.wait, prioridad=PRIORIDAD_LOTE)
+        threading.Timer(0.05, liberar.set).start()
+
+        with pytest.raises(PeticionExpirada):
+            clasificador.clasificar(texto, plazo=0.01)
+        assert planificador.estadisticas()[PRIORIDAD_INTERACTIVA]["expiradas"] == 1
+        assert clasificador.estadisticas_uso()["llamadas"] == 0
+    finally:
+        liberar.set()
+        planificador.cerrar()
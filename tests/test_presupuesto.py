@@ -0,0 +1,55 @@
+"""
+Pruebas del control de presupuesto de tokens y costo.
+"""
+
+import pytest
+
+from setup.presupuesto import ACCION_DEGRADAR, ContadorUso, ControlPresupuesto, PresupuestoAgotado
+
+
+def _gastar(contador, tokens):
+    contador.registrar({"tokens_entrada": tokens, "tokens_salida": 0, "costo": tokens / 1000})
+
+
+def test_detiene_al_llegar_al_umbral():
+    contador = ContadorUso()
+    presupuesto = ControlPresupuesto(contador, limite_tokens=1000, umbral=0.9)
+
+    _gastar(contador, 800)
+    assert presupuesto.autorizar("modelo") == "modelo"
+
+    _gastar(contador, 100)
+    with pytest.raises(PresupuestoAgotado):
+        presupuesto.autorizar("modelo")
+
+
+def test_degrada_el_modelo_hasta_agotar_el_costo():
+    contador = ContadorUso()
+    presupuesto = ControlPresupuesto(contador, limite_costo=1.0, accion=ACCION_DEGRADAR,
+                                     modelo_degradado="barato")
+
+    _gastar(contador, 950)
+    assert presupuesto.autorizar("caro") == "barato"
+
+    _gastar(contador, 50)
+    with pytest.raises(PresupuestoAgotado):
+        presupuesto.autorizar("caro")
+    assert contador.instantanea()["llamadas"] == 2
+
+
+def test_costo_desconocido_sin_precio_y_rechazo_con_limite_de_costo():
+    contador = ContadorUso()
+    inicial = contador.instantanea()
+    _gastar(contador, 100)
+    contador.registrar({"tokens_entrada": 50, "tokens_salida": 5, "costo": None})
+
+    uso = contador.instantanea()
+    assert uso["llamadas_sin_precio"] == 1
+    assert uso["costo"] is None
+    assert ContadorUso.diferencia(uso, inicial)["costo"] is None
+
+    presupuesto = ControlPresupuesto(contador, limite_costo=1.0,
+                                     precios={"con_precio": (1.0, 1.0)})
+    assert presupuesto.autorizar("con_precio") == "con_precio"
+    with pytest.raises(PresupuestoAgotado):
+        presupuesto.autorizar("sin_precio")
@@ -0,0 +1,40 @@
+"""
+Pruebas del motor de reglas de productos y frases clave.
+"""
+
+from setup.reglas import MotorReglas, RUTA_REGLAS_POR_DEFECTO
+from setup.utilidades import preprocesar_texto
+from setup.casos_prueba import CasosPrueba
+
+
+def test_reglas_coinciden_con_palabras_completas_y_la_frase_mas_larga():
+    motor = MotorReglas([("netlify", "PaaS"), ("netlify functions", "FaaS"), ("s3", "IaaS")])
+
+    assert motor.predecir("desplegamos con netlify functions")[0] == "FaaS"
+    assert motor.predecir("el bucket s3x no existe") is None
+    assert motor.predecir("netlify y netlify functions") is None
+
+    estadisticas = motor.estadisticas()
+    assert estadisticas["resueltas"] == 1
+    assert estadisticas["conflictos"] == 1
+
+
+def test_diccionario_incluido_acierta_los_casos_de_prueba():
+    motor = MotorReglas.desde_archivo(RUTA_REGLAS_POR_DEFECTO)
+
+    resueltos = 0
+    for caso in CasosPrueba.obtener_todos_los_casos():
+        prediccion = motor.predecir(preprocesar_texto(caso["texto"]))
+        if prediccion is not None:
+            resueltos += 1
+            assert prediccion[0] == caso["modelo_esperado"], caso["texto"]
+
+    assert resueltos >= len(CasosPrueba.obtener_todos_los_casos()) // 2
+
+    # Las palabras sueltas con otros significados no deciden por sí solas
+    assert motor.predecir(preprocesar_texto("The lambda calculus is nice")) is None
+    assert motor.predecir(preprocesar_texto("Water droplets on the zoom lens")) is None
+    # Las tildes no importan ni en el texto ni en el diccionario
+    for texto in ("Alquilamos máquinas virtuales", "Alquilamos maquinas virtuales"):
+        assert motor.predecir(preprocesar_texto(texto))[0] == "IaaS"
+    assert MotorReglas([("maquina virtual", "IaaS")]).predecir("una máquina virtual")[0] == "IaaS"
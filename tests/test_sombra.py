@@ -0,0 +1,96 @@
+"""
+Pruebas del modo sombra.
+"""
+
+import threading
+import time
+from dataclasses import replace
+
+from setup.modelos import ResultadoClasificacion
+from setup.planificador import (
+    PlanificadorPeticiones, PRIORIDAD_INTERACTIVA, PRIORIDAD_LOTE, PRIORIDAD_SOMBRA
+)
+from setup.sombra import EvaluadorSombra
+from setup.casos_prueba import CasosPrueba
+
+
+def _resultado(modelo):
+    return ResultadoClasificacion(modelo, 1.0, {}, "texto", "texto", "prueba")
+
+
+def test_observar_no_espera_a_un_candidato_lento():
+    liberar = threading.Event()
+
+    def candidato(texto):
+        liberar.wait()
+        return _resultado("PaaS")
+
+    evaluador = EvaluadorSombra(candidato, fraccion=1.0, capacidad=2)
+    # El principal llamó a un modelo sin precio
+    principal = replace(_resultado("PaaS"), metricas={"tokens_entrada": 10, "costo": None})
+    duraciones = []
+    for _ in range(10):
+        inicio = time.perf_counter()
+        evaluador.observar("texto", principal, 0.2)
+        duraciones.append(time.perf_counter() - inicio)
+
+    # El hilo tiene una muestra en curso y la cola otras dos; el resto se descarta
+    assert max(duraciones) < 0.05
+    assert evaluador.informe()["descartadas"] >= 7
+
+    liberar.set()
+    assert evaluador.esperar(5.0)
+    informe = evaluador.informe()
+    assert informe["comparadas"] == informe["muestreadas"] - informe["descartadas"]
+    assert informe["coincidencia"] == 1.0
+    assert informe["costo"] == {"principal": None, "candidato": 0.0}
+    evaluador.cerrar()
+
+
+def test_clasificador_replica_las_llamadas_en_el_candidato(clasificador):
+    candidato, descripcion = clasificador.crear_motor('reglas')
+    clasificador.sombra = EvaluadorSombra(candidato, fraccion=1.0, descripcion=descripcion)
+
+    casos = CasosPrueba.obtener_todos_los_casos()
+    for caso in casos:
+        clasificador.clasificar(caso["texto"])
+
+    informe = clasificador.estadisticas_sombra(esperar=5.0)
+    assert informe["candidato"] == "reglas"
+    assert informe["comparadas"] == len(casos)
+    coincidencias = round(informe["comparadas"] * informe["coincidencia"])
+    assert coincidencias + sum(informe["desacuerdos"].values()) == len(casos)
+    # Las reglas no llaman al LLM: el candidato ahorra todos los tokens
+    assert informe["delta_tokens_medios"] < 0
+    clasificador.sombra.cerrar()
+
+
+def test_candidato_llm_solo_usa_trabajadores_ociosos(clasificador, monkeypatch):
+    prioridades = []
+    monkeypatch.setattr(clasificador, "clasificar_con_nlp",
+                        lambda texto, **opciones: prioridades.append(opciones["prioridad"]))
+    candidato, _ = clasificador.crear_motor('llm', sombra=True)
+    candidato("texto")
+    assert prioridades == [PRIORIDAD_SOMBRA]
+
+    planificador = PlanificadorPeticiones(trabajadores=2, trabajadores_reservados=1)
+    liberar = threading.Event()
+    orden = []
+    try:
+        # El único trabajador no reservado queda ocupado mientras se encola todo
+        planificador.enviar(liberar.wait, prioridad=PRIORIDAD_LOTE)
+        futuros = [planificador.enviar(orden.append, "sombra", prioridad=PRIORIDAD_SOMBRA)]
+        futuros += [planificador.enviar(orden.append, clase, prioridad=clase)
+                    for clase in (PRIORIDAD_LOTE, PRIORIDAD_INTERACTIVA)]
+        # El trabajador reservado atiende la interactiva pero nunca la sombra
+        futuros[2].result(timeout=5.0)
+        time.sleep(0.05)
+        assert orden == [PRIORIDAD_INTERACTIVA]
+
+        liberar.set()
+        for futuro in futuros:
+            futuro.result(timeout=5.0)
+        assert orden == [PRIORIDAD_INTERACTIVA, PRIORIDAD_LOTE, "sombra"]
+    finally:
+        liberar.set()
+        planificador.cerrar()
@@ -0,0 +1,52 @@
+"""
+Pruebas del trabajador del directorio de spool.
+"""
+
+import json
+
+from setup.spool import TrabajadorSpool
+
+
+class ProcesadorFalso:
+    """Procesador por lotes que copia la entrada y falla con los archivos vacíos."""
+
+    def procesar(self, ruta_entrada, ruta_salida, reanudar=False):
+        with open(ruta_entrada, encoding='utf-8') as f:
+            lineas = f.read().splitlines()
+        if not lineas:
+            raise ValueError("Archivo vacío")
+        with open(ruta_salida, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lineas) + "\n")
+        return {"total_registros": len(lineas), "errores": 0, "backends": [], "enrutamiento": None}
+
+
+def test_un_archivo_solo_lo_reclama_un_trabajador(tmp_path):
+    (tmp_path / "lote.jsonl").write_text('{"texto": "a"}\n', encoding='utf-8')
+    primero = TrabajadorSpool(str(tmp_path), procesador=ProcesadorFalso())
+    segundo = TrabajadorSpool(str(tmp_path), procesador=ProcesadorFalso())
+
+    assert primero.reclamar(str(tmp_path / "lote.jsonl")) is not None
+    assert segundo.reclamar(str(tmp_path / "lote.jsonl")) is None
+    assert segundo.pendientes() == []
+
+
+def test_procesa_los_archivos_y_deja_marcas(tmp_path):
+    (tmp_path / "bueno.jsonl").write_text('{"texto": "a"}\n{"texto": "b"}\n', encoding='utf-8')
+    (tmp_path / "vacio.jsonl").write_text('', encoding='utf-8')
+    (tmp_path / ".escribiendo.jsonl").write_text('{"texto": "c"}\n', encoding='utf-8')
+    trabajador = TrabajadorSpool(str(tmp_path), procesador=ProcesadorFalso())
+
+    for ruta in trabajador.pendientes():
+        trabajador.procesar_archivo(ruta)
+
+    marca = json.loads((tmp_path / "bueno.jsonl.hecho").read_text(encoding='utf-8'))
+    assert marca["resumen"] == {"total_registros": 2, "errores": 0}
+    assert (tmp_path / "bueno.jsonl.procesado").exists()
+    assert (tmp_path / "bueno.jsonl.resultados.jsonl").exists()
+    assert (tmp_path / "vacio.jsonl.fallido").exists()
+    assert (tmp_path / ".escribiendo.jsonl").exists()
+
+    estadisticas = trabajador.estadisticas()
+    assert estadisticas["archivos_procesados"] == 1
+    assert estadisticas["archivos_fallidos"] == 1
+    assert estadisticas["pendientes"] == 0
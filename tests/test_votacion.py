@@ -0,0 +1,92 @@
+"""
+Pruebas de la votación por autoconsistencia con parada al alcanzar el quórum.
+"""
+
+import queue
+import time
+
+import pytest
+
+from setup.modelos import ResultadoClasificacion
+from setup.planificador import PeticionExpirada
+from setup.presupuesto import PresupuestoAgotado
+
+
+def _falso_llm(clasificador, monkeypatch, respuestas):
+    """Sustituye las llamadas al LLM por respuestas (modelo, confianza, segundos) o excepciones."""
+    cola = queue.Queue()
+    for respuesta in respuestas:
+        cola.put(respuesta)
+    llamadas = []
+
+    def clasificar_con_nlp(texto, temperatura=None, **kwargs):
+        respuesta = cola.get_nowait()
+        llamadas.append(temperatura)
+        if isinstance(respuesta, Exception):
+            raise respuesta
+        modelo, confianza, segundos = respuesta
+        time.sleep(segundos)
+        return ResultadoClasificacion(modelo, confianza, {}, texto, texto.lower(), "deepseek_nlp",
+                                      {"latencia": segundos, "tokens_entrada": 90, "tokens_salida": 2})
+
+    monkeypatch.setattr(clasificador, "clasificar_con_nlp", clasificar_con_nlp)
+    return llamadas
+
+
+def test_votacion_termina_al_alcanzar_el_quorum(clasificador, monkeypatch):
+    llamadas = _falso_llm(clasificador, monkeypatch, [
+        ("PaaS", 1.0, 0.01), ("PaaS", 1.0, 0.02), ("IaaS", 1.0, 1.0), ("IaaS", 1.0, 1.0)
+    ])
+    primer_voto = ResultadoClasificacion("PaaS", 0.6, {}, "texto", "texto", "deepseek_nlp", {"latencia": 0.1})
+
+    inicio = time.perf_counter()
+    resultado = clasificador.clasificar_por_votacion("Servicio de nube para aplicaciones",
+                                                     muestras=5, quorum=3, primer_voto=primer_voto)
+
+    assert time.perf_counter() - inicio < 0.5
+    assert resultado.modelo == "PaaS"
+    assert resultado.metodo == "deepseek_nlp_autoconsistencia"
+    assert resultado.metricas["votos"] == ["PaaS", "PaaS", "PaaS"]
+    assert resultado.metricas["parada_anticipada"]
+    assert resultado.puntajes == {"IaaS": 0.0, "PaaS": 1.0, "SaaS": 0.0, "FaaS": 0.0}
+    # Sólo se pidieron las dos muestras que faltaban para el quórum
+    assert len(llamadas) == 2
+
+
+def test_solo_se_vota_por_debajo_del_umbral(clasificador, monkeypatch):
+    monkeypatch.setenv('VOTING_SAMPLES', '3')
+    llamadas = _falso_llm(clasificador, monkeypatch, [
+        ("IaaS", 1.0, 0.0),
+        ("No determinado", 0.8, 0.0), ("SaaS", 1.0, 0.0), ("No determinado", 1.0, 0.05)
+    ])
+
+    assert clasificador.clasificar("AWS EC2 proporciona servidores virtuales").metodo == "deepseek_nlp"
+
+    # "No determinado" no gana a una etiqueta, pero rebaja su confianza
+    resultado = clasificador.clasificar("Servicio de nube para aplicaciones")
+    assert resultado.modelo == "SaaS"
+    assert resultado.confianza == 1 / 3
+    assert resultado.puntajes == {"IaaS": 0.0, "PaaS": 0.0, "SaaS": 1.0, "FaaS": 0.0}
+    assert resultado.metricas["votos"] == ["No determinado", "SaaS", "No determinado"]
+    # La primera llamada de cada texto usa TEMPERATURE; las muestras, VOTING_TEMPERATURE
+    assert llamadas == [None, None, 0.7, 0.7]
+
+
+def test_votos_fallidos_no_cuentan_ni_cortan_la_votacion(clasificador, monkeypatch):
+    _falso_llm(clasificador, monkeypatch, [
+        ("Error", 0.0, 0.0), PeticionExpirada("plazo vencido"),
+        ("No determinado", 0.9, 0.02), ("IaaS", 1.0, 0.04)
+    ])
+
+    resultado = clasificador.clasificar_por_votacion("Servicio de nube", muestras=4, quorum=3)
+
+    assert resultado.modelo == "IaaS"
+    assert resultado.confianza == 1 / 2
+    assert sum(resultado.puntajes.values()) == 1.0
+    assert resultado.metricas["votos"] == ["No determinado", "IaaS"]
+    assert not resultado.metricas["parada_anticipada"]
+
+    # Sin ningún voto, el motivo del fallo llega a quien llamó
+    _falso_llm(clasificador, monkeypatch, [PresupuestoAgotado("sin presupuesto")] * 3)
+    with pytest.raises(PresupuestoAgotado):
+        clasificador.clasificar_por_votacion("Servicio de nube", muestras=3, quorum=2)
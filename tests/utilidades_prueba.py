@@ -6,11 +6,11 @@ import sys
 from pathlib import Path
 from typing import Dict, Any, List
 
-# Agregar el directorio raíz al path para importar el módulo src
+# Agregar el directorio raíz al path para importar el paquete setup
 directorio_raiz = Path(__file__).parent.parent
 sys.path.insert(0, str(directorio_raiz))
 
-from src import ClasificadorModelosNube, ResultadoClasificacion
+from setup import ClasificadorModelosNube, ResultadoClasificacion
 
 class UtilidadesPrueba:
     """Clase con utilidades para las pruebas del clasificador."""